@@ -1,73 +1,535 @@
-from fastapi import APIRouter, File, UploadFile, HTTPException, Header
-from fastapi.responses import JSONResponse
-from app.services.ats_scanner import get_ats_score, parse_ats_response
-from app.services.pdf_parser import (
-    extract_textpdf,
-    extract_links_from_pdf,
-    extract_links,
-    classify_links
+import asyncio
+import json
+import os
+import zipfile
+
+from fastapi import APIRouter, File, UploadFile, HTTPException, Header, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.services.ats_scanner import (
+    ATSStreamParser,
+    aget_ats_score,
+    astream_ats_score,
+    parse_ats_response,
+    ats_result_cache,
+    ats_cache_key,
 )
-from typing import Optional
- 
+from app.services.ats_local import local_ats_score
+from app.services.llm_limiter import LLMBusyError
+from app.services.docx_parser import DocxError, extract_docx
+from app.services.job_queue import QueueFullError, job_runner
+from app.services.metrics import span
+from app.services.parse_pool import ParsePoolBusy, ParseTimeout, parse_pool
+from app.services.pdf_parser import extract_pdf
+from app.services.upload import UploadRejected, has_magic, read_resume_upload, resume_kind
+from typing import Any, Awaitable, BinaryIO, Callable, Dict, List, Optional, Tuple
+
 router = APIRouter(prefix="/api", tags=["ATS"])
 
+# Batch scoring limits
+BATCH_MAX_FILES = int(os.getenv("ATS_BATCH_MAX_FILES", "500"))
+BATCH_MAX_FILE_BYTES = int(os.getenv("ATS_BATCH_MAX_FILE_BYTES", str(10 * 1024 * 1024)))
+# resume bytes one batch may hold in memory (uploads + inflated zip members)
+BATCH_MAX_TOTAL_BYTES = int(os.getenv("ATS_BATCH_MAX_TOTAL_BYTES", str(100 * 1024 * 1024)))
+BATCH_CONCURRENCY = int(os.getenv("ATS_BATCH_CONCURRENCY", "8"))
+
+# Same output shape for both: text, annotation_links, text_links, links
+EXTRACTORS = {"pdf": extract_pdf, "docx": extract_docx}
+
+# fast: local scorer only, no model call. full: model analysis, with the
+# local scorer's per-dimension breakdown. hybrid: the local result right away,
+# the model's commentary after (SSE/NDJSON events, or a job for /ats-score).
+ATS_MODES = ("fast", "full", "hybrid")
+MODE_DESCRIPTION = "fast (local score, no model call), full (default) or hybrid (local score first, model commentary after)"
+ATS_COMMENTARY_JOB = "ats_commentary"
+
+# The single-file endpoints stream the multipart body themselves (see
+# read_resume_upload) instead of declaring an UploadFile, which would spool the
+# whole body before the handler runs; this keeps the documented schema.
+RESUME_UPLOAD_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                }
+            }
+        },
+    }
+}
+
+
+def _format_response(result: Dict[str, Any], filename: str) -> Dict[str, Any]:
+    # Format response to match frontend expectations. overallScore is the
+    # model's (the local one in fast mode); the breakdown is always local.
+    local = result.get("local") or {}
+    score = result.get("ats_score", 0)
+    return {
+        "overallScore": score,
+        "field": result.get("field", "Unknown"),
+        "breakdown": local.get("breakdown") or {
+            "keywordRelevance": score,
+            "formatting": score,
+            "experience": score,
+        },
+        "localScore": local.get("ats_score"),
+        "signals": local.get("signals", {}),
+        "strengths": result.get("strengths", []),
+        "improvements": result.get("improvements", []),
+        "links": result.get("links", {}),
+        "resumeName": filename
+    }
+
+
+async def read_upload(request: Request) -> Tuple[str, str, memoryview]:
+    try:
+        return await read_resume_upload(request)
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+
+async def extract_resume(file_bytes, kind: str, shed: bool = True) -> Dict[str, Any]:
+    """
+    Text and links from a PDF or DOCX in a single parse, in the parse pool.
+    A full pool answers 503 unless `shed` is off (see ParsePool.run).
+    """
+    try:
+        with span(f"{kind}_parse"):
+            extracted = await parse_pool.run(EXTRACTORS[kind], file_bytes, shed=shed)
+    except DocxError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ParsePoolBusy as e:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many documents are being parsed right now. Please retry shortly.",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    except ParseTimeout as e:
+        raise HTTPException(status_code=422, detail=f"{str(e)}. Try a smaller or text-based file.")
+    if not extracted["text"] or not extracted["text"].strip():
+        label = kind.upper()
+        raise HTTPException(status_code=400, detail=f"Could not extract text from {label}. Please ensure the {label} contains readable text.")
+    return extracted
+
+
+def _resolve_mode(mode: str) -> str:
+    if mode not in ATS_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of: {', '.join(ATS_MODES)}")
+    return mode
+
+
+async def score_locally(extracted: Dict[str, Any]) -> Dict[str, Any]:
+    with span("ats_local"):
+        return await asyncio.to_thread(local_ats_score, extracted["text"], extracted["links"])
+
+
+def _local_result(local: Dict[str, Any], links: Dict[str, Any]) -> Dict[str, Any]:
+    """A local score in the parse_ats_response shape, as mode=fast returns it."""
+    return {
+        "field": local["field"],
+        "ats_score": local["ats_score"],
+        "strengths": local["strengths"],
+        "improvements": local["improvements"],
+        "links": links,
+        "local": local,
+    }
+
+
+async def _model_result(text: str, links: Dict[str, Any], local: Dict[str, Any]) -> Dict[str, Any]:
+    ats_result = await aget_ats_score(text)
+    result = parse_ats_response(str(ats_result))
+    result["links"] = links
+    result["local"] = local
+    return result
 
-@router.post("/ats-score")
+
+async def _analyze_resume(
+    file_bytes,
+    kind: str = "pdf",
+    bypass: bool = False,
+    mode: str = "full",
+    on_local: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+    shed: bool = True,
+) -> Tuple[Dict[str, Any], str]:
+    """
+    Parse + score one PDF or DOCX. Returns the parsed ATS result (with links
+    and the local score) and the cache status: "hit", "miss" or "bypass".
+    mode=fast stops after the local scorer; otherwise `on_local` gets the
+    local result before the model is called. `shed` as for extract_resume.
+    """
+    # Same bytes + same prompt/scorer version => same analysis; skip the Gemini round trip
+    local_only = mode == "fast"
+    cache_key = ats_cache_key(file_bytes, local_only=local_only)
+    if not bypass:
+        cached = ats_result_cache.get(cache_key)
+        if cached is not None:
+            return cached, "hit"
+
+    extracted = await extract_resume(file_bytes, kind, shed=shed)
+    local = await score_locally(extracted)
+    if local_only:
+        result = _local_result(local, extracted["links"])
+        ats_result_cache.set(cache_key, result)
+        return result, "bypass" if bypass else "miss"
+    if on_local is not None:
+        await on_local(_local_result(local, extracted["links"]))
+
+    # Get ATS score
+    result = await _model_result(extracted["text"], extracted["links"], local)
+
+    # Only cache responses the parser could make sense of
+    if result.get("ats_score") is not None:
+        ats_result_cache.set(cache_key, result)
+
+    return result, "bypass" if bypass else "miss"
+
+
+async def _ats_commentary_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Model half of a hybrid /ats-score request; the result is the full /ats-score response."""
+    try:
+        result = await _model_result(payload["text"], payload["links"], payload["local"])
+    except LLMBusyError as e:
+        # a 429 makes the job runner retry after Retry-After
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    if result.get("ats_score") is not None:
+        ats_result_cache.set(payload["cache_key"], result)
+    return _format_response(result, payload["resumeName"])
+
+
+job_runner.register(ATS_COMMENTARY_JOB, _ats_commentary_job)
+
+
+async def _hybrid_response(file_bytes, kind: str, filename: str, bypass: bool) -> JSONResponse:
+    """
+    The local result now, with `commentary` pointing at the job that adds
+    the model's analysis. A cached full analysis is returned as is.
+    """
+    cache_key = ats_cache_key(file_bytes)
+    if not bypass:
+        cached = ats_result_cache.get(cache_key)
+        if cached is not None:
+            return JSONResponse(content=_format_response(cached, filename), headers={"X-Cache": "hit"})
+
+    extracted = await extract_resume(file_bytes, kind)
+    local = await score_locally(extracted)
+    content = _format_response(_local_result(local, extracted["links"]), filename)
+    try:
+        job_id = await job_runner.submit(ATS_COMMENTARY_JOB, {
+            "text": extracted["text"],
+            "links": extracted["links"],
+            "local": local,
+            "cache_key": cache_key,
+            "resumeName": filename,
+        })
+        status_url = f"/api/ats-score/jobs/{job_id}"
+        content["commentary"] = {"job_id": job_id, "status": "queued", "status_url": status_url}
+    except QueueFullError as e:
+        # the local score still stands on its own
+        content["commentary"] = {"status": "unavailable", "retryAfter": e.retry_after}
+    return JSONResponse(content=content, headers={"X-Cache": "bypass" if bypass else "miss"})
+
+
+@router.post("/ats-score", openapi_extra=RESUME_UPLOAD_BODY)
 async def calculate_ats_score(
-    file: UploadFile = File(...),
-    authorization: Optional[str] = Header(None)
+    request: Request,
+    authorization: Optional[str] = Header(None),
+    cache: Optional[str] = Query(None, description="Set to 'bypass' to skip the result cache and force a fresh run"),
+    mode: str = Query("full", description=MODE_DESCRIPTION),
 ):
     """
-    Upload a PDF resume and get ATS score analysis.
+    Upload a PDF or DOCX resume and get ATS score analysis.
+
+    With mode=hybrid the response is the local score, plus `commentary`
+    with the job whose result (GET /api/ats-score/jobs/{id}) is the full
+    analysis.
     """
     print("/ats-score hit")
+    mode = _resolve_mode(mode)
     try:
-        # Validate file type
-        filename = file.filename or "unknown.pdf"
-        if not filename.endswith('.pdf'):
-            raise HTTPException(status_code=400, detail="Only PDF files are supported")
-        
-        # Read file content
-        file_bytes = await file.read()
-        
-        # Extract text from PDF
-        resume_text = extract_textpdf(file_bytes)
-        
-        if not resume_text or not resume_text.strip():
-            raise HTTPException(status_code=400, detail="Could not extract text from PDF. Please ensure the PDF contains readable text.")
-        
-        # Extract links
-        links_from_pdf = extract_links_from_pdf(file_bytes)
-        links_from_text = extract_links(resume_text)
-        classified_links = classify_links(
-            list(set(links_from_pdf + links_from_text))
-        )
-        
-        # Get ATS score
-        ats_result = get_ats_score(resume_text)
-        result = parse_ats_response(str(ats_result))
-        result["links"] = classified_links
-        
-        # Format response to match frontend expectations
-        response = {
-            "overallScore": result.get("ats_score", 0),
-            "field": result.get("field", "Unknown"),
-            "breakdown": {
-                "keywordRelevance": result.get("ats_score", 0),
-                "formatting": result.get("ats_score", 0),
-                "experience": result.get("ats_score", 0),
-            },
-            "strengths": result.get("strengths", []),
-            "improvements": result.get("improvements", []),
-            "links": result.get("links", {}),
-            "resumeName": filename
-        }
-
-        return JSONResponse(content=response)
-    
+        # Stream the upload in, rejecting oversized / unsupported files early
+        filename, kind, file_bytes = await read_upload(request)
+
+        if mode == "hybrid":
+            return await _hybrid_response(file_bytes, kind, filename, bypass=cache == "bypass")
+        result, cache_status = await _analyze_resume(file_bytes, kind, bypass=cache == "bypass", mode=mode)
+        return JSONResponse(content=_format_response(result, filename), headers={"X-Cache": cache_status})
+
     except HTTPException as e:
         print(e)
         raise
+    except LLMBusyError as e:
+        print(e)
+        raise HTTPException(
+            status_code=429,
+            detail="Too many resumes are being analyzed right now. Please retry shortly.",
+            headers={"Retry-After": str(e.retry_after)},
+        )
     except Exception as e:
         print(e)
         raise HTTPException(status_code=500, detail=f"Error processing resume: {str(e)}")
+
+
+def _batch_too_many() -> HTTPException:
+    return HTTPException(status_code=400, detail=f"Batch limited to {BATCH_MAX_FILES} files")
+
+
+def _batch_too_large() -> HTTPException:
+    return HTTPException(status_code=413, detail=f"Batch exceeds {BATCH_MAX_TOTAL_BYTES} bytes of resumes")
+
+
+def _resumes_from_zip(zip_file: BinaryIO, max_files: int, max_bytes: int) -> List[Tuple[str, Optional[bytes], Optional[str]]]:
+    """
+    Unpack PDF and DOCX members of a zip upload as (name, bytes, error) tuples.
+    Oversized members are reported as errors instead of being inflated. The
+    member count and total inflated size are checked against the room left
+    in the batch from the zip directory, before any member is read.
+    """
+    with zipfile.ZipFile(zip_file) as zf:
+        members = [
+            info
+            for info in zf.infolist()
+            if not (info.is_dir() or info.filename.startswith("__MACOSX/") or resume_kind(info.filename) is None)
+        ]
+        if len(members) > max_files:
+            raise _batch_too_many()
+        # file_size is also what zipfile stops inflating at, so it bounds memory
+        if sum(info.file_size for info in members if info.file_size <= BATCH_MAX_FILE_BYTES) > max_bytes:
+            raise _batch_too_large()
+        return [
+            (info.filename, None, f"File exceeds {BATCH_MAX_FILE_BYTES} bytes")
+            if info.file_size > BATCH_MAX_FILE_BYTES
+            else (info.filename, zf.read(info), None)
+            for info in members
+        ]
+
+
+@router.post("/ats-score/batch")
+async def calculate_ats_score_batch(
+    files: List[UploadFile] = File(...),
+    authorization: Optional[str] = Header(None),
+    cache: Optional[str] = Query(None, description="Set to 'bypass' to skip the result cache and force a fresh run"),
+    mode: str = Query("full", description=MODE_DESCRIPTION),
+):
+    """
+    Score many PDF / DOCX resumes (or a zip of them) in one request.
+
+    Results stream back as NDJSON in completion order, one line per file:
+    {"type": "result", "index", "resumeName", "status": "ok"|"error", ...}.
+    With mode=hybrid a {"type": "local", ...} line with the local score comes
+    first for every file that isn't cached. A final {"type": "summary"} line
+    closes the stream. A failing file never fails the rest of the batch.
+    """
+    print("/ats-score/batch hit")
+    mode = _resolve_mode(mode)
+    # Limits are checked before anything is read: sizes come from the
+    # multipart parts and the zip directories, and a batch over the file
+    # count or BATCH_MAX_TOTAL_BYTES is refused as soon as that is known.
+    items: List[Tuple[str, Optional[bytes], Optional[str]]] = []
+    total_bytes = 0
+    for upload in files:
+        if len(items) >= BATCH_MAX_FILES:
+            raise _batch_too_many()
+        name = upload.filename or "unknown.pdf"
+        if name.lower().endswith(".zip"):
+            try:
+                unpacked = await asyncio.to_thread(
+                    _resumes_from_zip, upload.file, BATCH_MAX_FILES - len(items), BATCH_MAX_TOTAL_BYTES - total_bytes
+                )
+            except zipfile.BadZipFile:
+                items.append((name, None, "Invalid zip archive"))
+                continue
+            items.extend(unpacked)
+            total_bytes += sum(len(data) for _, data, _ in unpacked if data is not None)
+        elif resume_kind(name) is None:
+            items.append((name, None, "Only PDF and DOCX files are supported"))
+        elif upload.size is not None and upload.size > BATCH_MAX_FILE_BYTES:
+            items.append((name, None, f"File exceeds {BATCH_MAX_FILE_BYTES} bytes"))
+        else:
+            if total_bytes + (upload.size or 0) > BATCH_MAX_TOTAL_BYTES:
+                raise _batch_too_large()
+            data = await upload.read(BATCH_MAX_FILE_BYTES + 1)
+            if len(data) > BATCH_MAX_FILE_BYTES:
+                items.append((name, None, f"File exceeds {BATCH_MAX_FILE_BYTES} bytes"))
+                continue
+            total_bytes += len(data)
+            if total_bytes > BATCH_MAX_TOTAL_BYTES:
+                raise _batch_too_large()
+            items.append((name, data, None))
+
+    if not items:
+        raise HTTPException(status_code=400, detail="No PDF or DOCX files found in upload")
+
+    bypass = cache == "bypass"
+    sem = asyncio.Semaphore(BATCH_CONCURRENCY)
+    # result lines, plus local lines in hybrid mode, in the order they're ready
+    lines: asyncio.Queue = asyncio.Queue()
+
+    async def _score_one(index: int, name: str, data: Optional[bytes], error: Optional[str]) -> Dict[str, Any]:
+        line: Dict[str, Any] = {"type": "result", "index": index, "resumeName": name}
+        if error is not None or data is None:
+            return {**line, "status": "error", "error": error}
+        kind = resume_kind(name) or "pdf"
+        if not has_magic(kind, data):
+            return {**line, "status": "error", "error": f"File is not a valid {kind.upper()}"}
+
+        async def _on_local(local_result: Dict[str, Any]) -> None:
+            await lines.put({**line, "type": "local", "status": "ok", "result": _format_response(local_result, name)})
+
+        async with sem:
+            try:
+                # the batch semaphore already bounds these; queue for the parse pool instead of being shed
+                result, cache_status = await _analyze_resume(
+                    data, kind, bypass=bypass, mode=mode, on_local=_on_local if mode == "hybrid" else None, shed=False
+                )
+                return {**line, "status": "ok", "cache": cache_status, "result": _format_response(result, name)}
+            except HTTPException as e:
+                return {**line, "status": "error", "error": str(e.detail)}
+            except LLMBusyError as e:
+                return {**line, "status": "error", "error": str(e), "retryAfter": e.retry_after}
+            except Exception as e:
+                print(e)
+                return {**line, "status": "error", "error": f"Error processing resume: {str(e)}"}
+
+    async def _run_one(index: int, item: Tuple[str, Optional[bytes], Optional[str]]) -> None:
+        await lines.put(await _score_one(index, *item))
+
+    async def _stream():
+        tasks = [asyncio.create_task(_run_one(i, item)) for i, item in enumerate(items)]
+        ok = finished = 0
+        try:
+            while finished < len(items):
+                line = await lines.get()
+                if line["type"] == "result":
+                    finished += 1
+                    ok += line["status"] == "ok"
+                yield json.dumps(line, ensure_ascii=False) + "\n"
+            yield json.dumps({"type": "summary", "total": len(items), "succeeded": ok, "failed": len(items) - ok}) + "\n"
+        finally:
+            # Client went away mid-stream: stop scoring the rest
+            for t in tasks:
+                t.cancel()
+
+    return StreamingResponse(_stream(), media_type="application/x-ndjson")
+
+
+def sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/ats-score/stream", openapi_extra=RESUME_UPLOAD_BODY)
+async def calculate_ats_score_stream(
+    request: Request,
+    authorization: Optional[str] = Header(None),
+    cache: Optional[str] = Query(None, description="Set to 'bypass' to skip the result cache and force a fresh run"),
+    mode: str = Query("full", description=MODE_DESCRIPTION),
+):
+    """
+    Same analysis as /ats-score, delivered as Server-Sent Events while the
+    model is still generating.
+
+    Events: `links`, `field`, `score`, then one `strength` / `improvement`
+    per bullet, and finally `result` carrying the full /ats-score response.
+    With mode=hybrid a `local` event (the mode=fast response) follows
+    `links`; mode=fast sends `links`, `local` and `result` only.
+    Failures after the stream has started arrive as an `error` event.
+    """
+    print("/ats-score/stream hit")
+    mode = _resolve_mode(mode)
+    filename, kind, file_bytes = await read_upload(request)
+    cache_key = ats_cache_key(file_bytes, local_only=mode == "fast")
+    bypass = cache == "bypass"
+    cached = None if bypass else ats_result_cache.get(cache_key)
+
+    extracted: Dict[str, Any] = {}
+    local: Dict[str, Any] = {}
+    if cached is None:
+        try:
+            extracted = await extract_resume(file_bytes, kind)
+            local = await score_locally(extracted)
+        except HTTPException:
+            raise
+        except Exception as e:
+            print(e)
+            raise HTTPException(status_code=500, detail=f"Error processing resume: {str(e)}")
+
+    async def _replay_cached():
+        yield sse_event("links", cached.get("links", {}))
+        if mode != "full" and cached.get("local"):
+            yield sse_event("local", _format_response(_local_result(cached["local"], cached.get("links", {})), filename))
+        if mode == "fast":
+            yield sse_event("result", _format_response(cached, filename))
+            return
+        if cached.get("field") is not None:
+            yield sse_event("field", cached["field"])
+        if cached.get("ats_score") is not None:
+            yield sse_event("score", cached["ats_score"])
+        for item in cached.get("strengths", []):
+            yield sse_event("strength", item)
+        for item in cached.get("improvements", []):
+            yield sse_event("improvement", item)
+        yield sse_event("result", _format_response(cached, filename))
+
+    async def _stream():
+        yield sse_event("links", extracted["links"])
+        if mode != "full":
+            local_result = _local_result(local, extracted["links"])
+            yield sse_event("local", _format_response(local_result, filename))
+            if mode == "fast":
+                ats_result_cache.set(cache_key, local_result)
+                yield sse_event("result", _format_response(local_result, filename))
+                return
+        parser = ATSStreamParser()
+        try:
+            async for chunk in astream_ats_score(extracted["text"]):
+                for event, value in parser.feed(chunk):
+                    yield sse_event(event, value)
+            for event, value in parser.close():
+                yield sse_event(event, value)
+        except LLMBusyError as e:
+            print(e)
+            yield sse_event("error", {"status": 429, "detail": "Too many resumes are being analyzed right now. Please retry shortly.", "retryAfter": e.retry_after})
+            return
+        except Exception as e:
+            print(e)
+            yield sse_event("error", {"status": 500, "detail": f"Error processing resume: {str(e)}"})
+            return
+
+        result = parser.result
+        result["links"] = extracted["links"]
+        result["local"] = local
+        if result.get("ats_score") is not None:
+            ats_result_cache.set(cache_key, result)
+        yield sse_event("result", _format_response(result, filename))
+
+    return StreamingResponse(
+        _replay_cached() if cached is not None else _stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+            "X-Cache": "hit" if cached is not None else ("bypass" if bypass else "miss"),
+        },
+    )
+
+
+@router.get("/ats-score/jobs/{job_id}")
+async def ats_commentary_job(job_id: str):
+    """
+    Status of the model analysis queued by a mode=hybrid /ats-score request.
+    `result` holds the full /ats-score response once the job has succeeded.
+    """
+    job = job_runner.queue.get(job_id)
+    if job is None or job["kind"] != ATS_COMMENTARY_JOB:
+        raise HTTPException(status_code=404, detail="Job not found")
+    job.pop("kind")
+    return job
+
+
+@router.get("/ats-score/cache-stats")
+async def ats_cache_stats():
+    """
+    Hit/miss counters for the ATS result cache (this worker's view).
+    """
+    return ats_result_cache.stats()
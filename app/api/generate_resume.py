@@ -1,28 +1,49 @@
 import asyncio
+import hmac
 import json
+import os
 import re
 import time
+import uuid
 from typing import Any, Dict, List, Optional, Sequence, Set
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 
-from app.services.genai_integration import model
-from app.services.supabase_client import get_supabase_client
+from app.services.arsenal import ARSENAL_RPC, ARSENAL_TABLES, project_rows, rpc_columns, select_clause
+from app.services.arsenal_cache import ARSENAL_VERSION_COLUMN, ArsenalVersion, arsenal_cache, arsenal_version
+from app.services.cache import build_cache, content_hash
+from app.services.genai_integration import ainvoke
+from app.services.job_queue import QueueFullError, job_runner
+from app.services.keyword_matcher import KeywordMatcher, normalize_token as _normalize_token
+from app.services.llm_limiter import LLMBusyError
+from app.services.metrics import span
+from app.services.ranking import resolve_engine, select_top, vector_scores
+from app.services.resume_persister import (
+    RESUME_PERSIST_MODE,
+    insert_resume_rows,
+    resume_persister,
+    resume_public_url,
+    upload_resume_file,
+)
+from app.services.serialization import STORAGE_EXTENSIONS, FastJSONResponse, encode_for_storage
+from app.services.skill_index import SkillIndex, get_skill_index
+from app.services.supabase_client import get_supabase_client, run_supabase
 
 
 router = APIRouter(prefix="/api", tags=["Resume Generation"])
 
 
-ARSENAL_TABLES: Sequence[str] = (
-    "personal_details",
-    "professional_summary",
-    "career_objectives",
-    "professional_experience",
-    "education",
-    "projects",
-    "skills",
-)
+# "auto" tries the get_user_arsenal RPC (one round trip) and falls back to
+# per-table selects if the function isn't deployed; "rpc" / "tables" force one.
+ARSENAL_FETCH_MODE = os.getenv("ARSENAL_FETCH_MODE", "auto")
+_arsenal_rpc_missing = False
+_arsenal_select_all: Set[str] = set()
+
+
+class ArsenalInvalidateRequest(BaseModel):
+    user_id: str = Field(..., min_length=1)
 
 
 class GenerateResumeRequest(BaseModel):
@@ -32,13 +53,8 @@ class GenerateResumeRequest(BaseModel):
     category: str = Field(..., min_length=1)
     sub_category: str = Field(..., min_length=1)
     single_page_only: bool = Field(default=False)
-
-
-def _normalize_token(s: str) -> str:
-    s = s.lower().strip()
-    s = re.sub(r"[^a-z0-9\+\#\.\-_/ ]+", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
+    # "keyword" (default), "tfidf" or "bm25"; unset uses RANKING_ENGINE
+    ranking_engine: Optional[str] = Field(default=None)
 
 
 def _unique_preserve_order(items: Sequence[str]) -> List[str]:
@@ -53,56 +69,152 @@ def _unique_preserve_order(items: Sequence[str]) -> List[str]:
     return out
 
 
-async def fetch_user_arsenal(user_id: str) -> Dict[str, List[Dict[str, Any]]]:
-    supabase = get_supabase_client()
-    print("fetch user arsenal: ", user_id)
-
+async def _fetch_arsenal_tables(supabase: Any, user_id: str) -> Dict[str, List[Dict[str, Any]]]:
     async def _fetch_table(table: str) -> List[Dict[str, Any]]:
         def _do() -> List[Dict[str, Any]]:
-            res = supabase.table(table).select("*").eq("user_id", user_id).execute()
+            columns = "*" if table in _arsenal_select_all else select_clause(table, ARSENAL_VERSION_COLUMN)
+            try:
+                res = supabase.table(table).select(columns).eq("user_id", user_id).execute()
+            except Exception as e:
+                # a listed column this deployment's table doesn't have (42703);
+                # fetch whole rows for that table from now on and project locally
+                if columns == "*" or ("42703" not in str(e) and "does not exist" not in str(e)):
+                    raise
+                print(f"arsenal select on {table} failed, selecting all columns: ", e)
+                _arsenal_select_all.add(table)
+                res = supabase.table(table).select("*").eq("user_id", user_id).execute()
             data = getattr(res, "data", None)
-            return data or []
+            return project_rows(table, data or [], ARSENAL_VERSION_COLUMN)
 
-        return await asyncio.to_thread(_do)
+        return await run_supabase(_do)
 
     results = await asyncio.gather(*[_fetch_table(t) for t in ARSENAL_TABLES])
     print("results: ", results)
-    thing_to_return = {t: results[i] for i, t in enumerate(ARSENAL_TABLES)}
+    return {t: results[i] for i, t in enumerate(ARSENAL_TABLES)}
+
+
+async def _fetch_arsenal_rpc(supabase: Any, user_id: str) -> Dict[str, List[Dict[str, Any]]]:
+    def _do() -> Any:
+        res = supabase.rpc(ARSENAL_RPC, {"p_user_id": user_id, "p_columns": rpc_columns(ARSENAL_VERSION_COLUMN)}).execute()
+        return getattr(res, "data", None)
+
+    data = await run_supabase(_do)
+    if not isinstance(data, dict):
+        raise RuntimeError(f"Unexpected {ARSENAL_RPC} response: {type(data).__name__}")
+    return {t: data.get(t) or [] for t in ARSENAL_TABLES}
+
+
+async def _fetch_arsenal(supabase: Any, user_id: str) -> Dict[str, List[Dict[str, Any]]]:
+    global _arsenal_rpc_missing
+    if ARSENAL_FETCH_MODE == "rpc" or (ARSENAL_FETCH_MODE == "auto" and not _arsenal_rpc_missing):
+        try:
+            return await _fetch_arsenal_rpc(supabase, user_id)
+        except Exception as e:
+            if ARSENAL_FETCH_MODE == "rpc":
+                raise
+            # PGRST202: function not deployed; stop trying it in this process
+            if "PGRST202" in str(e) or "Could not find the function" in str(e):
+                _arsenal_rpc_missing = True
+            print("arsenal rpc failed, falling back to per-table fetch: ", e)
+    return await _fetch_arsenal_tables(supabase, user_id)
+
+
+async def _probe_arsenal_version(supabase: Any, user_id: str) -> Optional[ArsenalVersion]:
+    """
+    Cheap revalidation: row count + newest version-column value per table,
+    one row and one column each. None if the probe can't be answered.
+    """
+    col = ARSENAL_VERSION_COLUMN
+
+    def _probe(table: str) -> tuple:
+        res = (
+            supabase.table(table)
+            .select(col, count="exact")
+            .eq("user_id", user_id)
+            .order(col, desc=True, nullsfirst=False)
+            .limit(1)
+            .execute()
+        )
+        data = getattr(res, "data", None) or []
+        newest = data[0].get(col) if data else None
+        return (getattr(res, "count", None) or 0, str(newest) if newest is not None else None)
+
+    try:
+        return list(await asyncio.gather(*[run_supabase(_probe, t) for t in ARSENAL_TABLES]))
+    except Exception as e:
+        print("arsenal version probe failed: ", e)
+        return None
+
+
+async def fetch_user_arsenal(user_id: str, supabase: Any = None, use_cache: bool = True) -> Dict[str, List[Dict[str, Any]]]:
+    supabase = supabase or get_supabase_client()
+    print("fetch user arsenal: ", user_id)
+
+    entry = arsenal_cache.get(user_id) if use_cache else None
+    if entry is not None:
+        if arsenal_cache.is_fresh(entry):
+            arsenal_cache.record(hit=True)
+            return entry["arsenal"]
+        if entry["version"] is not None:
+            version = await _probe_arsenal_version(supabase, user_id)
+            if version is not None and version == entry["version"]:
+                arsenal_cache.mark_checked(entry)
+                arsenal_cache.record(hit=True)
+                return entry["arsenal"]
+
+    arsenal_cache.record(hit=False)
+    thing_to_return = await _fetch_arsenal(supabase, user_id)
     print("thing to return: ", thing_to_return)
+    if use_cache:
+        arsenal_cache.put(user_id, thing_to_return, arsenal_version(thing_to_return, ARSENAL_TABLES))
     return thing_to_return
 
 
+KEYWORD_PROMPT = (
+    "Extract the most important resume keywords from the job description.\n"
+    "Return ONLY valid JSON in this shape:\n"
+    '{ "keywords": ["...", "..."] }\n'
+    "Rules:\n"
+    "- Include skills, tools, technologies, role titles, frameworks, and domain keywords\n"
+    "- 15 to 40 items\n"
+    "- Short phrases allowed (e.g., 'machine learning', 'REST APIs')\n"
+    "- No explanations, only JSON\n\n"
+    "JOB DESCRIPTION:\n"
+)
+KEYWORD_PROMPT_VERSION = content_hash(KEYWORD_PROMPT)[:12]
+
+# Popular postings get generated against over and over; only LLM-produced
+# lists are stored here (see extract_keywords).
+keyword_cache = build_cache("keywords", "KEYWORD_CACHE", max_entries=1024, ttl_seconds=7 * 24 * 3600, persist_by_default=True)
+
+
+def _keyword_cache_key(job_description: str) -> str:
+    return f"kw:{KEYWORD_PROMPT_VERSION}:{content_hash(_normalize_token(job_description))}"
+
+
 async def extract_keywords(job_description: str) -> List[str]:
     """
     First version: ask Gemini for a compact keyword list (skills/tools/roles).
     Falls back to simple regex token extraction if LLM output is invalid.
     """
-    prompt = (
-        "Extract the most important resume keywords from the job description.\n"
-        "Return ONLY valid JSON in this shape:\n"
-        '{ "keywords": ["...", "..."] }\n'
-        "Rules:\n"
-        "- Include skills, tools, technologies, role titles, frameworks, and domain keywords\n"
-        "- 15 to 40 items\n"
-        "- Short phrases allowed (e.g., 'machine learning', 'REST APIs')\n"
-        "- No explanations, only JSON\n\n"
-        "JOB DESCRIPTION:\n"
-        f"{job_description}"
-    )
+    cache_key = _keyword_cache_key(job_description)
+    cached = keyword_cache.get(cache_key)
+    if cached is not None:
+        return list(cached)
 
-    def _invoke() -> str:
-        return str(model.invoke(prompt).content)
+    prompt = KEYWORD_PROMPT + job_description
 
-    raw = await asyncio.to_thread(_invoke)
+    raw = str((await ainvoke(prompt)).content)
     try:
         data = json.loads(raw)
         kws = data.get("keywords", [])
         if not isinstance(kws, list):
             raise ValueError("keywords not a list")
         kws = [str(x) for x in kws]
-        return _unique_preserve_order(kws)
+        keywords = _unique_preserve_order(kws)
     except Exception:
-        # Fallback: naive extraction
+        # Fallback: naive extraction. Not cached, so a transient bad LLM
+        # response doesn't pin the regex list for this JD.
         text = _normalize_token(job_description)
         tokens = re.findall(r"[a-z0-9\+\#\.\-_/]{2,}", text)
         stop = {
@@ -114,6 +226,10 @@ async def extract_keywords(job_description: str) -> List[str]:
         tokens = [t for t in tokens if t not in stop]
         return _unique_preserve_order(tokens[:40])
 
+    if keywords:
+        keyword_cache.set(cache_key, keywords)
+    return keywords
+
 
 def _row_text(row: Dict[str, Any], preferred_fields: Sequence[str]) -> str:
     parts: List[str] = []
@@ -133,50 +249,248 @@ def _row_text(row: Dict[str, Any], preferred_fields: Sequence[str]) -> str:
 
 
 def _keyword_hit_score(text: str, keywords: Sequence[str]) -> int:
-    nt = _normalize_token(text)
-    score = 0
-    for kw in keywords:
-        nkw = _normalize_token(kw)
-        if not nkw:
-            continue
-        # simple substring match for v1
-        if nkw in nt:
-            score += 1
-    return score
-
-
-def filter_projects(projects: List[Dict[str, Any]], keywords: Sequence[str], limit: int = 5) -> List[Dict[str, Any]]:
-    scored: List[tuple[int, Dict[str, Any]]] = []
-    for p in projects:
-        # Supabase schema: project_name, project_description, tech_stack (array)
-        text = _row_text(p, ("project_name", "project_description", "tech_stack", "github_url", "project_url"))
-        scored.append((_keyword_hit_score(text, keywords), p))
+    # one-off scoring; the filters below share a single prebuilt matcher
+    return KeywordMatcher(keywords).score(text)
+
+
+def _rank_rows(
+    rows: List[Dict[str, Any]],
+    fields: Sequence[str],
+    keywords: Sequence[str],
+    limit: int,
+    matcher: Optional[KeywordMatcher],
+    engine: Optional[str],
+) -> List[Dict[str, Any]]:
+    engine = resolve_engine(engine)
+    texts = [_row_text(r, fields) for r in rows]
+    if engine != "keyword":
+        return [rows[i] for i in select_top(vector_scores(texts, keywords, engine), limit)]
+
+    matcher = matcher or KeywordMatcher(keywords)
+    scored: List[tuple[int, Dict[str, Any]]] = [(matcher.score(t), r) for t, r in zip(texts, rows)]
     scored.sort(key=lambda x: x[0], reverse=True)
     # keep strong matches; if none match, keep a few recent-ish items
-    filtered = [p for s, p in scored if s > 0][:limit]
-    return filtered if filtered else [p for _, p in scored[: min(limit, len(scored))]]
+    filtered = [r for s, r in scored if s > 0][:limit]
+    return filtered if filtered else [r for _, r in scored[: min(limit, len(scored))]]
 
 
-def filter_experience(experiences: List[Dict[str, Any]], keywords: Sequence[str], limit: int = 5) -> List[Dict[str, Any]]:
-    scored: List[tuple[int, Dict[str, Any]]] = []
-    for e in experiences:
-        # Supabase schema: position, company, description, location
-        text = _row_text(e, ("position", "company", "description", "location"))
-        scored.append((_keyword_hit_score(text, keywords), e))
-    scored.sort(key=lambda x: x[0], reverse=True)
-    filtered = [e for s, e in scored if s > 0][:limit]
-    return filtered if filtered else [e for _, e in scored[: min(limit, len(scored))]]
+def filter_projects(
+    projects: List[Dict[str, Any]],
+    keywords: Sequence[str],
+    limit: int = 5,
+    matcher: Optional[KeywordMatcher] = None,
+    engine: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    # Supabase schema: project_name, project_description, tech_stack (array)
+    fields = ("project_name", "project_description", "tech_stack", "github_url", "project_url")
+    return _rank_rows(projects, fields, keywords, limit, matcher, engine)
 
 
-def filter_skills(skills: List[Dict[str, Any]], keywords: Sequence[str], limit: int = 30) -> List[Dict[str, Any]]:
-    scored: List[tuple[int, Dict[str, Any]]] = []
-    for s in skills:
-        # Supabase schema: skill
-        text = _row_text(s, ("skill",))
-        scored.append((_keyword_hit_score(text, keywords), s))
-    scored.sort(key=lambda x: x[0], reverse=True)
-    filtered = [row for score, row in scored if score > 0][:limit]
-    return filtered if filtered else [row for _, row in scored[: min(limit, len(scored))]]
+def filter_experience(
+    experiences: List[Dict[str, Any]],
+    keywords: Sequence[str],
+    limit: int = 5,
+    matcher: Optional[KeywordMatcher] = None,
+    engine: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    # Supabase schema: position, company, description, location
+    fields = ("position", "company", "description", "location")
+    return _rank_rows(experiences, fields, keywords, limit, matcher, engine)
+
+
+def filter_skills(
+    skills: List[Dict[str, Any]],
+    keywords: Sequence[str],
+    limit: int = 30,
+    matcher: Optional[KeywordMatcher] = None,
+    engine: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    # Supabase schema: skill
+    return _rank_rows(skills, ("skill",), keywords, limit, matcher, engine)
+
+
+# "single": one LLM call per project (original behaviour).
+# "batched": one structured-JSON call for all selected projects; projects
+# missing or malformed in that output fall back to their own single call.
+PROJECT_REWRITE_MODE = os.getenv("PROJECT_REWRITE_MODE", "single")
+
+REWRITE_CONSTRAINTS = (
+    "Constraints:\n"
+    "- Do NOT add new tools/skills not present in the original project info\n"
+    "- Do NOT fabricate metrics or achievements\n"
+    "- Keep it concise, impact-oriented, ATS-friendly\n"
+)
+
+REWRITE_PROMPT_VERSION = content_hash(REWRITE_CONSTRAINTS)[:12]
+
+# Rewrites keyed on the project row's content (see _rewrite_key_fields) +
+# the canonical keyword set, so editing a project's name, description or
+# tech stack gets it a fresh rewrite.
+rewrite_cache = build_cache("rewrites", "REWRITE_CACHE", max_entries=4096, ttl_seconds=30 * 24 * 3600, persist_by_default=True)
+
+
+def _keyword_set_key(top_keywords: Sequence[str]) -> str:
+    return "\n".join(sorted({nk for nk in (_normalize_token(k) for k in top_keywords) if nk}))
+
+
+def _rewrite_key_fields(p: Dict[str, Any]) -> tuple[str, str, str, str, str]:
+    """
+    The row content a rewrite depends on: the Supabase columns
+    (project_name, project_description, tech_stack as a list, order-
+    insensitive) plus the generic names _project_fields falls back to.
+    """
+    tech = p.get("tech_stack") or p.get("technologies") or p.get("tools") or ""
+    if isinstance(tech, (list, tuple, set)):
+        tech = "\n".join(sorted(str(t).strip() for t in tech))
+    name, desc, _ = _project_fields(p)
+    return (
+        str(p.get("project_name") or "").strip(),
+        str(p.get("project_description") or "").strip(),
+        str(tech).strip(),
+        name,
+        desc,
+    )
+
+
+def _rewrite_cache_key(p: Dict[str, Any], keyword_set_key: str) -> str:
+    return f"rw:{REWRITE_PROMPT_VERSION}:{content_hash(*_rewrite_key_fields(p), keyword_set_key)}"
+
+
+# Per-mode counters so the two modes can be compared in production.
+REWRITE_STATS: Dict[str, Dict[str, float]] = {
+    mode: {
+        "requests": 0,
+        "llm_calls": 0,
+        "fallback_calls": 0,
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "llm_seconds": 0.0,
+        "wall_seconds": 0.0,
+    }
+    for mode in ("single", "batched")
+}
+
+
+async def _invoke_counted(prompt: str, mode: str, fallback: bool = False) -> str:
+    stats = REWRITE_STATS[mode]
+    t0 = time.perf_counter()
+    msg = await ainvoke(prompt)
+    usage = getattr(msg, "usage_metadata", None) or {}
+    stats["llm_calls"] += 1
+    stats["fallback_calls"] += fallback
+    stats["input_tokens"] += usage.get("input_tokens", 0)
+    stats["output_tokens"] += usage.get("output_tokens", 0)
+    stats["llm_seconds"] += time.perf_counter() - t0
+    return str(msg.content)
+
+
+def _project_fields(p: Dict[str, Any]) -> tuple[str, str, str]:
+    name = str(p.get("name") or p.get("title") or "Project").strip()
+    desc = str(p.get("description") or p.get("summary") or "").strip()
+    tech = str(p.get("tech_stack") or p.get("technologies") or p.get("tools") or "").strip()
+    return name, desc, tech
+
+
+def _with_description(p: Dict[str, Any], new_desc: Any) -> Optional[Dict[str, Any]]:
+    new_desc = str(new_desc or "").strip()
+    if not new_desc:
+        return None
+    out = dict(p)
+    out["description"] = new_desc
+    return out
+
+
+async def _rewrite_one(
+    p: Dict[str, Any],
+    job_description: str,
+    kw_str: str,
+    mode: str = "single",
+    fallback: bool = False,
+) -> Dict[str, Any]:
+    name, desc, tech = _project_fields(p)
+
+    prompt = (
+        "You are helping rewrite a resume project description to match a job description.\n"
+        + REWRITE_CONSTRAINTS
+        + "- Output ONLY JSON: {\"description\": \"...\"}\n\n"
+        f"JOB DESCRIPTION:\n{job_description}\n\n"
+        f"TARGET KEYWORDS (for phrasing only): {kw_str}\n\n"
+        f"PROJECT NAME: {name}\n"
+        f"PROJECT TECH (original): {tech}\n"
+        f"ORIGINAL DESCRIPTION:\n{desc}\n"
+    )
+
+    try:
+        raw = await _invoke_counted(prompt, mode, fallback)
+    except LLMBusyError as e:
+        # Rewriting is best-effort; keep the original under LLM back-pressure
+        print("skipping project rewrite: ", e)
+        return p
+    try:
+        data = json.loads(raw)
+        out = _with_description(p, data.get("description", ""))
+        if out is not None:
+            return out
+    except Exception:
+        pass
+    return p
+
+
+async def _rewrite_batched(
+    projects: List[Dict[str, Any]],
+    job_description: str,
+    kw_str: str,
+) -> List[Dict[str, Any]]:
+    """
+    Rewrite all projects in one call. The JD and keywords are sent once
+    instead of once per project.
+    """
+    blocks = []
+    for i, p in enumerate(projects):
+        name, desc, tech = _project_fields(p)
+        blocks.append(
+            f"[{i}]\n"
+            f"PROJECT NAME: {name}\n"
+            f"PROJECT TECH (original): {tech}\n"
+            f"ORIGINAL DESCRIPTION:\n{desc}\n"
+        )
+    prompt = (
+        "You are helping rewrite resume project descriptions to match a job description.\n"
+        + REWRITE_CONSTRAINTS
+        + "- Rewrite every project below; use each project's own info only\n"
+        "- Output ONLY JSON: {\"projects\": [{\"index\": 0, \"description\": \"...\"}]}\n"
+        "  with one entry per project index\n\n"
+        f"JOB DESCRIPTION:\n{job_description}\n\n"
+        f"TARGET KEYWORDS (for phrasing only): {kw_str}\n\n"
+        "PROJECTS:\n" + "\n".join(blocks)
+    )
+
+    rewritten: Dict[int, Dict[str, Any]] = {}
+    try:
+        raw = await _invoke_counted(prompt, "batched")
+    except LLMBusyError as e:
+        print("skipping project rewrite: ", e)
+        return projects
+    try:
+        items = json.loads(raw).get("projects", [])
+        for item in items if isinstance(items, list) else []:
+            if not isinstance(item, dict):
+                continue
+            idx = item.get("index")
+            if isinstance(idx, int) and 0 <= idx < len(projects) and idx not in rewritten:
+                out = _with_description(projects[idx], item.get("description"))
+                if out is not None:
+                    rewritten[idx] = out
+    except Exception as e:
+        print("batched rewrite output unusable, falling back per project: ", e)
+
+    missing = [i for i in range(len(projects)) if i not in rewritten]
+    if missing:
+        retried = await asyncio.gather(*[
+            _rewrite_one(projects[i], job_description, kw_str, mode="batched", fallback=True) for i in missing
+        ])
+        rewritten.update(zip(missing, retried))
+    return [rewritten[i] for i in range(len(projects))]
 
 
 async def enhance_with_llm(
@@ -184,6 +498,7 @@ async def enhance_with_llm(
     job_description: str,
     keywords: Sequence[str],
     single_page_only: bool,
+    mode: Optional[str] = None,
 ) -> List[Dict[str, Any]]:
     """
     Rewrite project descriptions to better align with JD (without inventing facts).
@@ -192,46 +507,42 @@ async def enhance_with_llm(
     if not projects:
         return projects
 
-    kw_str = ", ".join(_unique_preserve_order(list(keywords))[:25])
+    mode = mode or PROJECT_REWRITE_MODE
+    if mode not in REWRITE_STATS:
+        mode = "single"
+    top_keywords = _unique_preserve_order(list(keywords))[:25]
+    kw_str = ", ".join(top_keywords)
     max_projects = 4 if single_page_only else min(6, len(projects))
     to_enhance = projects[:max_projects]
 
-    async def _rewrite_one(p: Dict[str, Any]) -> Dict[str, Any]:
-        name = str(p.get("name") or p.get("title") or "Project").strip()
-        desc = str(p.get("description") or p.get("summary") or "").strip()
-        tech = str(p.get("tech_stack") or p.get("technologies") or p.get("tools") or "").strip()
-
-        prompt = (
-            "You are helping rewrite a resume project description to match a job description.\n"
-            "Constraints:\n"
-            "- Do NOT add new tools/skills not present in the original project info\n"
-            "- Do NOT fabricate metrics or achievements\n"
-            "- Keep it concise, impact-oriented, ATS-friendly\n"
-            "- Output ONLY JSON: {\"description\": \"...\"}\n\n"
-            f"JOB DESCRIPTION:\n{job_description}\n\n"
-            f"TARGET KEYWORDS (for phrasing only): {kw_str}\n\n"
-            f"PROJECT NAME: {name}\n"
-            f"PROJECT TECH (original): {tech}\n"
-            f"ORIGINAL DESCRIPTION:\n{desc}\n"
-        )
-
-        def _invoke() -> str:
-            return str(model.invoke(prompt).content)
+    # Serve memoized rewrites; only the rest go to the LLM
+    kw_key = _keyword_set_key(top_keywords)
+    cache_keys = [_rewrite_cache_key(p, kw_key) for p in to_enhance]
+    enhanced: List[Optional[Dict[str, Any]]] = [None] * len(to_enhance)
+    pending: List[int] = []
+    for i, (p, key) in enumerate(zip(to_enhance, cache_keys)):
+        cached = rewrite_cache.get(key)
+        enhanced[i] = _with_description(p, cached) if cached is not None else None
+        if enhanced[i] is None:
+            pending.append(i)
+
+    if pending:
+        todo = [to_enhance[i] for i in pending]
+        t0 = time.perf_counter()
+        if mode == "batched" and len(todo) > 1:
+            results = await _rewrite_batched(todo, job_description, kw_str)
+        else:
+            results = list(await asyncio.gather(*[_rewrite_one(p, job_description, kw_str, mode) for p in todo]))
+        REWRITE_STATS[mode]["requests"] += 1
+        REWRITE_STATS[mode]["wall_seconds"] += time.perf_counter() - t0
 
-        raw = await asyncio.to_thread(_invoke)
-        try:
-            data = json.loads(raw)
-            new_desc = str(data.get("description", "")).strip()
-            if new_desc:
-                out = dict(p)
-                out["description"] = new_desc
-                return out
-        except Exception:
-            pass
-        return p
+        for i, original, result in zip(pending, todo, results):
+            enhanced[i] = result
+            # only real rewrites are memoized, never the unchanged fallback
+            if result is not original:
+                rewrite_cache.set(cache_keys[i], result["description"])
 
-    enhanced = await asyncio.gather(*[_rewrite_one(p) for p in to_enhance])
-    return enhanced + projects[len(to_enhance) :]
+    return [p for p in enhanced if p is not None] + projects[len(to_enhance) :]
 
 
 def _extract_skill_names(skills_rows: List[Dict[str, Any]]) -> List[str]:
@@ -243,21 +554,14 @@ def _extract_skill_names(skills_rows: List[Dict[str, Any]]) -> List[str]:
     return _unique_preserve_order(names)
 
 
-def _matched_missing_skills(user_skills: List[str], keywords: Sequence[str]) -> Dict[str, List[str]]:
-    user_norm = {_normalize_token(s): s for s in user_skills if _normalize_token(s)}
-    kw_norm = {_normalize_token(k): k for k in keywords if _normalize_token(k)}
-
-    matched = []
-    missing = []
-
-    # matched: keywords that appear in user skills
-    for nkw, orig_kw in kw_norm.items():
-        for ns, orig_skill in user_norm.items():
-            if nkw and (nkw == ns or nkw in ns or ns in nkw):
-                matched.append(orig_skill)
-                break
-        else:
-            missing.append(orig_kw)
+def _matched_missing_skills(
+    user_skills: List[str],
+    keywords: Sequence[str],
+    index: Optional[SkillIndex] = None,
+) -> Dict[str, List[str]]:
+    # matched: keywords that appear in user skills (exact, containment or alias)
+    index = index or SkillIndex(user_skills)
+    matched, missing = index.matched_missing(keywords)
 
     return {
         "matched_skills": _unique_preserve_order(matched),
@@ -265,19 +569,32 @@ def _matched_missing_skills(user_skills: List[str], keywords: Sequence[str]) ->
     }
 
 
-@router.post("/generate-resume")
-async def generate_resume(payload: GenerateResumeRequest):
+async def _generate_resume(payload: GenerateResumeRequest) -> Dict[str, Any]:
     """
     Generate a JD-aligned resume from user's Arsenal in Supabase.
     V1 approach: keyword extraction + simple matching + LLM rewriting for projects.
     """
     try:
-        arsenal = await fetch_user_arsenal(payload.user_id)
+        engine = resolve_engine(payload.ranking_engine)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        with span("arsenal"):
+            arsenal = await fetch_user_arsenal(payload.user_id)
         print("got arsenal values")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch Supabase data: {str(e)}")
 
-    keywords = await extract_keywords(payload.job_description)
+    try:
+        with span("keywords"):
+            keywords = await extract_keywords(payload.job_description)
+    except LLMBusyError as e:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many resumes are being generated right now. Please retry shortly.",
+            headers={"Retry-After": str(e.retry_after)},
+        )
     print("got keywords")
     print("keywords: ", keywords)
 
@@ -290,21 +607,29 @@ async def generate_resume(payload: GenerateResumeRequest):
     edu_rows = arsenal.get("education", [])
     print("got all rows")
 
-    filtered_skills_rows = filter_skills(skills_rows, keywords, limit=30 if not payload.single_page_only else 18)
-    filtered_projects_rows = filter_projects(projects_rows, keywords, limit=6 if not payload.single_page_only else 4)
-    filtered_exp_rows = filter_experience(exp_rows, keywords, limit=6 if not payload.single_page_only else 4)
+    with span("rank"):
+        matcher = KeywordMatcher(keywords) if engine == "keyword" else None
+        filtered_skills_rows = filter_skills(skills_rows, keywords, limit=30 if not payload.single_page_only else 18, matcher=matcher, engine=engine)
+        filtered_projects_rows = filter_projects(projects_rows, keywords, limit=6 if not payload.single_page_only else 4, matcher=matcher, engine=engine)
+        filtered_exp_rows = filter_experience(exp_rows, keywords, limit=6 if not payload.single_page_only else 4, matcher=matcher, engine=engine)
 
     print("filtered skills and projects")
 
-    enhanced_projects = await enhance_with_llm(
-        filtered_projects_rows,
-        payload.job_description,
-        keywords,
-        payload.single_page_only,
-    )
+    with span("rewrite"):
+        enhanced_projects = await enhance_with_llm(
+            filtered_projects_rows,
+            payload.job_description,
+            keywords,
+            payload.single_page_only,
+        )
 
-    user_skill_names = _extract_skill_names(skills_rows)
-    skill_gap = _matched_missing_skills(user_skill_names, keywords)
+    with span("skill_gap"):
+        user_skill_names = _extract_skill_names(skills_rows)
+        skill_gap = _matched_missing_skills(
+            user_skill_names,
+            keywords,
+            index=get_skill_index(payload.user_id, user_skill_names),
+        )
 
     # Build personal_info from personal_details + professional_summary + career_objectives
     personal_info: Optional[Dict[str, Any]] = None
@@ -343,90 +668,212 @@ async def generate_resume(payload: GenerateResumeRequest):
     supabase = get_supabase_client()
 
     # ---------- Upload structured resume JSON to Supabase Storage (bucket: resumes) ----------
-    file_name = f"generated-resume-{int(time.time())}.json"
+    # random suffix: two resumes for the same user in the same second must not share a path
+    with span("serialize"):
+        file_bytes, content_encoding = encode_for_storage(structured_resume)
+    # compressed objects get .json.gz / .json.zst so readers know to decode them
+    file_ext = STORAGE_EXTENSIONS[content_encoding or "identity"]
+    file_name = f"generated-resume-{int(time.time())}-{uuid.uuid4().hex[:8]}.json{file_ext}"
     file_path = f"{payload.user_id}/{file_name}"
-    file_bytes = json.dumps(structured_resume, ensure_ascii=False, indent=2).encode("utf-8")
-
-    def _upload_and_insert():
-        # Upload to storage bucket "resumes"
-        # Explicitly set contentType so Storage doesn't reject JSON as text/plain.
-        # Upload JSON; some Supabase setups may enforce contentType.
-        # If your bucket still rejects this, consider allowing "text/plain" or
-        # changing this to "application/octet-stream" in your project.
+
+    persist_id: Optional[str] = None
+    if RESUME_PERSIST_MODE == "write_behind":
+        # The resumes row (and its id) only exists once the persister has
+        # uploaded and inserted it in the background; the client polls
+        # persist_id for the resume_id.
+        persist_id = str(uuid.uuid4())
         try:
-            print("uploading to storage")
-            storage_res = supabase.storage.from_("resumes").upload(
-                path=file_path,
-                file=file_bytes,
-                file_options={
-                    "content-type": "application/json"
-                }
-            )
-            print("upload to storage successful")
-        except TypeError:
-            # Fallback for clients that require explicit options but with strict typing
-            storage_res = supabase.storage.from_("resumes").upload(
-                file_path,
-                file_bytes,
-                {
-                    "content-type": "application/json"
-                }
+            with span("persist"):
+                await resume_persister.submit(
+                    persist_id, payload.user_id, file_name, file_path, file_bytes, "application/json", content_encoding
+                )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to queue resume for persistence: {str(e)}")
+        resume_id = None
+        persisted = False
+    else:
+        def _upload_and_insert():
+            upload_resume_file(supabase, file_path, file_bytes, content_encoding=content_encoding)
+            rows = insert_resume_rows(
+                supabase,
+                [{"user_id": payload.user_id, "file_name": file_name, "file_path": file_path}],
             )
-        # Older supabase-py returns a dict with possible "error" key; newer returns an object.
-        storage_error = None
-        if isinstance(storage_res, dict):
-            print("storage_res is a dict")
-            storage_error = storage_res.get("error")
-        else:
-            print("storage_res is not a dict")
-            storage_error = getattr(storage_res, "error", None)
-            print("storage_error: ", storage_error)
-            data_attr = getattr(storage_res, "data", None)
-            print("data_attr: ", data_attr)
-            if not storage_error and isinstance(data_attr, dict):
-                storage_error = data_attr.get("error")
-                print("storage_error: ", storage_error)
-        if storage_error:
-            print("storage_error: ", storage_error)
-            raise RuntimeError(f"Storage upload failed: {storage_error}")
-
-        # Insert row into resumes table
-        print("inserting row into resumes table")
-        db_res = supabase.table("resumes").insert(
-            {
-                "user_id": payload.user_id,
-                "file_name": file_name,
-                "file_path": file_path,
-            }
-        ).execute()
-        print("row inserted into resumes table")
-        data = getattr(db_res, "data", None)
-        if not data or not isinstance(data, list):
-            print("data is not a list")
-            raise RuntimeError(f"Invalid Supabase DB response: {data}")
-
-        row = data[0]
-        if not isinstance(row, dict) or "id" not in row:
-            print("row is not a dict or id is not in row")
-            raise RuntimeError(f"Unexpected resumes row: {row}")
-
-        # Public URL for the stored JSON (if bucket is public)
-        public = supabase.storage.from_("resumes").get_public_url(file_path)
-        public_url = getattr(public, "public_url", None) or getattr(public, "data", {}).get("publicUrl")  # type: ignore[union-attr]
-        print("public_url: ", public_url)
-        return row["id"], public_url
+            return rows[0]["id"]
 
-    try:
-        print("uploading and inserting resume")
-        resume_id, public_url = await asyncio.to_thread(_upload_and_insert)
-        print("resume uploaded and inserted")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to persist resume: {str(e)}")
+        try:
+            print("uploading and inserting resume")
+            with span("persist"):
+                resume_id = await run_supabase(_upload_and_insert)
+            print("resume uploaded and inserted")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to persist resume: {str(e)}")
+        persisted = True
 
     return {
         "resume_id": resume_id,
         "file_name": file_name,
         "file_path": file_path,
-        "file_url": public_url,
+        "file_url": resume_public_url(supabase, file_path),
+        "content_encoding": content_encoding,
+        "persisted": persisted,
+        "persist_id": persist_id,
+        "persist_status_url": f"/api/generate-resume/persist/{persist_id}" if persist_id else None,
         "data": structured_resume,
-    }
\ No newline at end of file
+    }
+
+
+async def _generate_resume_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return await _generate_resume(GenerateResumeRequest(**payload))
+
+
+job_runner.register("generate_resume", _generate_resume_job)
+
+
+@router.post("/generate-resume")
+async def generate_resume(
+    payload: GenerateResumeRequest,
+    run_async: bool = Query(False, alias="async"),
+):
+    """
+    Generate a JD-aligned resume from user's Arsenal in Supabase.
+
+    With ?async=true the request is queued instead: the response is 202 with
+    a job id, and the result is fetched from GET /api/generate-resume/jobs/{id}.
+    """
+    if not run_async:
+        # rendered straight from the dict by the fast encoder, skipping jsonable_encoder
+        return FastJSONResponse(await _generate_resume(payload))
+
+    try:
+        resolve_engine(payload.ranking_engine)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        job_id = await job_runner.submit("generate_resume", payload.model_dump())
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many resumes are queued right now. Please retry shortly.",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+    status_url = f"/api/generate-resume/jobs/{job_id}"
+    return JSONResponse(
+        status_code=202,
+        content={"job_id": job_id, "status": "queued", "status_url": status_url},
+        headers={"Location": status_url},
+    )
+
+
+@router.get("/generate-resume/jobs/stats")
+async def generate_resume_job_stats():
+    """
+    Queue depth and worker utilisation for async resume generation
+    (queued jobs are shared across workers; busy/workers are this worker's).
+    """
+    return job_runner.stats()
+
+
+@router.get("/generate-resume/jobs/{job_id}")
+async def generate_resume_job(job_id: str):
+    """
+    Status of an async resume generation job. `result` holds the same body
+    the synchronous endpoint returns once the job has succeeded.
+    """
+    job = job_runner.queue.get(job_id)
+    if job is None or job["kind"] != "generate_resume":
+        raise HTTPException(status_code=404, detail="Job not found")
+    job.pop("kind")
+    return FastJSONResponse(job)
+
+
+def _check_webhook_secret(provided: Optional[str]) -> None:
+    """
+    Both invalidation routes are refused outright until ARSENAL_WEBHOOK_SECRET
+    is configured; otherwise anyone could keep evicting users' arsenals.
+    """
+    secret = os.getenv("ARSENAL_WEBHOOK_SECRET")
+    if not secret:
+        raise HTTPException(status_code=503, detail="Arsenal invalidation is disabled: ARSENAL_WEBHOOK_SECRET is not set")
+    if not hmac.compare_digest(provided or "", secret):
+        raise HTTPException(status_code=401, detail="Invalid webhook secret")
+
+
+@router.post("/arsenal/invalidate")
+async def invalidate_arsenal(
+    payload: ArsenalInvalidateRequest,
+    x_webhook_secret: Optional[str] = Header(None),
+):
+    """
+    Drop the cached arsenal for a user, called after the user edits anything
+    in their Arsenal. Needs the X-Webhook-Secret header, so call it from a
+    backend, not the browser.
+    """
+    _check_webhook_secret(x_webhook_secret)
+    arsenal_cache.invalidate(payload.user_id)
+    return {"invalidated": True, "user_id": payload.user_id}
+
+
+@router.post("/arsenal/webhook")
+async def arsenal_webhook(
+    event: Dict[str, Any],
+    x_webhook_secret: Optional[str] = Header(None),
+):
+    """
+    Receiver for Supabase database webhooks on the arsenal tables
+    (INSERT / UPDATE / DELETE). Set ARSENAL_WEBHOOK_SECRET and send it in
+    the X-Webhook-Secret header.
+    """
+    _check_webhook_secret(x_webhook_secret)
+
+    if event.get("table") not in ARSENAL_TABLES:
+        return {"invalidated": False}
+
+    user_ids = {
+        rec.get("user_id")
+        for rec in (event.get("record"), event.get("old_record"))
+        if isinstance(rec, dict) and rec.get("user_id")
+    }
+    for user_id in user_ids:
+        arsenal_cache.invalidate(str(user_id))
+    return {"invalidated": bool(user_ids), "user_ids": sorted(str(u) for u in user_ids)}
+
+
+@router.get("/arsenal/cache-stats")
+async def arsenal_cache_stats():
+    """
+    Hit/miss counters for the per-user arsenal cache (this worker's view).
+    """
+    return arsenal_cache.stats()
+
+
+@router.get("/generate-resume/persist-stats")
+async def persist_stats():
+    """
+    Write-behind outbox backlog (shared across workers) and this worker's
+    upload/insert counters.
+    """
+    return resume_persister.stats()
+
+
+@router.get("/generate-resume/persist/{persist_id}")
+async def persist_status(persist_id: str):
+    """
+    Where a write-behind resume is: `pending`, `stored` (with its
+    resume_id) or `dead`. Answered from the outbox shared by this host's
+    workers; stored entries are kept for RESUME_OUTBOX_KEEP_SECONDS.
+    """
+    status = await asyncio.to_thread(resume_persister.outbox.status, persist_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Unknown persist_id")
+    return status
+
+
+@router.get("/generate-resume/rewrite-stats")
+async def rewrite_stats():
+    """
+    LLM call, token and latency counters for project rewriting, per mode,
+    plus rewrite-cache hit rates (this worker's view).
+    """
+    return {"mode": PROJECT_REWRITE_MODE, "modes": REWRITE_STATS, "cache": rewrite_cache.stats()}
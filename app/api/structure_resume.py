@@ -0,0 +1,144 @@
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.api.ats_score import RESUME_UPLOAD_BODY, extract_resume, read_upload, sse_event
+from app.schemas.schemas import ResumeSections
+from app.services.json_stream import TopLevelJSONStream
+from app.services.llm_limiter import LLMBusyError
+from app.services.resume_structurer import (
+    astream_structure_resume,
+    astructure_resume,
+    structure_cache_key,
+    structure_result_cache,
+    with_links,
+)
+
+router = APIRouter(prefix="/api", tags=["Resume Structuring"])
+
+BUSY_DETAIL = "Too many resumes are being analyzed right now. Please retry shortly."
+PARSE_DETAIL = "Could not read structured sections from the model's response. Please retry."
+
+
+@router.post("/structure-resume", openapi_extra=RESUME_UPLOAD_BODY)
+async def structure_resume_endpoint(
+    request: Request,
+    authorization: Optional[str] = Header(None),
+    cache: Optional[str] = Query(None, description="Set to 'bypass' to skip the result cache and force a fresh run"),
+):
+    """
+    Upload a PDF or DOCX resume and get it back as ResumeSections JSON, with
+    personal_information.links holding every link found in the file.
+    """
+    print("/structure-resume hit")
+    _, kind, file_bytes = await read_upload(request)
+    cache_key = structure_cache_key(file_bytes)
+    bypass = cache == "bypass"
+    if not bypass:
+        cached = structure_result_cache.get(cache_key)
+        if cached is not None:
+            return JSONResponse(content=cached, headers={"X-Cache": "hit"})
+
+    try:
+        extracted = await extract_resume(file_bytes, kind)
+        sections = await astructure_resume(extracted["text"])
+    except HTTPException:
+        raise
+    except LLMBusyError as e:
+        print(e)
+        raise HTTPException(status_code=429, detail=BUSY_DETAIL, headers={"Retry-After": str(e.retry_after)})
+    except ValueError as e:
+        # malformed model output; not cached, so a retry gets a fresh answer
+        print(e)
+        raise HTTPException(status_code=502, detail=PARSE_DETAIL)
+    except Exception as e:
+        print(e)
+        raise HTTPException(status_code=500, detail=f"Error processing resume: {str(e)}")
+
+    result = with_links(sections.model_dump(), extracted["links"])
+    structure_result_cache.set(cache_key, result)
+    return JSONResponse(content=result, headers={"X-Cache": "bypass" if bypass else "miss"})
+
+
+@router.post("/structure-resume/stream", openapi_extra=RESUME_UPLOAD_BODY)
+async def structure_resume_stream(
+    request: Request,
+    authorization: Optional[str] = Header(None),
+    cache: Optional[str] = Query(None, description="Set to 'bypass' to skip the result cache and force a fresh run"),
+):
+    """
+    Same result as /structure-resume, delivered as Server-Sent Events while
+    the model is still generating.
+
+    Events: one `section` ({"key", "value"}) per top-level ResumeSections key
+    as soon as its value is complete in the model's output, then `result`
+    carrying the validated /structure-resume response. Section values are as
+    the model wrote them; `result` is authoritative (links merged, schema
+    checked). Failures after the stream has started arrive as an `error` event.
+    """
+    print("/structure-resume/stream hit")
+    _, kind, file_bytes = await read_upload(request)
+    cache_key = structure_cache_key(file_bytes)
+    bypass = cache == "bypass"
+    cached = None if bypass else structure_result_cache.get(cache_key)
+
+    extracted: Dict[str, Any] = {}
+    if cached is None:
+        try:
+            extracted = await extract_resume(file_bytes, kind)
+        except HTTPException:
+            raise
+        except Exception as e:
+            print(e)
+            raise HTTPException(status_code=500, detail=f"Error processing resume: {str(e)}")
+
+    async def _replay_cached():
+        for key, value in cached.items():
+            yield sse_event("section", {"key": key, "value": value})
+        yield sse_event("result", cached)
+
+    async def _stream():
+        parser = TopLevelJSONStream()
+        try:
+            async for chunk in astream_structure_resume(extracted["text"]):
+                for key, value in parser.feed(chunk):
+                    if key == "personal_information" and isinstance(value, dict):
+                        value = with_links({key: value}, extracted["links"])[key]
+                    yield sse_event("section", {"key": key, "value": value})
+            # validation errors are ValueErrors too
+            sections = ResumeSections.model_validate(parser.close()).model_dump()
+        except LLMBusyError as e:
+            print(e)
+            yield sse_event("error", {"status": 429, "detail": BUSY_DETAIL, "retryAfter": e.retry_after})
+            return
+        except ValueError as e:
+            print(e)
+            yield sse_event("error", {"status": 502, "detail": PARSE_DETAIL})
+            return
+        except Exception as e:
+            print(e)
+            yield sse_event("error", {"status": 500, "detail": f"Error processing resume: {str(e)}"})
+            return
+
+        result = with_links(sections, extracted["links"])
+        structure_result_cache.set(cache_key, result)
+        yield sse_event("result", result)
+
+    return StreamingResponse(
+        _replay_cached() if cached is not None else _stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+            "X-Cache": "hit" if cached is not None else ("bypass" if bypass else "miss"),
+        },
+    )
+
+
+@router.get("/structure-resume/cache-stats")
+async def structure_cache_stats():
+    """
+    Hit/miss counters for the structured-resume cache (this worker's view).
+    """
+    return structure_result_cache.stats()
@@ -0,0 +1,78 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+ARSENAL_TABLES: Sequence[str] = (
+    "personal_details",
+    "professional_summary",
+    "career_objectives",
+    "professional_experience",
+    "education",
+    "projects",
+    "skills",
+)
+
+# Postgres function that returns every arsenal table for a user in one
+# round trip (supabase/migrations/*_get_user_arsenal.sql).
+ARSENAL_RPC = "get_user_arsenal"
+
+# Columns fetched per table, by both the RPC (which receives this list as
+# p_columns) and the per-table fallback select(). Projects, experience and
+# skills are ranked on the fields _row_text reads (see filter_projects &co.)
+# and returned as-is; the summary and objective rows contribute one field
+# each. `id` keeps rows addressable and the version column is added by
+# arsenal_columns() for revalidation.
+#
+# None = the whole row minus INTERNAL_COLUMNS: personal_details and education
+# are copied into the resume JSON verbatim, so every column there is resume
+# content and no fixed list would survive the user-facing schema growing.
+ARSENAL_COLUMNS: Dict[str, Optional[Tuple[str, ...]]] = {
+    "personal_details": None,
+    "professional_summary": ("id", "professional_summary"),
+    "career_objectives": ("id", "career_objective"),
+    "professional_experience": ("id", "position", "company", "description", "location"),
+    "education": None,
+    "projects": ("id", "project_name", "project_description", "tech_stack", "github_url", "project_url"),
+    "skills": ("id", "skill"),
+}
+
+# Never returned for whole-row tables: user_id is the filter itself,
+# created_at is never shown, and personal_details.id is stripped from the
+# resume JSON.
+INTERNAL_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "personal_details": ("id", "user_id", "created_at"),
+}
+DEFAULT_INTERNAL_COLUMNS: Tuple[str, ...] = ("user_id", "created_at")
+
+
+def internal_columns(table: str) -> Tuple[str, ...]:
+    return INTERNAL_COLUMNS.get(table, DEFAULT_INTERNAL_COLUMNS)
+
+
+def arsenal_columns(table: str, version_column: str) -> Optional[Tuple[str, ...]]:
+    """The column list for `table` (plus the version column), or None for whole rows."""
+    cols = ARSENAL_COLUMNS.get(table)
+    if cols is None or version_column in cols:
+        return cols
+    return cols + (version_column,)
+
+
+def select_clause(table: str, version_column: str) -> str:
+    cols = arsenal_columns(table, version_column)
+    return ",".join(cols) if cols else "*"
+
+
+def rpc_columns(version_column: str) -> Dict[str, Optional[List[str]]]:
+    """p_columns for the get_user_arsenal RPC."""
+    out: Dict[str, Optional[List[str]]] = {}
+    for t in ARSENAL_TABLES:
+        cols = arsenal_columns(t, version_column)
+        out[t] = list(cols) if cols else None
+    return out
+
+
+def project_rows(table: str, rows: List[Dict[str, Any]], version_column: str) -> List[Dict[str, Any]]:
+    """Apply the same projection as the RPC to rows fetched with select('*')."""
+    cols = arsenal_columns(table, version_column)
+    if cols is None:
+        drop = internal_columns(table)
+        return [{k: v for k, v in r.items() if k not in drop} for r in rows]
+    return [{k: r[k] for k in cols if k in r} for r in rows]
@@ -0,0 +1,123 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.services import metrics
+from app.services.cache import LRUCache, SQLiteCache, durable_path
+
+# (row count, newest version-column value) per table
+ArsenalVersion = List[Tuple[int, Optional[str]]]
+
+ARSENAL_VERSION_COLUMN = os.getenv("ARSENAL_VERSION_COLUMN", "updated_at")
+
+
+def arsenal_version(arsenal: Dict[str, List[Dict[str, Any]]], tables: Sequence[str]) -> Optional[ArsenalVersion]:
+    """
+    Version fingerprint of fully fetched rows, comparable with a cheap
+    per-table probe. None when the tables don't carry the version column.
+    """
+    out: ArsenalVersion = []
+    for t in tables:
+        rows = arsenal.get(t, [])
+        if rows and ARSENAL_VERSION_COLUMN not in rows[0]:
+            return None
+        stamps = [str(r[ARSENAL_VERSION_COLUMN]) for r in rows if r.get(ARSENAL_VERSION_COLUMN) is not None]
+        out.append((len(rows), max(stamps) if stamps else None))
+    return out
+
+
+class ArsenalCache:
+    """
+    Per-user arsenal cache.
+
+    Entries are served as-is for `fresh_seconds`. After that they are
+    revalidated against a cheap version probe (row count + newest
+    `updated_at` per table) and only re-downloaded when that changed. Nothing
+    outlives `ttl_seconds`.
+
+    invalidate() drops a user's entry. With a shared path configured
+    (ARSENAL_CACHE_PATH or CACHE_DIR), invalidations are also written to
+    SQLite, so the other uvicorn workers drop their copies on the next lookup.
+    """
+
+    def __init__(self, ttl_seconds: float, fresh_seconds: float, max_entries: int = 2048, shared_path: Optional[str] = None):
+        self.fresh_seconds = fresh_seconds
+        self._entries = LRUCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._invalidations: Optional[SQLiteCache] = None
+        if shared_path:
+            self._invalidations = SQLiteCache(shared_path, table="arsenal_invalidations", ttl_seconds=ttl_seconds)
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def _count(self, attr: str) -> None:
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Entry dict {"arsenal", "version", "fetched_at", "checked_at"} or None."""
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        if self._invalidations is not None:
+            try:
+                invalidated_at = self._invalidations.get(user_id)
+            except sqlite3.Error as e:
+                print("arsenal cache: invalidation lookup failed: ", e)
+                invalidated_at = None
+            if invalidated_at is not None and invalidated_at >= entry["fetched_at"]:
+                self._entries.delete(user_id)
+                return None
+        return entry
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        return time.time() - entry["checked_at"] < self.fresh_seconds
+
+    def put(self, user_id: str, arsenal: Dict[str, List[Dict[str, Any]]], version: Optional[ArsenalVersion]) -> None:
+        now = time.time()
+        self._entries.set(
+            user_id,
+            {"arsenal": arsenal, "version": version, "fetched_at": now, "checked_at": now},
+        )
+
+    def mark_checked(self, entry: Dict[str, Any]) -> None:
+        entry["checked_at"] = time.time()
+        self._count("revalidated")
+
+    def record(self, hit: bool) -> None:
+        self._count("hits" if hit else "misses")
+
+    def invalidate(self, user_id: str) -> None:
+        self._entries.delete(user_id)
+        self._count("invalidations")
+        if self._invalidations is not None:
+            try:
+                self._invalidations.set(user_id, time.time())
+            except sqlite3.Error as e:
+                print("arsenal cache: invalidation write failed: ", e)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "name": "arsenal",
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "revalidated": self.revalidated,
+            "invalidations": self.invalidations,
+            "entries": len(self._entries),
+            "shared": self._invalidations is not None,
+        }
+
+
+arsenal_cache = ArsenalCache(
+    ttl_seconds=float(os.getenv("ARSENAL_CACHE_TTL_SECONDS", "3600")),
+    fresh_seconds=float(os.getenv("ARSENAL_CACHE_FRESH_SECONDS", "30")),
+    max_entries=int(os.getenv("ARSENAL_CACHE_MAX_ENTRIES", "2048")),
+    shared_path=durable_path("ARSENAL_CACHE_PATH", "arsenal.sqlite3"),
+)
+metrics.register_cache("arsenal", arsenal_cache.stats)
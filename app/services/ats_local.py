@@ -0,0 +1,370 @@
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+# ------------------ LOCAL ATS SCORER ------------------
+# Deterministic, rule-based pre-score over the extracted resume text: no model
+# call, a few milliseconds per resume. Bump SCORER_VERSION whenever the rules,
+# vocabularies or weights change; it is part of the ATS cache keys.
+SCORER_VERSION = "local-1"
+
+WEIGHTS = {"keywordRelevance": 0.35, "experience": 0.30, "formatting": 0.20, "readability": 0.15}
+
+# Per-field vocabularies. The first terms of each list are the core ones
+# suggested when missing. Matching is case-insensitive on whole terms.
+FIELD_VOCABULARIES: Dict[str, Tuple[str, ...]] = {
+    "Software Engineering": (
+        "python", "java", "javascript", "typescript", "sql", "git", "rest", "apis", "docker", "kubernetes",
+        "aws", "azure", "gcp", "react", "node.js", "c++", "c#", "golang", "rust", "microservices", "ci/cd",
+        "linux", "postgresql", "mysql", "mongodb", "redis", "kafka", "graphql", "django", "flask", "fastapi",
+        "spring", "terraform", "unit testing", "agile", "scrum", "distributed systems", "system design",
+        "backend", "frontend", "full stack", "software engineer", "developer",
+    ),
+    "Data Science": (
+        "python", "sql", "machine learning", "statistics", "pandas", "numpy", "scikit-learn", "tensorflow",
+        "pytorch", "deep learning", "nlp", "data analysis", "data visualization", "tableau", "power bi",
+        "spark", "airflow", "regression", "classification", "a/b testing", "feature engineering", "jupyter",
+        "matplotlib", "etl", "data pipeline", "computer vision", "llm", "data scientist", "analytics",
+    ),
+    "Sales": (
+        "quota", "pipeline", "crm", "salesforce", "lead generation", "prospecting", "cold calling",
+        "negotiation", "closing", "account management", "b2b", "b2c", "revenue", "territory", "hubspot",
+        "client relationships", "upselling", "cross-selling", "forecasting", "sales cycle", "deals",
+        "business development", "account executive", "customer acquisition",
+    ),
+    "Marketing": (
+        "seo", "sem", "content marketing", "social media", "google analytics", "campaigns", "brand",
+        "email marketing", "ppc", "conversion rate", "marketing automation", "hubspot", "copywriting",
+        "market research", "digital marketing", "engagement", "roi", "ctr", "go-to-market", "growth",
+        "influencer", "product marketing", "adwords", "marketing strategy",
+    ),
+    "Medical": (
+        "patient care", "clinical", "diagnosis", "treatment", "ehr", "emr", "hipaa", "nursing", "triage",
+        "medication", "surgery", "icu", "bls", "acls", "cpr", "patient safety", "vital signs", "hospital",
+        "physician", "pharmacology", "healthcare", "rn", "mbbs", "clinical trials",
+    ),
+    "Finance": (
+        "financial analysis", "financial modeling", "excel", "valuation", "forecasting", "budgeting",
+        "accounting", "gaap", "ifrs", "audit", "reconciliation", "variance analysis", "p&l", "dcf",
+        "investment", "portfolio", "risk management", "cfa", "cpa", "bloomberg", "equity research",
+        "tax", "compliance", "financial reporting", "treasury",
+    ),
+}
+
+# heading -> aliases, matched at the start of a line
+SECTION_HEADINGS: Dict[str, Tuple[str, ...]] = {
+    "summary": ("professional summary", "career objective", "summary", "profile", "objective", "about me"),
+    "experience": (
+        "professional experience", "work experience", "employment history", "work history",
+        "experience", "internships", "internship", "employment", "work",
+    ),
+    "education": ("education", "academic background", "academics", "qualifications"),
+    "skills": ("technical skills", "core competencies", "key skills", "skills", "technologies", "tech stack"),
+    "projects": ("personal projects", "academic projects", "projects"),
+    "certifications": ("licenses & certifications", "certifications", "certificates", "licenses"),
+    "achievements": ("achievements", "awards", "honors", "accomplishments"),
+}
+CORE_SECTIONS = ("experience", "education", "skills")
+
+ACTION_VERBS = frozenset((
+    "achieved", "analyzed", "architected", "automated", "boosted", "built", "collaborated", "conducted",
+    "coordinated", "created", "cut", "decreased", "delivered", "deployed", "designed", "developed",
+    "directed", "drove", "enabled", "engineered", "established", "executed", "expanded", "generated",
+    "grew", "handled", "identified", "implemented", "improved", "increased", "initiated", "integrated",
+    "introduced", "launched", "led", "maintained", "managed", "mentored", "migrated", "modernized",
+    "negotiated", "optimized", "orchestrated", "organized", "oversaw", "owned", "partnered", "planned",
+    "prepared", "presented", "produced", "reduced", "refactored", "resolved", "revamped", "saved",
+    "scaled", "secured", "shipped", "simplified", "spearheaded", "streamlined", "supervised", "trained",
+    "transformed", "won", "wrote",
+))
+
+# glyph bullets are stripped by the extractors; ASCII markers survive
+_BULLET_RE = re.compile(r"^\s*(?:[-*>o]|\d{1,2}[.)])\s+")
+_WORD_RE = re.compile(r"[A-Za-z][A-Za-z'+#.-]*")
+# both anchor on the number itself, so the scan only tries at "$" and digits
+_QUANTIFIED_RE = re.compile(
+    r"\$\s?\d[\d,]*(?:\.\d+)?(?:\s?(?:k|m|bn?|million|billion|thousand)\b)?"
+    r"|(?<![\w.$])\d[\d,]*(?:\.\d+)?\+?\s?(?:%|(?:x|k|m|bn|million|billion|thousand)\b"
+    r"|(?:users|customers|clients|people|engineers|members|projects|requests|transactions|accounts|hours"
+    r"|employees|students|patients|deals|leads|downloads|stores|teams|countries)\b)",
+    re.I,
+)
+# the months before the first year don't change the count, only the second is matched
+_DATE_RANGE_RE = re.compile(
+    r"(?<!\d)(?:19|20)\d\d\s*(?:-|to)?\s*(?:[a-z]{3,9}\.?\s+)?(?:(?:19|20)\d\d(?!\d)|present\b|current\b|now\b)",
+    re.I,
+)
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+_PHONE_RE = re.compile(r"\+?\(?\d[\d\s().-]{8,18}\d")
+_PROFILE_RE = re.compile(r"linkedin\.com/|github\.com/", re.I)
+_SENTENCE_END_RE = re.compile(r"[.!?]+(?:\s+|$)")
+_VOWEL_GROUP_RE = re.compile(r"[aeiouy]+")
+
+
+def _term_pattern(terms) -> "re.Pattern[str]":
+    # lookarounds instead of \b so terms like c++, c#, node.js and ci/cd match
+    alternation = "|".join(re.escape(t) for t in sorted(set(terms), key=len, reverse=True))
+    return re.compile(rf"(?<![a-z0-9])(?:{alternation})(?![a-z0-9])")
+
+
+_FIELD_TERMS = {field: frozenset(terms) for field, terms in FIELD_VOCABULARIES.items()}
+_TERMS_RE = _term_pattern(t for terms in FIELD_VOCABULARIES.values() for t in terms)
+_HEADING_PATTERNS = {
+    section: re.compile(rf"^\s*({'|'.join(re.escape(a) for a in aliases)})\b\s*[:|-]?", re.I)
+    for section, aliases in SECTION_HEADINGS.items()
+}
+
+# ------------------ READABILITY ------------------
+# textstat is imported on first use (it pulls in nltk). Its English syllable
+# counts come from the CMU dictionary, which nltk downloads on first use; where
+# that is not possible the same Flesch formula runs on a vowel-group syllable
+# estimate instead, and textstat is not retried for the life of the process.
+_textstat_ok: Optional[bool] = None
+
+
+def _syllables(word: str) -> int:
+    word = word.strip("'.-")
+    count = len(_VOWEL_GROUP_RE.findall(word))
+    if word.endswith("e") and not word.endswith(("le", "ee")) and count > 1:
+        count -= 1
+    return max(count, 1)
+
+
+def flesch_reading_ease(text: str) -> float:
+    """Flesch reading ease of `text`; lines without end punctuation count as sentences."""
+    global _textstat_ok
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    prose = " ".join(line if line.endswith((".", "!", "?")) else line + "." for line in lines)
+    if not prose:
+        return 0.0
+    if _textstat_ok is not False:
+        try:
+            import textstat
+
+            value = float(textstat.flesch_reading_ease(prose))
+            _textstat_ok = True
+            return value
+        except Exception as e:
+            _textstat_ok = False
+            print(f"textstat unavailable, using built-in readability estimate: {type(e).__name__}")
+    words = Counter(w.lower() for w in _WORD_RE.findall(prose))
+    word_count = sum(words.values())
+    if not word_count:
+        return 0.0
+    sentences = max(len(_SENTENCE_END_RE.findall(prose)), 1)
+    syllables = sum(_syllables(w) * n for w, n in words.items())
+    return 206.835 - 1.015 * (word_count / sentences) - 84.6 * (syllables / word_count)
+
+
+# ------------------ SIGNALS ------------------
+def _sections(lines: List[str]) -> Dict[str, int]:
+    """Section name -> line index of its heading (first occurrence)."""
+    found: Dict[str, int] = {}
+    for i, line in enumerate(lines):
+        words = len(line.split())
+        for section, pattern in _HEADING_PATTERNS.items():
+            if section in found:
+                continue
+            match = pattern.match(line)
+            if not match:
+                continue
+            # a heading on its own line, in capitals, or followed by a colon
+            # (PDF blocks often merge the heading with the first entry)
+            heading = match.group(1)
+            if words <= 4 or heading.isupper() or line[match.end(1):].lstrip().startswith(":"):
+                found[section] = i
+                break
+    return found
+
+
+def _is_bullet(line: str) -> Tuple[bool, bool]:
+    """(is a bullet, starts with an action verb)."""
+    marker = _BULLET_RE.match(line)
+    rest = line[marker.end():] if marker else line
+    first = rest.split(maxsplit=1)[0].lower().strip(",.:;") if rest.strip() else ""
+    verb = first in ACTION_VERBS
+    return bool(marker) or (verb and len(rest.split()) >= 4), verb
+
+
+def _keyword_signals(lowered: str, word_count: int) -> Tuple[str, Dict[str, Any]]:
+    # one scan for every vocabulary, then tallied per field
+    counts: Dict[str, int] = {}
+    for match in _TERMS_RE.finditer(lowered):
+        counts[match.group()] = counts.get(match.group(), 0) + 1
+    best_field, best = "General", {"distinct": 0, "total": 0, "matched": []}
+    for field, terms in _FIELD_TERMS.items():
+        hits = {t: counts[t] for t in terms if t in counts}
+        key = (len(hits), sum(hits.values()))
+        if key > (best["distinct"], best["total"]):
+            best_field = field
+            best = {"distinct": key[0], "total": key[1], "matched": sorted(hits, key=hits.get, reverse=True)}
+    best["density"] = round(100.0 * best["total"] / word_count, 2) if word_count else 0.0
+    return best_field, best
+
+
+def _clamp(value: float) -> int:
+    return int(round(min(max(value, 0.0), 100.0)))
+
+
+# ------------------ SCORER ------------------
+def local_ats_score(text: str, links: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Score resume text without a model call. Returns the parse_ats_response
+    keys (field, ats_score, strengths, improvements) plus `breakdown`
+    (keywordRelevance, experience, formatting, readability; 0-100 each),
+    the raw `signals` they were computed from and the scorer `version`.
+    """
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    words = _WORD_RE.findall(text)
+    word_count = len(words)
+    lowered = text.lower()
+
+    sections = _sections(lines)
+    bullets = verb_bullets = quantified_bullets = 0
+    for line in lines:
+        is_bullet, verb = _is_bullet(line)
+        if is_bullet:
+            bullets += 1
+            verb_bullets += verb
+            quantified_bullets += bool(_QUANTIFIED_RE.search(line))
+    quantified = len(_QUANTIFIED_RE.findall(text))
+    date_ranges = len(_DATE_RANGE_RE.findall(text))
+    long_lines = sum(1 for line in lines if len(line.split()) > 60)
+
+    field, keywords = _keyword_signals(lowered, word_count)
+    has_experience = "experience" in sections or date_ranges >= 2
+    if field == "General" or keywords["distinct"] < 3:
+        field = "Student/Fresher" if not has_experience and "education" in sections else field
+
+    has_profile = bool(_PROFILE_RE.search(text)) or bool(links and (links.get("linkedin") or links.get("github")))
+    contact = {
+        "email": any(_EMAIL_RE.search(line) for line in lines if "@" in line),
+        # 10-15 digits, so year ranges don't pass for a phone number
+        "phone": any(10 <= sum(c.isdigit() for c in m.group()) <= 15 for m in _PHONE_RE.finditer(text)),
+        "profile": has_profile,
+    }
+    ease = flesch_reading_ease(text)
+    avg_line_words = word_count / len(lines) if lines else 0.0
+
+    # keyword relevance: coverage of the field's vocabulary, plus density
+    # (too sparse reads as off-field, too dense as keyword stuffing)
+    density = keywords["density"]
+    if density < 2:
+        density_score = density / 2
+    elif density <= 25:
+        density_score = 1.0
+    else:
+        density_score = max(0.0, 1 - (density - 25) / 25)
+    keyword_score = 75 * min(keywords["distinct"] / 12, 1) + 25 * density_score
+
+    verb_share = verb_bullets / bullets if bullets else 0.0
+    experience_score = (
+        20 * (has_experience or "projects" in sections)
+        + 20 * min(bullets / 8, 1)
+        + 20 * verb_share
+        + 30 * min(quantified / 6, 1)
+        + 10 * min(date_ranges / 2, 1)
+    )
+
+    if 300 <= word_count <= 900:
+        length_points = 15
+    elif 150 <= word_count <= 1500:
+        length_points = 8
+    else:
+        length_points = 0
+    formatting_score = (
+        10 * contact["email"] + 10 * contact["phone"] + 10 * contact["profile"]
+        + 15 * (has_experience or "projects" in sections)
+        + 15 * ("education" in sections)
+        + 15 * ("skills" in sections)
+        + length_points
+        + (10 if long_lines == 0 else 5 if long_lines <= 2 else 0)
+    )
+
+    # bullet fragments land around 30-70; far below is dense jargon or run-on
+    # lines, far above is too little substance per line
+    if ease < 30:
+        readability_score = 100 - (30 - ease) * 2.5
+    elif ease <= 70:
+        readability_score = 100.0
+    else:
+        readability_score = max(40.0, 100 - (ease - 70) * 1.5)
+    if avg_line_words > 25:
+        readability_score -= min(30.0, (avg_line_words - 25) * 2)
+
+    breakdown = {
+        "keywordRelevance": _clamp(keyword_score),
+        "experience": _clamp(experience_score),
+        "formatting": _clamp(formatting_score),
+        "readability": _clamp(readability_score),
+    }
+    overall = _clamp(sum(breakdown[k] * w for k, w in WEIGHTS.items()))
+
+    signals = {
+        "wordCount": word_count,
+        "sections": sorted(sections, key=sections.get),
+        "bullets": bullets,
+        "actionVerbBullets": verb_bullets,
+        "quantifiedBullets": quantified_bullets,
+        "quantifiedAchievements": quantified,
+        "dateRanges": date_ranges,
+        "keywordsMatched": keywords["matched"],
+        "keywordDensity": density,
+        "readingEase": round(ease, 1),
+        "contact": contact,
+        "longLines": long_lines,
+    }
+    strengths, improvements = _feedback(field, breakdown, signals, sections)
+    return {
+        "version": SCORER_VERSION,
+        "field": field,
+        "ats_score": overall,
+        "breakdown": breakdown,
+        "strengths": strengths,
+        "improvements": improvements,
+        "signals": signals,
+    }
+
+
+def _feedback(field: str, breakdown: Dict[str, int], signals: Dict[str, Any], sections: Dict[str, int]) -> Tuple[List[str], List[str]]:
+    strengths: List[str] = []
+    improvements: List[str] = []
+
+    if breakdown["keywordRelevance"] >= 75:
+        strengths.append(f"Strong {field} keyword coverage ({len(signals['keywordsMatched'])} relevant terms)")
+    if signals["quantifiedAchievements"] >= 4:
+        strengths.append(f"Quantified impact: {signals['quantifiedAchievements']} measurable results")
+    if signals["bullets"] and signals["actionVerbBullets"] / signals["bullets"] >= 0.6:
+        strengths.append("Bullet points lead with strong action verbs")
+    if all(s in sections for s in CORE_SECTIONS):
+        strengths.append("Clear structure with experience, education and skills sections")
+    if all(signals["contact"].values()):
+        strengths.append("Complete contact details including a professional profile link")
+
+    missing = [s for s in CORE_SECTIONS if s not in sections]
+    if missing and not (missing == ["experience"] and "projects" in sections):
+        improvements.append(f"Add clearly labeled section headings for: {', '.join(missing)}")
+    if field in FIELD_VOCABULARIES and breakdown["keywordRelevance"] < 75:
+        matched = set(signals["keywordsMatched"])
+        suggestions = [t for t in FIELD_VOCABULARIES[field][:12] if t not in matched][:5]
+        if suggestions:
+            improvements.append(f"Add relevant {field} keywords you genuinely have, e.g. {', '.join(suggestions)}")
+    if signals["keywordDensity"] > 25:
+        improvements.append("Keyword density is very high; describe outcomes instead of listing terms")
+    if signals["quantifiedAchievements"] < 4:
+        improvements.append("Quantify achievements with numbers, percentages or amounts")
+    if signals["bullets"] < 4:
+        improvements.append("Describe experience as concise bullet points")
+    elif signals["actionVerbBullets"] / signals["bullets"] < 0.5:
+        improvements.append("Start bullet points with action verbs (built, led, reduced, ...)")
+    absent = [k for k, ok in signals["contact"].items() if not ok]
+    if absent:
+        improvements.append(f"Include contact details: {', '.join('LinkedIn/GitHub' if k == 'profile' else k for k in absent)}")
+    if signals["wordCount"] < 300:
+        improvements.append("Resume is short; expand on responsibilities and results")
+    elif signals["wordCount"] > 1200:
+        improvements.append("Resume is long; trim it to the most relevant experience")
+    if breakdown["readability"] < 60:
+        improvements.append("Shorten long sentences and avoid dense paragraphs")
+
+    return strengths[:3], improvements[:5]
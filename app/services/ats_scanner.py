@@ -1,15 +1,9 @@
-import os
-from dotenv import load_dotenv
-import google.generativeai as genai
+from app.services.ats_local import SCORER_VERSION
+from app.services.pdf_parser import extract_pdf
 
-from app.services.pdf_parser import (
-    extract_textpdf,
-    extract_links_from_pdf,
-    extract_links,
-    classify_links
-)
-
-from app.services.genai_integration import model
+from app.services.genai_integration import ainvoke, astream
+from app.services.model_provider import get_model
+from app.services.cache import build_cache, content_hash
 
 # ------------------ ATS PROMPT ------------------
 ATS_PROMPT = """
@@ -60,14 +54,47 @@ Improvements:
 - ...
 """
 
+# Bumps automatically whenever the prompt text changes, so cached results
+# produced by an older prompt are never served.
+ATS_PROMPT_VERSION = content_hash(ATS_PROMPT)[:12]
+
+# ------------------ RESULT CACHE ------------------
+# Keyed on the uploaded bytes + prompt and local scorer versions. Memory tier
+# per process; set ATS_CACHE_PATH (or CACHE_DIR) to share results across
+# uvicorn workers. Local-only (mode=fast) results get their own keys.
+ats_result_cache = build_cache("ats", "ATS_CACHE", max_entries=512, ttl_seconds=24 * 3600)
+
+
+def ats_cache_key(file_bytes, local_only: bool = False) -> str:
+    if local_only:
+        return f"ats-local:{SCORER_VERSION}:{content_hash(file_bytes)}"
+    return f"ats:{ATS_PROMPT_VERSION}:{SCORER_VERSION}:{content_hash(file_bytes)}"
+
 # ------------------ ATS SCORE FUNCTION ------------------
 def get_ats_score(resume_text):
-    response = model.invoke([
+    response = get_model().invoke([
+        ATS_PROMPT,
+        "RESUME:\n" + resume_text
+    ])
+    return response.content
+
+
+async def aget_ats_score(resume_text):
+    """Async variant for request handlers; queues on the global LLM limiter."""
+    response = await ainvoke([
         ATS_PROMPT,
         "RESUME:\n" + resume_text
     ])
     return response.content
 
+
+def astream_ats_score(resume_text):
+    """Streaming variant: async iterator over the model's text chunks."""
+    return astream([
+        ATS_PROMPT,
+        "RESUME:\n" + resume_text
+    ])
+
 import re
 
 def parse_ats_response(ats_text: str):
@@ -115,20 +142,94 @@ def parse_ats_response(ats_text: str):
     return result
 
 
+class ATSStreamParser:
+    """
+    Incremental parse_ats_response for streamed model output.
+
+    feed() takes raw text chunks and returns events for every line that has
+    become complete: ("field", str), ("score", int), ("strength", str) and
+    ("improvement", str). close() flushes the trailing line. The accumulated
+    result has the same shape as parse_ats_response.
+    """
+
+    _FIELD_RE = re.compile(r"Field:\s*(.+)")
+    _SCORE_RE = re.compile(r"ATS Score:\s*(\d+)")
+    _SECTIONS = {"Strengths:": ("strengths", "strength"), "Improvements:": ("improvements", "improvement")}
+
+    def __init__(self):
+        self.result = {
+            "field": None,
+            "ats_score": None,
+            "strengths": [],
+            "improvements": []
+        }
+        self._buf = ""
+        self._section = None  # (result key, event name) while inside a bullet block
+        self._seen_bullet = False
+        self._done_sections = set()
+
+    def feed(self, chunk: str):
+        self._buf += chunk
+        events = []
+        while "\n" in self._buf:
+            line, self._buf = self._buf.split("\n", 1)
+            events.extend(self._line(line))
+        return events
+
+    def close(self):
+        line, self._buf = self._buf, ""
+        return self._line(line) if line else []
+
+    def _line(self, line: str):
+        events = []
+
+        if self._section is not None:
+            key, event = self._section
+            if line.startswith("- ") or (not self._seen_bullet and line.lstrip().startswith("- ")):
+                item = line.strip().strip("- ").strip()
+                self._seen_bullet = True
+                if item:
+                    self.result[key].append(item)
+                    events.append((event, item))
+                return events
+            if not self._seen_bullet and not line.strip():
+                return events
+            self._section = None
+
+        if self.result["field"] is None:
+            m = self._FIELD_RE.search(line)
+            if m:
+                self.result["field"] = m.group(1).strip()
+                events.append(("field", self.result["field"]))
+
+        if self.result["ats_score"] is None:
+            m = self._SCORE_RE.search(line)
+            if m:
+                self.result["ats_score"] = int(m.group(1))
+                events.append(("score", self.result["ats_score"]))
+
+        for header, (key, event) in self._SECTIONS.items():
+            if header in line and key not in self._done_sections:
+                self._done_sections.add(key)
+                self._section = (key, event)
+                self._seen_bullet = False
+                rest = line.split(header, 1)[1]
+                if rest.strip():
+                    events.extend(self._line(rest))
+                break
+
+        return events
+
+
 # ------------------ MAIN ------------------
 if __name__ == "__main__":
     with open("resume.pdf", "rb") as f:
         file_bytes = f.read()
 
     #  Reuse your parser
-    resume_text = extract_textpdf(file_bytes)
-
-    links_from_pdf = extract_links_from_pdf(file_bytes)
-    links_from_text = extract_links(resume_text)
-    classified_links = classify_links(
-        list(set(links_from_pdf + links_from_text))
-    )
-
+    extracted = extract_pdf(file_bytes)
+    resume_text = extracted["text"]
+    classified_links = extracted["links"]
 
     ats_result = get_ats_score(resume_text)
     result = parse_ats_response(str(ats_result))
@@ -0,0 +1,287 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple, Union
+
+from app.services import metrics
+
+
+def content_hash(*parts: Union[bytes, bytearray, memoryview, str]) -> str:
+    """sha256 over the given parts; used to build content-addressed cache keys."""
+    h = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        h.update(part)
+        # separator so ("ab", "c") and ("a", "bc") don't collide
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+def durable_path(env_var: str, filename: str, persist_by_default: bool = False) -> Optional[str]:
+    """
+    Resolve the on-disk location for a cache's shared tier.
+
+    An explicit path in `env_var` wins; otherwise the file goes under CACHE_DIR
+    when that is set (or under ./.cache for caches that persist by default).
+    Returns None when nothing is configured (memory only). Only resolves the
+    path; LazySQLite creates the directory when the store is first used.
+    """
+    explicit = os.getenv(env_var)
+    if explicit:
+        return explicit
+    cache_dir = os.getenv("CACHE_DIR") or (".cache" if persist_by_default else None)
+    if cache_dir:
+        return os.path.join(cache_dir, filename)
+    return None
+
+
+class LazySQLite:
+    """
+    Base for the SQLite-backed stores (cache tiers, job queue, resume outbox).
+    The connection - and with it the file and its directory - is opened on
+    first use, so the module-level instances don't touch the disk at import.
+    Subclasses create their tables in _setup().
+    """
+
+    isolation_level: Optional[str] = ""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db: Optional[sqlite3.Connection] = None
+        self._open_lock = threading.Lock()
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            with self._open_lock:
+                if self._db is None:
+                    directory = os.path.dirname(self.path)
+                    if directory:
+                        os.makedirs(directory, exist_ok=True)
+                    conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=self.isolation_level)
+                    # WAL: several uvicorn workers can read while one writes
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    self._setup(conn)
+                    self._db = conn
+        return self._db
+
+    def _setup(self, conn: sqlite3.Connection) -> None:
+        pass
+
+
+class LRUCache:
+    """
+    In-process tier: least-recently-used eviction bounded by entry count and
+    by the approximate JSON size of the stored values, with a per-entry TTL.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 32 * 1024 * 1024, ttl_seconds: float = 3600.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, size, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self._bytes -= size
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, size: Optional[int] = None) -> None:
+        if size is None:
+            size = len(json.dumps(value, ensure_ascii=False, default=str))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._data[key] = (time.monotonic() + self.ttl_seconds, size, value)
+            self._bytes += size
+            while self._data and (len(self._data) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, evicted_size, _) = self._data.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+
+class SQLiteCache(LazySQLite):
+    """
+    Shared on-disk tier. Several uvicorn workers can point at the same file;
+    WAL mode lets them read concurrently while one writes.
+    """
+
+    def __init__(self, path: str, table: str = "cache", ttl_seconds: float = 86400.0):
+        super().__init__(path)
+        self.table = table
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+    def _setup(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at < time.time():
+            self.delete(key)
+            return None
+        return json.loads(value)
+
+    def set(self, key: str, value: Any) -> None:
+        payload = json.dumps(value, ensure_ascii=False, default=str)
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, payload, time.time() + self.ttl_seconds),
+            )
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            cur = self._conn.execute(f"DELETE FROM {self.table} WHERE expires_at < ?", (time.time(),))
+            self._conn.commit()
+            return cur.rowcount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+
+
+class TieredCache:
+    """
+    Memory tier in front of an optional shared tier. Shared hits are promoted
+    into memory. Values must be JSON-serializable.
+    """
+
+    def __init__(self, name: str, memory: LRUCache, shared: Optional[SQLiteCache] = None):
+        self.name = name
+        self.memory = memory
+        self.shared = shared
+        self.memory_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is not None:
+            with self._lock:
+                self.memory_hits += 1
+            return value
+        if self.shared is not None:
+            try:
+                value = self.shared.get(key)
+            except sqlite3.Error as e:
+                print(f"{self.name} cache: shared tier read failed: {e}")
+                value = None
+            if value is not None:
+                self.memory.set(key, value)
+                with self._lock:
+                    self.shared_hits += 1
+                return value
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        self.memory.set(key, value)
+        if self.shared is not None:
+            try:
+                self.shared.set(key, value)
+            except sqlite3.Error as e:
+                print(f"{self.name} cache: shared tier write failed: {e}")
+
+    def delete(self, key: str) -> None:
+        self.memory.delete(key)
+        if self.shared is not None:
+            try:
+                self.shared.delete(key)
+            except sqlite3.Error as e:
+                print(f"{self.name} cache: shared tier delete failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.memory_hits + self.shared_hits
+        lookups = hits + self.misses
+        return {
+            "name": self.name,
+            "hits": hits,
+            "memory_hits": self.memory_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_rate": (hits / lookups) if lookups else 0.0,
+            "entries": len(self.memory),
+            "bytes": self.memory.size_bytes,
+            "shared": self.shared is not None,
+        }
+
+
+def build_cache(
+    name: str,
+    env_prefix: str,
+    max_entries: int = 256,
+    ttl_seconds: float = 3600.0,
+    persist_by_default: bool = False,
+) -> TieredCache:
+    """
+    Build a TieredCache configured from <env_prefix>_MAX_ENTRIES, _MAX_BYTES,
+    _TTL_SECONDS and _PATH (or CACHE_DIR for the shared tier).
+    """
+    ttl = float(os.getenv(f"{env_prefix}_TTL_SECONDS", str(ttl_seconds)))
+    memory = LRUCache(
+        max_entries=int(os.getenv(f"{env_prefix}_MAX_ENTRIES", str(max_entries))),
+        max_bytes=int(os.getenv(f"{env_prefix}_MAX_BYTES", str(32 * 1024 * 1024))),
+        ttl_seconds=ttl,
+    )
+    shared: Optional[SQLiteCache] = None
+    path = durable_path(f"{env_prefix}_PATH", f"{name}.sqlite3", persist_by_default)
+    if path:
+        shared = SQLiteCache(path, table=f"{name}_cache", ttl_seconds=ttl)
+    cache = TieredCache(name, memory, shared)
+    metrics.register_cache(name, cache.stats)
+    return cache
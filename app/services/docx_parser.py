@@ -0,0 +1,145 @@
+import io
+import re
+import zipfile
+from typing import Dict, Iterator, List, Optional
+from xml.etree.ElementTree import ParseError, iterparse
+
+from app.services.pdf_parser import annotation_url, classify_links, extract_links, normalize_block
+
+# ---------- DOCX TEXT + LINK EXTRACTION ----------
+# Reads WordprocessingML straight out of the zip with iterparse instead of
+# building python-docx's object model. Unlike `Document.paragraphs` this also
+# covers tables, text boxes and headers/footers, where resumes often keep
+# the name and contact links.
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+R = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+MC = "{http://schemas.openxmlformats.org/markup-compatibility/2006}"
+REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+HYPERLINK_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/hyperlink"
+
+# guard against zip bombs: a resume's document.xml is well under this
+MAX_PART_BYTES = 64 * 1024 * 1024
+_PART_RE = re.compile(r"^word/(header|document|footer)\d*\.xml$")
+_PART_ORDER = {"header": 0, "document": 1, "footer": 2}
+# field-code hyperlinks: { HYPERLINK "https://..." }
+_FIELD_LINK_RE = re.compile(r'HYPERLINK\s+"([^"]+)"')
+
+
+class DocxError(ValueError):
+    """The upload is not a readable .docx file."""
+
+
+def _rels_path(part: str) -> str:
+    folder, name = part.rsplit("/", 1)
+    return f"{folder}/_rels/{name}.rels"
+
+
+def _hyperlink_targets(zf: zipfile.ZipFile, part: str) -> Dict[str, str]:
+    """rId -> external URL for the hyperlink relationships of one part."""
+    try:
+        data = zf.read(_rels_path(part))
+    except KeyError:
+        return {}
+    targets = {}
+    for _, el in iterparse(io.BytesIO(data)):
+        if el.tag == f"{REL}Relationship" and el.get("Type") == HYPERLINK_REL:
+            targets[el.get("Id", "")] = el.get("Target", "")
+    return targets
+
+
+def _iter_paragraphs(stream, targets: Dict[str, str], links: List[str]) -> Iterator[str]:
+    """
+    Yield the text of each w:p in document order. Paragraphs nested inside
+    text boxes come out before the paragraph that anchors them. Hyperlink
+    targets (relationship ids and HYPERLINK field codes) go into `links`.
+    """
+    stack: List[List[str]] = []
+    fallback_depth = 0
+    for event, el in iterparse(stream, events=("start", "end")):
+        tag = el.tag
+        if tag == f"{MC}Fallback":
+            # mc:Choice and mc:Fallback carry the same text box twice
+            fallback_depth += 1 if event == "start" else -1
+            continue
+        if fallback_depth:
+            if event == "end":
+                el.clear()
+            continue
+
+        if event == "start":
+            if tag == f"{W}p":
+                stack.append([])
+            elif tag == f"{W}hyperlink":
+                rid = el.get(f"{R}id")
+                if rid and rid in targets:
+                    links.append(targets[rid])
+            continue
+
+        if tag == f"{W}t":
+            if stack and el.text:
+                stack[-1].append(el.text)
+        elif tag == f"{W}tab":
+            if stack:
+                stack[-1].append("\t")
+        elif tag in (f"{W}br", f"{W}cr"):
+            if stack:
+                stack[-1].append("\n")
+        elif tag == f"{W}instrText":
+            match = _FIELD_LINK_RE.search(el.text or "")
+            if match:
+                links.append(match.group(1))
+        elif tag == f"{W}p":
+            text = "".join(stack.pop()) if stack else ""
+            el.clear()
+            if text.strip():
+                yield text
+
+
+def _open_docx(file_bytes) -> zipfile.ZipFile:
+    try:
+        return zipfile.ZipFile(io.BytesIO(file_bytes))
+    except zipfile.BadZipFile as e:
+        raise DocxError("Not a valid DOCX file") from e
+
+
+def docx_paragraphs(file_bytes, links: Optional[List[str]] = None) -> List[str]:
+    """Raw paragraph text from headers, body and footers, in that order."""
+    links = [] if links is None else links
+    with _open_docx(file_bytes) as zf:
+        parts = sorted(
+            (info for info in zf.infolist() if _PART_RE.match(info.filename)),
+            key=lambda info: (_PART_ORDER[_PART_RE.match(info.filename).group(1)], info.filename),
+        )
+        if not any(info.filename == "word/document.xml" for info in parts):
+            raise DocxError("Not a valid DOCX file: word/document.xml is missing")
+        paragraphs: List[str] = []
+        for info in parts:
+            if info.file_size > MAX_PART_BYTES:
+                raise DocxError(f"DOCX part {info.filename} is too large")
+            try:
+                targets = _hyperlink_targets(zf, info.filename)
+                with zf.open(info) as stream:
+                    paragraphs.extend(_iter_paragraphs(stream, targets, links))
+            except ParseError as e:
+                raise DocxError(f"Not a valid DOCX file: {info.filename} is not well-formed XML") from e
+    return paragraphs
+
+
+def extract_docx(file_bytes):
+    """
+    DOCX counterpart of pdf_parser.extract_pdf, with the same shape:
+    normalized text, hyperlink targets (as annotation_links), links found in
+    the text and the classified union of both.
+    """
+    raw_links: List[str] = []
+    blocks = [normalize_block(p) for p in docx_paragraphs(file_bytes, raw_links)]
+    text = "\n".join(b for b in blocks if b)
+    annotation_links = list({url for url in map(annotation_url, raw_links) if url})
+    text_links = extract_links(text)
+    return {
+        "text": text,
+        "annotation_links": annotation_links,
+        "text_links": text_links,
+        "links": classify_links(list(set(annotation_links + text_links))),
+    }
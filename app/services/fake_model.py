@@ -0,0 +1,160 @@
+import asyncio
+import json
+import os
+import re
+import time
+from collections import Counter
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List
+
+if TYPE_CHECKING:
+    from langchain_core.messages import AIMessage, AIMessageChunk
+
+FAKE_ATS_RESPONSE = """Field: Software Engineering
+
+ATS Score: 78
+
+Strengths:
+- Projects show end-to-end ownership with concrete stacks (FastAPI, PostgreSQL, AWS)
+- Clear, consistent formatting that parses cleanly
+- Quantified impact in most experience bullets
+
+Improvements:
+- Add a skills section grouped by category so keywords are easy to match
+- Replace generic verbs with specific outcomes and numbers in older roles
+- Include links to the two strongest projects
+"""
+
+TECH_TERMS = (
+    "python java javascript typescript react node.js aws docker kubernetes sql postgresql "
+    "machine learning rest apis fastapi django flask c++ c# go rust graphql redis kafka spark "
+    "airflow tensorflow pytorch nlp ci/cd git linux terraform gcp azure microservices agile "
+    "scrum pandas numpy"
+).split()
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or our that the this to we will with you your "
+    "experience years year team work working role job".split()
+)
+_WORD_RE = re.compile(r"[a-z][a-z0-9\+\#\.\-/]{2,}")
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+")
+_URL_RE = re.compile(r"(?:https?://|(?:www\.)?(?:github|linkedin)\.com/)\S+")
+_PROJECT_INDEX_RE = re.compile(r"^\[(\d+)\]$", re.M)
+
+
+def prompt_text(messages: Any) -> str:
+    """Flatten whatever was passed to invoke() into one string."""
+    if isinstance(messages, str):
+        return messages
+    if isinstance(messages, (list, tuple)):
+        return "\n".join(str(getattr(m, "content", m)) for m in messages)
+    return str(getattr(messages, "content", messages))
+
+
+def usage_for(prompt: str, output: str) -> Dict[str, int]:
+    # ~4 characters per token, close enough for capacity planning
+    i, o = max(1, len(prompt) // 4), max(1, len(output) // 4)
+    return {"input_tokens": i, "output_tokens": o, "total_tokens": i + o}
+
+
+def _keywords(text: str) -> List[str]:
+    lowered = text.lower()
+    found = [t for t in TECH_TERMS if t in lowered]
+    common = Counter(w for w in _WORD_RE.findall(lowered) if w not in _STOPWORDS and w not in found)
+    # the keyword prompt asks for 15-40 items
+    return (found + [w for w, _ in common.most_common(40)])[: max(15, min(30, len(found) + 10))]
+
+
+def _structured(resume: str) -> Dict[str, Any]:
+    lines = [line.strip() for line in resume.splitlines() if line.strip()]
+    email = _EMAIL_RE.search(resume)
+    return {
+        "personal_information": {
+            "name": lines[0][:60] if lines else "",
+            "email": email.group(0) if email else "",
+            "phone": "",
+            "location": "",
+            "links": sorted(set(_URL_RE.findall(resume)))[:5],
+        },
+        "professional_summary": " ".join(lines[1:3])[:300] if len(lines) > 1 else None,
+        "career_objective": None,
+        "professional_experience": [
+            {"company": f"Company {i}", "role": "Engineer", "duration": "", "description": line[:200]}
+            for i, line in enumerate(lines[3:6])
+        ],
+        "education": [{"institution": "State University", "degree": "B.Tech", "duration": ""}],
+        "projects": [
+            {"title": f"Project {i}", "description": line[:200], "technologies": _keywords(line)[:4]}
+            for i, line in enumerate(lines[6:9])
+        ],
+        "skills": [t for t in TECH_TERMS if t in resume.lower()][:20],
+        "certifications": None,
+        "awards_and_honors": None,
+        "publications": None,
+        "leadership_and_activities": None,
+        "research_experience": None,
+    }
+
+
+def fake_response(prompt: str) -> str:
+    """A schema-valid answer for each prompt this service sends."""
+    if '"keywords"' in prompt:
+        return json.dumps({"keywords": _keywords(prompt.split("JOB DESCRIPTION:", 1)[-1])})
+    if '{"projects": [{"index"' in prompt:
+        return json.dumps({"projects": [
+            {"index": i, "description": f"Built and shipped project {i} end to end, cutting latency 30% for 1M users."}
+            for i in sorted({int(m) for m in _PROJECT_INDEX_RE.findall(prompt)})
+        ]})
+    if '{"description"' in prompt:
+        return json.dumps({"description": "Built and shipped the service end to end, cutting latency 30% for 1M users."})
+    if '"personal_information"' in prompt:
+        return json.dumps(_structured(prompt.split("RESUME:", 1)[-1]))
+    return FAKE_ATS_RESPONSE
+
+
+class FakeChatModel:
+    """
+    In-process stand-in for the chat model, for load tests, profiling and
+    local runs without an API key. Answers every prompt this service sends
+    with a schema-valid response (see fake_response) after `latency_seconds`;
+    streaming spreads the latency over the chunks.
+    """
+
+    def __init__(self, latency_seconds: float = 0.0, stream_chunk_chars: int = 24):
+        self.latency_seconds = latency_seconds
+        self.stream_chunk_chars = stream_chunk_chars
+        self.calls = 0
+
+    def invoke(self, messages: Any) -> "AIMessage":
+        from langchain_core.messages import AIMessage
+
+        self.calls += 1
+        prompt = prompt_text(messages)
+        time.sleep(self.latency_seconds)
+        out = fake_response(prompt)
+        return AIMessage(content=out, usage_metadata=usage_for(prompt, out))
+
+    async def ainvoke(self, messages: Any) -> "AIMessage":
+        from langchain_core.messages import AIMessage
+
+        self.calls += 1
+        prompt = prompt_text(messages)
+        await asyncio.sleep(self.latency_seconds)
+        out = fake_response(prompt)
+        return AIMessage(content=out, usage_metadata=usage_for(prompt, out))
+
+    async def astream(self, messages: Any) -> AsyncIterator["AIMessageChunk"]:
+        from langchain_core.messages import AIMessageChunk
+
+        self.calls += 1
+        prompt = prompt_text(messages)
+        out = fake_response(prompt)
+        pieces = [out[i : i + self.stream_chunk_chars] for i in range(0, len(out), self.stream_chunk_chars)]
+        per_chunk = self.latency_seconds / max(1, len(pieces))
+        for n, piece in enumerate(pieces):
+            await asyncio.sleep(per_chunk)
+            # usage arrives on the final chunk, as with Gemini
+            yield AIMessageChunk(content=piece, usage_metadata=usage_for(prompt, out) if n == len(pieces) - 1 else None)
+
+
+def load_fake_model() -> FakeChatModel:
+    return FakeChatModel(latency_seconds=float(os.getenv("FAKE_MODEL_LATENCY_MS", "0")) / 1000)
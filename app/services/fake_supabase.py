@@ -0,0 +1,192 @@
+import copy
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from app.services.arsenal import ARSENAL_RPC, ARSENAL_TABLES, internal_columns
+
+
+class FakeResponse:
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+        self.error = None
+
+
+class FakeQuery:
+    """Chainable subset of the postgrest query builder used by this service."""
+
+    def __init__(self, client: "FakeSupabaseClient", table: str):
+        self._client = client
+        self._table = table
+        self._columns = "*"
+        self._count: Optional[str] = None
+        self._filters: List[tuple] = []
+        self._order: Optional[tuple] = None
+        self._limit: Optional[int] = None
+        self._insert: Optional[List[Dict[str, Any]]] = None
+
+    def select(self, *columns: str, count: Optional[str] = None) -> "FakeQuery":
+        self._columns = ",".join(columns) or "*"
+        self._count = count
+        return self
+
+    def eq(self, column: str, value: Any) -> "FakeQuery":
+        self._filters.append((column, value))
+        return self
+
+    def order(self, column: str, *, desc: bool = False, nullsfirst: Optional[bool] = None) -> "FakeQuery":
+        self._order = (column, desc)
+        return self
+
+    def limit(self, n: int) -> "FakeQuery":
+        self._limit = n
+        return self
+
+    def insert(self, rows: Any) -> "FakeQuery":
+        self._insert = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def execute(self) -> FakeResponse:
+        return self._client._execute(self)
+
+
+class FakeRPC:
+    def __init__(self, client: "FakeSupabaseClient", fn: str, params: Dict[str, Any]):
+        self._client = client
+        self._fn = fn
+        self._params = params
+
+    def execute(self) -> FakeResponse:
+        self._client._record("rpc", self._fn)
+        impl = self._client.functions.get(self._fn)
+        if impl is None:
+            # what PostgREST reports for a function that isn't deployed
+            raise RuntimeError(f"PGRST202: Could not find the function public.{self._fn}")
+        with self._client._lock:
+            return FakeResponse(copy.deepcopy(impl(self._client, self._params)))
+
+
+def _get_user_arsenal(client: "FakeSupabaseClient", params: Dict[str, Any]) -> Dict[str, Any]:
+    """Python mirror of supabase/migrations/*_get_user_arsenal.sql."""
+    user_id = params.get("p_user_id")
+    columns = params.get("p_columns") or {}
+    out = {}
+    for t in ARSENAL_TABLES:
+        rows = [r for r in client.tables.get(t, []) if r.get("user_id") == user_id]
+        cols = columns.get(t)
+        if cols is None:
+            drop = internal_columns(t)
+            out[t] = [{k: v for k, v in r.items() if k not in drop} for r in rows]
+        else:
+            out[t] = [{k: r[k] for k in cols if k in r} for r in rows]
+    return out
+
+
+class FakeBucket:
+    def __init__(self, client: "FakeSupabaseClient", bucket: str):
+        self._client = client
+        self._bucket = bucket
+
+    def upload(self, path: str, file: bytes, file_options: Optional[Dict[str, Any]] = None) -> FakeResponse:
+        self._client._record("storage.upload", self._bucket, len(file))
+        with self._client._lock:
+            self._client.objects[(self._bucket, path)] = (bytes(file), dict(file_options or {}))
+        return FakeResponse({"path": path})
+
+    def get_public_url(self, path: str) -> str:
+        return f"{self._client.url}/storage/v1/object/public/{self._bucket}/{path}"
+
+
+class FakeStorage:
+    def __init__(self, client: "FakeSupabaseClient"):
+        self._client = client
+
+    def from_(self, bucket: str) -> FakeBucket:
+        return FakeBucket(self._client, bucket)
+
+
+class FakeSupabaseClient:
+    """
+    In-memory stand-in for the supabase-py client, for local runs, load
+    tests and benchmarks. Supports table select/eq/order/limit/insert, rpc
+    (get_user_arsenal by default) and storage upload/get_public_url. Every
+    call is recorded in `calls`.
+    """
+
+    def __init__(
+        self,
+        tables: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+        latency_seconds: float = 0.0,
+        functions: Optional[Dict[str, Callable[..., Any]]] = None,
+    ):
+        self.url = "http://fake-supabase.local"
+        self.functions: Dict[str, Callable[..., Any]] = (
+            dict(functions) if functions is not None else {ARSENAL_RPC: _get_user_arsenal}
+        )
+        self.tables: Dict[str, List[Dict[str, Any]]] = copy.deepcopy(tables or {})
+        self.objects: Dict[tuple, tuple] = {}
+        self.latency_seconds = latency_seconds
+        self.calls: List[tuple] = []
+        self.storage = FakeStorage(self)
+        self._lock = threading.Lock()
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def rpc(self, fn: str, params: Optional[Dict[str, Any]] = None) -> FakeRPC:
+        return FakeRPC(self, fn, params or {})
+
+    def _record(self, op: str, target: str, size: int = 0) -> None:
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        with self._lock:
+            self.calls.append((op, target, size))
+
+    def _execute(self, q: FakeQuery) -> FakeResponse:
+        if q._insert is not None:
+            self._record("insert", q._table, len(q._insert))
+            now = datetime.now(timezone.utc).isoformat()
+            inserted = []
+            with self._lock:
+                rows = self.tables.setdefault(q._table, [])
+                for r in q._insert:
+                    row = {"id": str(uuid.uuid4()), "created_at": now, **r}
+                    rows.append(row)
+                    inserted.append(dict(row))
+            return FakeResponse(inserted)
+
+        self._record("select", q._table)
+        with self._lock:
+            rows = [r for r in self.tables.get(q._table, []) if all(r.get(c) == v for c, v in q._filters)]
+        count = len(rows) if q._count else None
+        known = set(rows[0]) if rows else set()
+        wanted = [c.strip() for c in q._columns.split(",")] if q._columns.strip() != "*" else []
+        for col in wanted + ([q._order[0]] if q._order else []):
+            if rows and col not in known:
+                # PostgREST answers 400 for unknown columns
+                raise RuntimeError(f"column {q._table}.{col} does not exist")
+        if q._order is not None:
+            col, desc = q._order
+            # NULLs sort last here, as with nullsfirst=False
+            present = sorted((r for r in rows if r.get(col) is not None), key=lambda r: r[col], reverse=desc)
+            rows = present + [r for r in rows if r.get(col) is None]
+        if q._limit is not None:
+            rows = rows[: q._limit]
+        if wanted:
+            rows = [{c: r.get(c) for c in wanted} for r in rows]
+        return FakeResponse(copy.deepcopy(rows), count)
+
+
+def load_fake_client() -> FakeSupabaseClient:
+    """FakeSupabaseClient seeded from FAKE_SUPABASE_SEED (a {table: [rows]} JSON file), if set."""
+    seed_path = os.getenv("FAKE_SUPABASE_SEED")
+    tables = None
+    if seed_path:
+        with open(seed_path, "r", encoding="utf-8") as f:
+            tables = json.load(f)
+    return FakeSupabaseClient(tables, latency_seconds=float(os.getenv("FAKE_SUPABASE_LATENCY_MS", "0")) / 1000)
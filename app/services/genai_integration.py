@@ -1,10 +1,52 @@
 from dotenv import load_dotenv
 load_dotenv()
 
-from langchain_google_genai import ChatGoogleGenerativeAI
+from app.services.llm_limiter import llm_limiter
+from app.services.metrics import LLM_CALLS, record_llm_usage, span
+from app.services.model_provider import get_model
 
-model = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash",
-    temperature=0.1,
-)
 
+async def ainvoke(messages):
+    """
+    Non-blocking model call that respects the global in-flight limit.
+    Raises LLMBusyError if no slot frees up in time.
+    """
+    async with llm_limiter.slot():
+        try:
+            with span("llm"):
+                response = await get_model().ainvoke(messages)
+        except Exception:
+            LLM_CALLS.inc("error")
+            raise
+    LLM_CALLS.inc("ok")
+    record_llm_usage(response)
+    return response
+
+
+async def astream(messages):
+    """
+    Stream model chunks while holding a limiter slot for the whole generation.
+    Yields the text of each chunk.
+    """
+    async with llm_limiter.slot():
+        try:
+            with span("llm_stream"):
+                async for chunk in get_model().astream(messages):
+                    # usage arrives on the final chunk
+                    record_llm_usage(chunk)
+                    yield message_text(chunk)
+        except Exception:
+            LLM_CALLS.inc("error")
+            raise
+    LLM_CALLS.inc("ok")
+
+
+def message_text(message) -> str:
+    content = getattr(message, "content", message)
+    if isinstance(content, list):
+        # Some Gemini responses come back as a list of content parts
+        return "".join(
+            part.get("text", "") if isinstance(part, dict) else str(part)
+            for part in content
+        )
+    return str(content)
@@ -0,0 +1,318 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.services import metrics
+from app.services.cache import LazySQLite, durable_path
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed")
+
+
+class QueueFullError(Exception):
+    def __init__(self, depth: int, retry_after: int = 5):
+        super().__init__(f"Job queue is full ({depth} queued)")
+        self.depth = depth
+        self.retry_after = retry_after
+
+
+class JobQueue(LazySQLite):
+    """
+    Persistent job queue in SQLite.
+
+    Jobs are claimed with a lease that the running worker keeps extending.
+    A job whose lease ran out (the process died or was restarted mid-job)
+    goes back to `queued` on the next claim, until it has used up
+    `max_attempts`. Several uvicorn workers can share the same file.
+    """
+
+    isolation_level = None
+
+    def __init__(self, path: str, lease_seconds: float = 60.0, max_attempts: int = 3, result_ttl_seconds: float = 86400.0):
+        super().__init__(path)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.result_ttl_seconds = result_ttl_seconds
+        self._lock = threading.Lock()
+
+    def _setup(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, kind TEXT NOT NULL, payload TEXT NOT NULL, "
+            "status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, "
+            "result TEXT, error TEXT, status_code INTEGER, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL, available_at REAL NOT NULL, "
+            "lease_until REAL, finished_at REAL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_available ON jobs (status, available_at)")
+
+    def enqueue(self, kind: str, payload: Dict[str, Any]) -> str:
+        job_id = str(uuid.uuid4())
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, payload, status, created_at, updated_at, available_at) "
+                "VALUES (?, ?, ?, 'queued', ?, ?, ?)",
+                (job_id, kind, json.dumps(payload, ensure_ascii=False, default=str), now, now, now),
+            )
+        return job_id
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """Lease the oldest runnable job, or None when there is nothing to do."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # recover jobs whose worker went away
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'failed', status_code = 500, error = 'Job worker was lost too many times', "
+                    "finished_at = ?, updated_at = ? WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+                    (now, now, now, self.max_attempts),
+                )
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'queued', updated_at = ? WHERE status = 'running' AND lease_until < ?",
+                    (now, now),
+                )
+                row = self._conn.execute(
+                    "SELECT id, kind, payload, attempts FROM jobs WHERE status = 'queued' AND available_at <= ? "
+                    "ORDER BY created_at LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                job_id, kind, payload, attempts = row
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'running', attempts = ?, lease_until = ?, updated_at = ? WHERE id = ?",
+                    (attempts + 1, now + self.lease_seconds, now, job_id),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return {"id": job_id, "kind": kind, "payload": json.loads(payload), "attempts": attempts + 1}
+
+    def heartbeat(self, job_id: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET lease_until = ?, updated_at = ? WHERE id = ? AND status = 'running'",
+                (now + self.lease_seconds, now, job_id),
+            )
+
+    def complete(self, job_id: str, result: Any) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'succeeded', result = ?, error = NULL, status_code = 200, "
+                "finished_at = ?, updated_at = ?, lease_until = NULL WHERE id = ?",
+                (json.dumps(result, ensure_ascii=False, default=str), now, now, job_id),
+            )
+
+    def fail(self, job_id: str, status_code: int, error: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, status_code = ?, "
+                "finished_at = ?, updated_at = ?, lease_until = NULL WHERE id = ?",
+                (error, status_code, now, now, job_id),
+            )
+
+    def retry(self, job_id: str, delay_seconds: float, error: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'queued', error = ?, available_at = ?, updated_at = ?, lease_until = NULL "
+                "WHERE id = ?",
+                (error, now + delay_seconds, now, job_id),
+            )
+
+    def release(self, job_id: str) -> None:
+        """Put a job back without using up an attempt (graceful shutdown)."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'queued', attempts = MAX(attempts - 1, 0), updated_at = ?, "
+                "lease_until = NULL WHERE id = ? AND status = 'running'",
+                (now, job_id),
+            )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, kind, status, attempts, result, error, status_code, created_at, updated_at, finished_at "
+                "FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        job_id, kind, status, attempts, result, error, status_code, created_at, updated_at, finished_at = row
+        return {
+            "job_id": job_id,
+            "kind": kind,
+            "status": status,
+            "attempts": attempts,
+            "created_at": created_at,
+            "updated_at": updated_at,
+            "finished_at": finished_at,
+            "result": json.loads(result) if result is not None else None,
+            "error": {"status_code": status_code, "detail": error} if status == "failed" else None,
+        }
+
+    def depth(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            oldest = self._conn.execute("SELECT MIN(created_at) FROM jobs WHERE status = 'queued'").fetchone()[0]
+        out: Dict[str, Any] = {s: counts.get(s, 0) for s in JOB_STATUSES}
+        out["oldest_queued_seconds"] = (now - oldest) if oldest is not None else 0.0
+        return out
+
+    def purge_finished(self) -> int:
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM jobs WHERE status IN ('succeeded', 'failed') AND finished_at < ?",
+                (time.time() - self.result_ttl_seconds,),
+            )
+            return cur.rowcount
+
+
+class JobRunner:
+    """
+    Bounded pool of asyncio workers draining a JobQueue.
+
+    Handlers are registered per job kind. A handler's exception with a
+    `status_code` of 429 or >= 500 is treated as transient and the job is
+    retried with exponential backoff (or the exception's Retry-After);
+    anything else fails the job.
+    """
+
+    def __init__(self, queue: JobQueue, workers: int = 4, max_queued: int = 0, poll_seconds: float = 1.0, retry_base_seconds: float = 5.0):
+        self.queue = queue
+        self.workers = workers
+        self.max_queued = max_queued
+        self.poll_seconds = poll_seconds
+        self.retry_base_seconds = retry_base_seconds
+        self.busy = 0
+        self._handlers: Dict[str, JobHandler] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._wake: Optional[asyncio.Event] = None
+        self._last_purge = 0.0
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        self._handlers[kind] = handler
+
+    async def submit(self, kind: str, payload: Dict[str, Any]) -> str:
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind {kind!r}")
+        if self.max_queued:
+            depth = await asyncio.to_thread(self.queue.depth)
+            if depth >= self.max_queued:
+                raise QueueFullError(depth)
+        job_id = await asyncio.to_thread(self.queue.enqueue, kind, payload)
+        if self._wake is not None:
+            self._wake.set()
+        return job_id
+
+    async def start(self) -> None:
+        if self._tasks or self.workers <= 0:
+            return
+        self._wake = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        print(f"job runner: started {self.workers} workers on {self.queue.path}")
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.queue.stats(), "workers": len(self._tasks), "busy": self.busy, "max_queued": self.max_queued}
+
+    async def _worker(self, n: int) -> None:
+        assert self._wake is not None
+        while True:
+            try:
+                job = await asyncio.to_thread(self.queue.claim)
+            except sqlite3.Error as e:
+                print(f"job worker {n}: claim failed: ", e)
+                job = None
+            if job is None:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                await self._maybe_purge()
+                continue
+            await self._run(job)
+
+    async def _maybe_purge(self) -> None:
+        if time.time() - self._last_purge < 300:
+            return
+        self._last_purge = time.time()
+        try:
+            await asyncio.to_thread(self.queue.purge_finished)
+        except sqlite3.Error as e:
+            print("job runner: purge failed: ", e)
+
+    async def _heartbeat(self, job_id: str) -> None:
+        while True:
+            await asyncio.sleep(self.queue.lease_seconds / 3)
+            await asyncio.to_thread(self.queue.heartbeat, job_id)
+
+    async def _run(self, job: Dict[str, Any]) -> None:
+        job_id = job["id"]
+        handler = self._handlers.get(job["kind"])
+        if handler is None:
+            await asyncio.to_thread(self.queue.fail, job_id, 500, f"No handler for job kind {job['kind']!r}")
+            return
+
+        self.busy += 1
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            result = await handler(job["payload"])
+        except asyncio.CancelledError:
+            await asyncio.to_thread(self.queue.release, job_id)
+            raise
+        except Exception as e:
+            status_code = getattr(e, "status_code", 500)
+            detail = str(getattr(e, "detail", None) or e)
+            if (status_code == 429 or status_code >= 500) and job["attempts"] < self.queue.max_attempts:
+                retry_after = (getattr(e, "headers", None) or {}).get("Retry-After")
+                delay = float(retry_after) if retry_after else self.retry_base_seconds * 2 ** (job["attempts"] - 1)
+                print(f"job {job_id}: attempt {job['attempts']} failed ({status_code}), retrying in {delay:.0f}s: ", detail)
+                await asyncio.to_thread(self.queue.retry, job_id, delay, detail)
+            else:
+                print(f"job {job_id}: failed ({status_code}): ", detail)
+                await asyncio.to_thread(self.queue.fail, job_id, status_code, detail)
+        else:
+            await asyncio.to_thread(self.queue.complete, job_id, result)
+        finally:
+            heartbeat.cancel()
+            self.busy -= 1
+
+
+job_runner = JobRunner(
+    JobQueue(
+        durable_path("JOB_QUEUE_PATH", "jobs.sqlite3", persist_by_default=True),
+        lease_seconds=float(os.getenv("JOB_LEASE_SECONDS", "60")),
+        max_attempts=int(os.getenv("JOB_MAX_ATTEMPTS", "3")),
+        result_ttl_seconds=float(os.getenv("JOB_RESULT_TTL_SECONDS", "86400")),
+    ),
+    workers=int(os.getenv("JOB_WORKERS", "4")),
+    max_queued=int(os.getenv("JOB_QUEUE_MAX_DEPTH", "1000")),
+)
+metrics.register_gauge("jobs_queued", "Async jobs waiting for a worker (all workers)", job_runner.queue.depth)
+metrics.register_gauge("jobs_busy", "Async jobs running in this worker", lambda: job_runner.busy)
@@ -0,0 +1,205 @@
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# ```json ... ``` (or bare ```) around a model's JSON answer
+_FENCE_RE = re.compile(r"^\s*```[a-zA-Z0-9_-]*\s*\n?(.*?)\n?\s*```\s*$", re.S)
+# inside a container value: the characters that change nesting or start a string
+_STRUCTURAL_RE = re.compile(r'["{}\[\]]')
+# inside a string: the closing quote or an escape
+_STRING_RE = re.compile(r'["\\]')
+_SCALAR_END_RE = re.compile(r"[,}\s]")
+_WHITESPACE = " \t\r\n"
+
+
+def strip_code_fence(text: str) -> str:
+    """The JSON inside a Markdown code fence, or `text` unchanged if there is none."""
+    match = _FENCE_RE.match(text)
+    return match.group(1) if match else text.strip()
+
+
+def loads_model_json(text: str) -> Any:
+    """
+    json.loads for model output: tolerates a code fence and, failing that,
+    prose around the outermost {...}. Raises ValueError when nothing parses.
+    """
+    body = strip_code_fence(text)
+    try:
+        return json.loads(body)
+    except ValueError:
+        start, end = body.find("{"), body.rfind("}")
+        if start < 0 or end <= start:
+            raise
+        return json.loads(body[start : end + 1])
+
+
+class TopLevelJSONStream:
+    """
+    Incremental parser for one JSON object arriving in chunks (a model's
+    token stream). feed() returns the (key, value) pairs of the top-level
+    members whose values completed in that chunk, so callers can act on
+    each section without waiting for the whole object. Anything before the
+    opening brace, such as a code fence, is skipped.
+
+    Only the top level is tracked; nested values are sliced out once their
+    closing bracket arrives and decoded with json.loads. close() returns the
+    whole object, falling back to loads_model_json on the full text if the
+    stream did not end as one well-formed object.
+    """
+
+    def __init__(self) -> None:
+        self._raw: List[str] = []
+        self._buf = ""
+        self._pos = 0
+        # start -> key -> colon -> value -> (container | string | scalar) -> key ... -> done
+        self._state = "start"
+        self._depth = 0
+        self._key: Optional[str] = None
+        self._start = 0
+        self.result: Dict[str, Any] = {}
+
+    @property
+    def done(self) -> bool:
+        return self._state == "done"
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        self._raw.append(chunk)
+        if self._state == "done":
+            return []
+        self._buf += chunk
+        out: List[Tuple[str, Any]] = []
+        while self._step(out):
+            pass
+        return out
+
+    def close(self) -> Dict[str, Any]:
+        if self._state != "done":
+            parsed = loads_model_json("".join(self._raw))
+            if not isinstance(parsed, dict):
+                raise ValueError("Model output is not a JSON object")
+            self.result = parsed
+            self._state = "done"
+        return self.result
+
+    # -- scanner ---------------------------------------------------------
+
+    def _skip_ws(self) -> bool:
+        """Advance past whitespace; False when the buffer ran out."""
+        buf, pos = self._buf, self._pos
+        while pos < len(buf) and buf[pos] in _WHITESPACE:
+            pos += 1
+        self._pos = pos
+        return pos < len(buf)
+
+    def _string_end(self, quote: int) -> int:
+        """Index just past the string opening at `quote`, or -1 if it hasn't closed yet."""
+        pos = quote + 1
+        while True:
+            match = _STRING_RE.search(self._buf, pos)
+            if match is None:
+                return -1
+            if match.group() == '"':
+                return match.end()
+            if match.end() >= len(self._buf):
+                return -1
+            pos = match.end() + 1  # skip the escaped character
+
+    def _emit(self, end: int, out: List[Tuple[str, Any]]) -> None:
+        value = json.loads(self._buf[self._start : end])
+        self.result[self._key] = value
+        out.append((self._key, value))
+        self._pos = end
+        self._state = "key"
+
+    def _step(self, out: List[Tuple[str, Any]]) -> bool:
+        """Make one transition; False when more input is needed."""
+        state, buf = self._state, self._buf
+
+        if state == "start":
+            brace = buf.find("{", self._pos)
+            if brace < 0:
+                self._pos = len(buf)
+                return False
+            self._pos = brace + 1
+            self._state = "key"
+            return True
+
+        if state == "key":
+            while self._skip_ws() and buf[self._pos] == ",":
+                self._pos += 1
+            if self._pos >= len(buf):
+                return False
+            char = buf[self._pos]
+            if char == "}":
+                self._pos += 1
+                self._state = "done"
+                return False
+            if char != '"':
+                raise ValueError(f"Expected a key at offset {self._pos}")
+            end = self._string_end(self._pos)
+            if end < 0:
+                return False
+            self._key = json.loads(buf[self._pos : end])
+            self._pos = end
+            self._state = "colon"
+            return True
+
+        if state == "colon":
+            if not self._skip_ws():
+                return False
+            if buf[self._pos] != ":":
+                raise ValueError(f"Expected ':' at offset {self._pos}")
+            self._pos += 1
+            self._state = "value"
+            return True
+
+        if state == "value":
+            if not self._skip_ws():
+                return False
+            self._start = self._pos
+            char = buf[self._pos]
+            if char in "{[":
+                self._depth = 0
+                self._state = "container"
+            elif char == '"':
+                self._state = "string"
+            else:
+                self._state = "scalar"
+            return True
+
+        if state == "string":
+            end = self._string_end(self._start)
+            if end < 0:
+                return False
+            self._emit(end, out)
+            return True
+
+        if state == "scalar":
+            match = _SCALAR_END_RE.search(buf, self._start)
+            if match is None:
+                return False
+            self._emit(match.start(), out)
+            return True
+
+        if state == "container":
+            while True:
+                match = _STRUCTURAL_RE.search(buf, self._pos)
+                if match is None:
+                    self._pos = len(buf)
+                    return False
+                char = match.group()
+                if char == '"':
+                    end = self._string_end(match.start())
+                    if end < 0:
+                        # resume from the opening quote once more text arrives
+                        self._pos = match.start()
+                        return False
+                    self._pos = end
+                    continue
+                self._pos = match.end()
+                self._depth += 1 if char in "{[" else -1
+                if self._depth == 0:
+                    self._emit(self._pos, out)
+                    return True
+
+        return False
@@ -0,0 +1,97 @@
+import re
+from collections import deque
+from typing import Dict, FrozenSet, List, Sequence, Set
+
+_NON_TOKEN_RE = re.compile(r"[^a-z0-9\+\#\.\-_/ ]+")
+_SPACES_RE = re.compile(r"\s+")
+
+
+def normalize_token(s: str) -> str:
+    s = s.lower().strip()
+    s = _NON_TOKEN_RE.sub(" ", s)
+    s = _SPACES_RE.sub(" ", s).strip()
+    return s
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over the normalized keywords.
+
+    Built once per request; each row is then scanned in a single pass instead
+    of re-normalizing every keyword and running one substring search each.
+    Matching semantics are the same as `normalize_token(kw) in
+    normalize_token(text)`, including overlaps ("java" and "javascript").
+    """
+
+    def __init__(self, keywords: Sequence[str]):
+        self.keywords: List[str] = list(keywords)
+
+        # pattern id -> positions in `keywords` (duplicates after normalization
+        # each count, like the per-keyword loop did)
+        patterns: Dict[str, int] = {}
+        self._pattern_keywords: List[List[int]] = []
+        for i, kw in enumerate(self.keywords):
+            nkw = normalize_token(kw)
+            if not nkw:
+                continue
+            pid = patterns.get(nkw)
+            if pid is None:
+                pid = patterns[nkw] = len(self._pattern_keywords)
+                self._pattern_keywords.append([])
+            self._pattern_keywords[pid].append(i)
+        self.pattern_count = len(self._pattern_keywords)
+
+        # trie
+        goto: List[Dict[str, int]] = [{}]
+        out: List[Set[int]] = [set()]
+        for nkw, pid in patterns.items():
+            state = 0
+            for ch in nkw:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    out.append(set())
+                state = nxt
+            out[state].add(pid)
+
+        # failure links, folded into a full transition table so scanning never
+        # has to walk fail chains
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict() for _ in goto]
+        delta[0] = dict(goto[0])
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            out[state] |= out[fail[state]]
+            delta[state] = dict(delta[fail[state]])
+            delta[state].update(goto[state])
+            for ch, nxt in goto[state].items():
+                fail[nxt] = delta[fail[state]].get(ch, 0)
+                queue.append(nxt)
+
+        self._delta = delta
+        self._out: List[FrozenSet[int]] = [frozenset(o) for o in out]
+
+    def _scan(self, text: str) -> Set[int]:
+        delta = self._delta
+        out = self._out
+        hits: Set[int] = set()
+        state = 0
+        for ch in normalize_token(text):
+            state = delta[state].get(ch, 0)
+            if out[state]:
+                hits |= out[state]
+        return hits
+
+    def score(self, text: str) -> int:
+        """Number of keywords found in `text` (same as the old _keyword_hit_score)."""
+        pk = self._pattern_keywords
+        return sum(len(pk[pid]) for pid in self._scan(text))
+
+    def hits(self, text: str) -> List[str]:
+        """The keywords found in `text`, in keyword order."""
+        pk = self._pattern_keywords
+        idx = sorted(i for pid in self._scan(text) for i in pk[pid])
+        return [self.keywords[i] for i in idx]
@@ -0,0 +1,68 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from app.services import metrics
+from app.services.metrics import span
+
+
+class LLMBusyError(RuntimeError):
+    """No LLM slot freed up within the queue timeout; callers should answer 429."""
+
+    def __init__(self, waited_seconds: float, retry_after: int):
+        super().__init__(f"LLM capacity exhausted after waiting {waited_seconds:.1f}s")
+        self.retry_after = retry_after
+
+
+class LLMLimiter:
+    """
+    Global cap on in-flight LLM calls for this worker. Callers over the cap
+    queue for up to `max_wait_seconds` and then get LLMBusyError.
+    """
+
+    def __init__(self, max_concurrency: int, max_wait_seconds: float):
+        self.max_concurrency = max_concurrency
+        self.max_wait_seconds = max_wait_seconds
+        self._sem = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        if self._sem.locked():
+            self.waiting += 1
+            try:
+                with span("llm_queue"):
+                    await asyncio.wait_for(self._sem.acquire(), timeout=self.max_wait_seconds)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                raise LLMBusyError(self.max_wait_seconds, retry_after=max(1, int(self.max_wait_seconds)))
+            finally:
+                self.waiting -= 1
+        else:
+            await self._sem.acquire()
+
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._sem.release()
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+        }
+
+
+llm_limiter = LLMLimiter(
+    max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "32")),
+    max_wait_seconds=float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "20")),
+)
+metrics.register_gauge("llm_in_flight", "LLM calls holding a limiter slot", lambda: llm_limiter.in_flight)
+metrics.register_gauge("llm_waiting", "LLM calls queued for a limiter slot", lambda: llm_limiter.waiting)
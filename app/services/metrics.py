@@ -0,0 +1,309 @@
+import bisect
+import contextvars
+import functools
+import inspect
+import os
+import threading
+import time
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+METRICS_PREFIX = "resucurate"
+
+LATENCY_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = list(self._values.items())
+        out += [f"{self.name}{_labels(self.label_names, k)} {_num(v)}" for k, v in items]
+        return out
+
+
+class Gauge:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def render(self) -> List[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        with self._lock:
+            items = list(self._values.items())
+        out += [f"{self.name}{_labels(self.label_names, k)} {_num(v)}" for k, v in items]
+        return out
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [bucket counts..., +Inf count], sum
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][i] += 1
+            entry[1][0] += value
+
+    def render(self) -> List[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(k, list(counts), total[0]) for k, (counts, total) in self._values.items()]
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = 'le="' + _num(bound) + '"'
+                out.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {cumulative}")
+            out.append(f"{self.name}_sum{_labels(self.label_names, key)} {_num(total)}")
+            out.append(f"{self.name}_count{_labels(self.label_names, key)} {cumulative}")
+        return out
+
+
+STAGE_SECONDS = Histogram(f"{METRICS_PREFIX}_stage_duration_seconds", "Time spent per pipeline stage", ["stage"])
+HTTP_SECONDS = Histogram(
+    f"{METRICS_PREFIX}_http_request_duration_seconds", "HTTP request latency", ["method", "route", "status"]
+)
+HTTP_IN_FLIGHT = Gauge(f"{METRICS_PREFIX}_http_requests_in_flight", "HTTP requests being served", ["method"])
+LLM_TOKENS = Counter(f"{METRICS_PREFIX}_llm_tokens_total", "LLM tokens reported by the model", ["direction"])
+LLM_CALLS = Counter(f"{METRICS_PREFIX}_llm_calls_total", "LLM calls by outcome", ["outcome"])
+UPLOADS_REJECTED = Counter(f"{METRICS_PREFIX}_uploads_rejected_total", "Uploads refused while streaming in", ["reason"])
+PARSE_JOBS = Counter(f"{METRICS_PREFIX}_parse_jobs_total", "Documents sent to the parse pool by outcome", ["outcome"])
+
+_METRICS: List[Any] = [STAGE_SECONDS, HTTP_SECONDS, HTTP_IN_FLIGHT, LLM_TOKENS, LLM_CALLS, UPLOADS_REJECTED, PARSE_JOBS]
+
+# (name, stats callable) - read at scrape time
+_caches: List[Tuple[str, Callable[[], Dict[str, Any]]]] = []
+# (metric name, help, callable returning the current value)
+_gauges: List[Tuple[str, str, Callable[[], float]]] = []
+
+
+def register_cache(name: str, stats: Callable[[], Dict[str, Any]]) -> None:
+    """Expose a cache's stats() (hits / misses / entries) at /metrics."""
+    _caches.append((name, stats))
+
+
+def register_gauge(name: str, help: str, value: Callable[[], float]) -> None:
+    """Expose a value sampled at scrape time, e.g. a queue depth."""
+    _gauges.append((f"{METRICS_PREFIX}_{name}", help, value))
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    lines: List[str] = []
+    for metric in _METRICS:
+        lines += metric.render()
+
+    cache_stats = []
+    for name, stats in _caches:
+        try:
+            cache_stats.append((name, stats()))
+        except Exception as e:
+            print(f"metrics: {name} cache stats failed: ", e)
+    for suffix, key, kind, help in (
+        ("cache_hits_total", "hits", "counter", "Cache hits"),
+        ("cache_misses_total", "misses", "counter", "Cache misses"),
+        ("cache_hit_ratio", "hit_rate", "gauge", "Cache hits / lookups since start"),
+        ("cache_entries", "entries", "gauge", "Entries in this worker's memory tier"),
+    ):
+        name = f"{METRICS_PREFIX}_{suffix}"
+        lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+        lines += [f'{name}{{cache="{c}"}} {_num(s.get(key, 0))}' for c, s in cache_stats]
+
+    for name, help, value in _gauges:
+        try:
+            current = value()
+        except Exception as e:
+            print(f"metrics: {name} failed: ", e)
+            continue
+        lines += [f"# HELP {name} {help}", f"# TYPE {name} gauge", f"{name} {_num(current)}"]
+    return "\n".join(lines) + "\n"
+
+
+# Stage timings of the current request, for the Server-Timing header.
+# Worker threads started with asyncio.to_thread see the same list.
+_request_timings: contextvars.ContextVar[Optional[List[Tuple[str, float]]]] = contextvars.ContextVar(
+    "request_timings", default=None
+)
+
+
+def record(stage: str, seconds: float) -> None:
+    STAGE_SECONDS.observe(seconds, stage)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((stage, seconds))
+
+
+class _timed_span:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc: Any) -> None:
+        record(self.stage, time.perf_counter() - self.start)
+
+
+# reusable, so a disabled span() costs one function call
+_NOOP = nullcontext()
+
+
+def span(stage: str):
+    """
+    Time a block as a pipeline stage:
+
+        with span("keywords"):
+            keywords = await extract_keywords(jd)
+
+    Works in sync and async code. A no-op when METRICS_ENABLED is off.
+    """
+    if not METRICS_ENABLED:
+        return _NOOP
+    return _timed_span(stage)
+
+
+def timed(stage: str):
+    """Decorator form of span() for sync and async functions."""
+
+    def decorator(fn):
+        if not METRICS_ENABLED:
+            return fn
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with _timed_span(stage):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _timed_span(stage):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def record_llm_usage(message: Any) -> None:
+    """Count input/output tokens from a LangChain message's usage_metadata."""
+    if not METRICS_ENABLED:
+        return
+    usage = getattr(message, "usage_metadata", None) or {}
+    if usage.get("input_tokens"):
+        LLM_TOKENS.inc("input", amount=usage["input_tokens"])
+    if usage.get("output_tokens"):
+        LLM_TOKENS.inc("output", amount=usage["output_tokens"])
+
+
+def server_timing(timings: Sequence[Tuple[str, float]]) -> str:
+    """Server-Timing value; repeated stages are summed and their count given as desc."""
+    totals: Dict[str, List[float]] = {}
+    for stage, seconds in timings:
+        entry = totals.setdefault(stage, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+    parts = []
+    for stage, (seconds, count) in totals.items():
+        part = f"{stage};dur={seconds * 1000:.1f}"
+        if count > 1:
+            part += f';desc="x{int(count)}"'
+        parts.append(part)
+    return ", ".join(parts)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware: counts in-flight requests, observes request
+    latency per route template and adds a Server-Timing header with the
+    stages recorded while the request ran (streaming responses only carry
+    the stages finished before their first byte).
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings: List[Tuple[str, float]] = []
+        token = _request_timings.set(timings)
+        start = time.perf_counter()
+        status = [500]
+        HTTP_IN_FLIGHT.inc(scope["method"])
+
+        async def send_with_timing(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                total = (time.perf_counter() - start) * 1000
+                value = server_timing(timings)
+                value = f"{value}, total;dur={total:.1f}" if value else f"total;dur={total:.1f}"
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"server-timing", value.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            HTTP_IN_FLIGHT.dec(scope["method"])
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            HTTP_SECONDS.observe(time.perf_counter() - start, scope["method"], route_path, str(status[0]))
+            _request_timings.reset(token)
@@ -0,0 +1,194 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from app.services.cache import content_hash
+from app.services.fake_model import load_fake_model, prompt_text
+
+# "gemini" (default), "fake", "record" (gemini + save every response) or
+# "replay" (serve saved responses, no network)
+MODEL_PROVIDER = os.getenv("MODEL_PROVIDER", "gemini")
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+MODEL_RECORD_DIR = os.getenv("MODEL_RECORD_DIR", "model-recordings")
+
+_model: Any = None
+_lock = threading.Lock()
+
+
+class ReplayMissError(LookupError):
+    """No recording for this prompt and no replay fallback configured."""
+
+
+def _gemini_model() -> Any:
+    from dotenv import load_dotenv
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    load_dotenv()
+    return ChatGoogleGenerativeAI(model=GEMINI_MODEL, temperature=0.1)
+
+
+def recording_key(messages: Any) -> str:
+    return content_hash(GEMINI_MODEL, prompt_text(messages))[:32]
+
+
+class RecordingModel:
+    """
+    Wraps a real model and writes every response (text, stream chunks, usage
+    and latency) to `directory/<key>.json`, keyed on the model name + prompt.
+    Recordings contain the prompts, i.e. resume text; keep them private.
+    """
+
+    def __init__(self, inner: Any, directory: str):
+        self.inner = inner
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _save(self, messages: Any, content: str, usage: Optional[Dict[str, Any]], latency: float, chunks: Optional[List[str]] = None) -> None:
+        key = recording_key(messages)
+        record = {
+            "key": key,
+            "model": GEMINI_MODEL,
+            "prompt": prompt_text(messages),
+            "content": content,
+            "chunks": chunks,
+            "usage_metadata": dict(usage) if usage else None,
+            "latency_seconds": latency,
+            "recorded_at": time.time(),
+        }
+        # write-then-rename so a replaying worker never reads half a file
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False)
+        os.replace(tmp, os.path.join(self.directory, f"{key}.json"))
+
+    def invoke(self, messages: Any) -> Any:
+        t0 = time.perf_counter()
+        response = self.inner.invoke(messages)
+        self._save(messages, str(response.content), getattr(response, "usage_metadata", None), time.perf_counter() - t0)
+        return response
+
+    async def ainvoke(self, messages: Any) -> Any:
+        t0 = time.perf_counter()
+        response = await self.inner.ainvoke(messages)
+        await asyncio.to_thread(
+            self._save, messages, str(response.content), getattr(response, "usage_metadata", None), time.perf_counter() - t0
+        )
+        return response
+
+    async def astream(self, messages: Any) -> AsyncIterator[Any]:
+        from app.services.genai_integration import message_text
+
+        t0 = time.perf_counter()
+        chunks: List[str] = []
+        usage = None
+        async for chunk in self.inner.astream(messages):
+            chunks.append(message_text(chunk))
+            usage = getattr(chunk, "usage_metadata", None) or usage
+            yield chunk
+        await asyncio.to_thread(self._save, messages, "".join(chunks), usage, time.perf_counter() - t0, chunks)
+
+
+class ReplayModel:
+    """
+    Serves responses saved by RecordingModel. `latency` is "recorded" (sleep
+    as long as the original call took) or "none". Prompts without a recording
+    go to `fallback` when given, otherwise raise ReplayMissError.
+    """
+
+    def __init__(self, directory: str, latency: str = "recorded", fallback: Any = None):
+        self.directory = directory
+        self.latency = latency
+        self.fallback = fallback
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self, messages: Any) -> Optional[Dict[str, Any]]:
+        path = os.path.join(self.directory, f"{recording_key(messages)}.json")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return record
+
+    def _delay(self, record: Dict[str, Any]) -> float:
+        return float(record.get("latency_seconds") or 0.0) if self.latency == "recorded" else 0.0
+
+    def _miss(self, messages: Any) -> ReplayMissError:
+        return ReplayMissError(f"No recording for prompt {recording_key(messages)} in {self.directory}")
+
+    def invoke(self, messages: Any) -> Any:
+        record = self._load(messages)
+        if record is None:
+            if self.fallback is None:
+                raise self._miss(messages)
+            return self.fallback.invoke(messages)
+        from langchain_core.messages import AIMessage
+
+        time.sleep(self._delay(record))
+        return AIMessage(content=record["content"], usage_metadata=record.get("usage_metadata"))
+
+    async def ainvoke(self, messages: Any) -> Any:
+        record = await asyncio.to_thread(self._load, messages)
+        if record is None:
+            if self.fallback is None:
+                raise self._miss(messages)
+            return await self.fallback.ainvoke(messages)
+        from langchain_core.messages import AIMessage
+
+        await asyncio.sleep(self._delay(record))
+        return AIMessage(content=record["content"], usage_metadata=record.get("usage_metadata"))
+
+    async def astream(self, messages: Any) -> AsyncIterator[Any]:
+        record = await asyncio.to_thread(self._load, messages)
+        if record is None:
+            if self.fallback is None:
+                raise self._miss(messages)
+            async for chunk in self.fallback.astream(messages):
+                yield chunk
+            return
+        from langchain_core.messages import AIMessageChunk
+
+        chunks = record.get("chunks") or [record["content"]]
+        per_chunk = self._delay(record) / len(chunks)
+        for n, piece in enumerate(chunks):
+            await asyncio.sleep(per_chunk)
+            last = n == len(chunks) - 1
+            yield AIMessageChunk(content=piece, usage_metadata=record.get("usage_metadata") if last else None)
+
+
+def build_model(provider: str) -> Any:
+    if provider == "gemini":
+        return _gemini_model()
+    if provider == "fake":
+        return load_fake_model()
+    if provider == "record":
+        return RecordingModel(_gemini_model(), MODEL_RECORD_DIR)
+    if provider == "replay":
+        fallback = load_fake_model() if os.getenv("MODEL_REPLAY_FALLBACK") == "fake" else None
+        return ReplayModel(MODEL_RECORD_DIR, latency=os.getenv("MODEL_REPLAY_LATENCY", "recorded"), fallback=fallback)
+    raise ValueError(f"Unknown MODEL_PROVIDER {provider!r}; expected gemini, fake, record or replay")
+
+
+def get_model() -> Any:
+    """The chat model for this process, built on first use from MODEL_PROVIDER."""
+    global _model
+    if _model is None:
+        with _lock:
+            if _model is None:
+                _model = build_model(MODEL_PROVIDER)
+                print(f"model provider: {MODEL_PROVIDER} ({type(_model).__name__})")
+    return _model
+
+
+def set_model(model: Any) -> None:
+    """Override the model (tests, benchmarks); None rebuilds from config on next use."""
+    global _model
+    with _lock:
+        _model = model
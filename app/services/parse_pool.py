@@ -0,0 +1,190 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.reduction import ForkingPickler
+from typing import Any, Callable, Dict, Optional
+
+from app.services import metrics
+from app.services.metrics import PARSE_JOBS, span
+
+# PyMuPDF holds the GIL for most of a parse, so a thread only moves the work
+# off the event loop, it doesn't stop it competing with every other request.
+# Parses run in worker processes instead. PARSE_WORKERS=0 falls back to a thread.
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+# documents allowed to wait for a worker; past that, new requests are shed
+PARSE_QUEUE_DEPTH = int(os.getenv("PARSE_QUEUE_DEPTH", "32"))
+PARSE_TIMEOUT_SECONDS = float(os.getenv("PARSE_TIMEOUT_SECONDS", "30"))
+PARSE_RETRY_AFTER = int(os.getenv("PARSE_RETRY_AFTER", "2"))
+
+
+class ParsePoolBusy(Exception):
+    """Every worker is busy and the wait queue is full; callers should answer 503."""
+
+    def __init__(self, queued: int, retry_after: int):
+        super().__init__(f"Parse queue is full ({queued} waiting)")
+        self.retry_after = retry_after
+
+
+class ParseTimeout(Exception):
+    def __init__(self, seconds: float):
+        super().__init__(f"Document took longer than {seconds:g}s to parse")
+        self.seconds = seconds
+
+
+def _reduce_memoryview(view: memoryview) -> tuple:
+    # Uploads reach the pool as memoryviews over the request buffer (see
+    # read_resume_upload). A spawned worker only gets what is pickled, and the
+    # executor pickles at protocol 4, which supports neither memoryview nor
+    # PickleBuffer, so one copy into the pickle stream is unavoidable. Doing
+    # it here keeps that copy on the executor's feeder thread, during pickling,
+    # and frees it once the call is sent, instead of copying on the event loop
+    # and holding a second buffer for the whole parse.
+    return bytes, (view.tobytes(),)
+
+
+ForkingPickler.register(memoryview, _reduce_memoryview)
+
+
+def _init_worker() -> None:
+    import fitz  # noqa: F401  PyMuPDF, loaded once per worker instead of on the first document
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+class ParsePool:
+    """
+    Process pool for document parsing with admission control.
+
+    At most `workers` documents parse at once; up to `max_queued` more wait
+    for a slot, and anything beyond that is refused straight away with
+    ParsePoolBusy. A parse that runs past `timeout_seconds` raises
+    ParseTimeout, and its worker processes are killed and replaced, since a
+    running call can't be cancelled; documents that were parsing alongside it
+    are retried once on the new pool.
+    """
+
+    def __init__(self, workers: int, max_queued: int, timeout_seconds: float, retry_after: int):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.timeout_seconds = timeout_seconds
+        self.retry_after = retry_after
+        self.busy = 0
+        self.queued = 0
+        self.restarts = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process that runs the event loop and worker threads isn't safe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+            return self._executor
+
+    def _replace(self, executor: ProcessPoolExecutor) -> None:
+        with self._lock:
+            # a concurrent timeout may already have replaced it
+            if self._executor is not executor:
+                return
+            self._executor = None
+        self.restarts += 1
+        # no public way to stop a running call; end the worker processes instead
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def warm(self) -> None:
+        """Start the worker processes (blocking; the startup warm-up runs it in a thread)."""
+        if not self.enabled:
+            _init_worker()
+            return
+        executor = self._get_executor()
+        wait([executor.submit(_ping) for _ in range(self.workers)], timeout=60)
+
+    async def run(self, fn: Callable[..., Any], *args: Any, shed: bool = True) -> Any:
+        """
+        fn(*args) in a worker process. With shed=False the call waits for a
+        slot however long the queue is (for work that is already bounded,
+        like the files of one batch).
+        """
+        if not self.enabled:
+            return await asyncio.to_thread(fn, *args)
+        if shed and self.busy + self.queued >= self.workers + self.max_queued:
+            PARSE_JOBS.inc("rejected")
+            raise ParsePoolBusy(self.queued, self.retry_after)
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+        slots = self._slots
+        self.queued += 1
+        try:
+            with span("parse_wait"):
+                await slots.acquire()
+        finally:
+            self.queued -= 1
+
+        self.busy += 1
+        try:
+            loop = asyncio.get_running_loop()
+            for attempt in range(2):
+                executor = self._get_executor()
+                try:
+                    result = await asyncio.wait_for(loop.run_in_executor(executor, fn, *args), self.timeout_seconds)
+                except asyncio.TimeoutError:
+                    PARSE_JOBS.inc("timeout")
+                    self._replace(executor)
+                    raise ParseTimeout(self.timeout_seconds)
+                except BrokenProcessPool:
+                    # another document's timeout or a crashed worker took the pool down
+                    self._replace(executor)
+                    if attempt:
+                        PARSE_JOBS.inc("crashed")
+                        raise
+                    continue
+                except Exception:
+                    PARSE_JOBS.inc("error")
+                    raise
+                PARSE_JOBS.inc("ok")
+                return result
+        finally:
+            self.busy -= 1
+            slots.release()
+
+    async def stop(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        self._slots = None
+        if executor is not None:
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "busy": self.busy,
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "restarts": self.restarts,
+        }
+
+
+parse_pool = ParsePool(PARSE_WORKERS, PARSE_QUEUE_DEPTH, PARSE_TIMEOUT_SECONDS, PARSE_RETRY_AFTER)
+metrics.register_gauge("parse_pool_busy", "Documents being parsed in this worker's process pool", lambda: parse_pool.busy)
+metrics.register_gauge("parse_pool_queued", "Documents waiting for a parse process", lambda: parse_pool.queued)
+metrics.register_gauge(
+    "parse_pool_saturation",
+    "Busy parse processes / pool size",
+    lambda: parse_pool.busy / parse_pool.workers if parse_pool.workers else 0.0,
+)
@@ -1,48 +1,85 @@
-import fitz  # PyMuPDF
-from docx import Document
 import io
 import re
 
+# PyMuPDF and python-docx are imported on first use (or by the startup warm-up)
+# so importing the app stays cheap.
+
 # ---------- PDF TEXT EXTRACTION ----------
-def extract_textpdf(file_bytes):
+# One pass instead of two re.sub calls: any run of non-ASCII characters and/or
+# whitespace collapses to a single space. The class is "not printable ASCII and
+# not ASCII control", i.e. non-ASCII plus everything str-mode \s matches in ASCII
+# (\t-\r, \x1c-\x1f and space).
+_NORMALIZE_RE = re.compile(r"[^\x00-\x08\x0e-\x1b!-\x7f]+")
+
+
+def normalize_block(text):
+    return _NORMALIZE_RE.sub(" ", text).strip()
+
+
+def annotation_url(uri):
+    """Normalize a link-annotation URI; returns None for links we don't keep."""
+    if not uri or not isinstance(uri, str):
+        return None
+    uri = uri.strip()
+    if not uri or uri.startswith(("mailto:", "tel:", "#")):
+        return None
+    if uri.startswith(("http://", "https://")):
+        return uri
+    if "linkedin.com" in uri or "github.com" in uri:
+        return uri if "://" in uri else "https://" + uri
+    return None
+
+
+def extract_pdf(file_bytes):
+    """
+    Parse the PDF once and return everything the ATS path needs:
+    normalized text, annotation links, links found in the text and the
+    classified union of both.
+    """
+    import fitz  # PyMuPDF
+
     doc = fitz.open(stream=file_bytes, filetype="pdf")
     blocks = []
+    annotation_links = set()
+
+    try:
+        for page in doc:
+            for b in page.get_text("blocks"):
+                text = normalize_block(b[4])
+                if text:
+                    blocks.append(text)
+            for link in page.get_links():
+                url = annotation_url(link.get("uri"))
+                if url:
+                    annotation_links.add(url)
+    finally:
+        doc.close()
+
+    text = "\n".join(blocks)
+    annotation_links = list(annotation_links)
+    text_links = extract_links(text)
+    return {
+        "text": text,
+        "annotation_links": annotation_links,
+        "text_links": text_links,
+        "links": classify_links(list(set(annotation_links + text_links))),
+    }
 
-    for page in doc:
-        for b in page.get_text("blocks"):
-            text = b[4]
-            text = re.sub(r"[^\x00-\x7F]+", " ", text)
-            text = re.sub(r"\s+", " ", text).strip()
-            if text:
-                blocks.append(text)
 
-    doc.close()
-    return "\n".join(blocks)
+def extract_textpdf(file_bytes):
+    return extract_pdf(file_bytes)["text"]
 
 
 def extract_links_from_pdf(file_bytes):
     """Extract URLs from PDF link annotations (clickable hyperlinks).
     get_text() only returns plain text; actual URLs are stored in link annotations.
     """
-    doc = fitz.open(stream=file_bytes, filetype="pdf")
-    urls = []
-    for page in doc:
-        for link in page.get_links():
-            uri = link.get("uri")
-            if not uri or not isinstance(uri, str):
-                continue
-            uri = uri.strip()
-            if not uri or uri.startswith(("mailto:", "tel:", "#")):
-                continue
-            if uri.startswith(("http://", "https://")):
-                urls.append(uri)
-            elif "linkedin.com" in uri or "github.com" in uri:
-                urls.append(uri if "://" in uri else "https://" + uri)
-    doc.close()
-    return list(set(urls))
+    return extract_pdf(file_bytes)["annotation_links"]
 
 # ---------- DOCX TEXT EXTRACTION ----------
 def extract_textdocs(file_bytes):
+    from docx import Document
+
     doc = Document(io.BytesIO(file_bytes))
     return "\n".join(p.text for p in doc.paragraphs if p.text.strip())
 
@@ -82,17 +119,15 @@ if __name__ == "__main__":
     with open("resume.pdf", "rb") as f:
         file_bytes = f.read()
 
-    text = extract_textpdf(file_bytes)
+    # Text + links (PDF annotations and plain text) from a single parse
+    extracted = extract_pdf(file_bytes)
+    text = extracted["text"]
 
     # Save extracted text
     with open("demo.txt", "w", encoding="utf-8") as f:
         f.write(text)
 
-    # Extract links: from PDF annotations (clickable URLs) + from plain text
-    links_from_pdf = extract_links_from_pdf(file_bytes)
-    links_from_text = extract_links(text)
-    links = list(set(links_from_pdf + links_from_text))
-    classified_links = classify_links(links)
+    classified_links = extracted["links"]
 
     # Save links
     with open("links.txt", "w", encoding="utf-8") as f:
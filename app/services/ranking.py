@@ -0,0 +1,80 @@
+import os
+from typing import List, Optional, Sequence
+
+from app.services.keyword_matcher import normalize_token
+
+RANKING_ENGINES = ("keyword", "tfidf", "bm25")
+DEFAULT_RANKING_ENGINE = os.getenv("RANKING_ENGINE", "keyword")
+
+# Keeps tech tokens like "c++", "c#", "node.js" and "ci/cd" intact.
+TOKEN_PATTERN = r"[a-z0-9\+\#]+(?:[\.\-_/][a-z0-9\+\#]+)*"
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def resolve_engine(engine: Optional[str] = None) -> str:
+    engine = engine or DEFAULT_RANKING_ENGINE
+    if engine not in RANKING_ENGINES:
+        raise ValueError(f"Unknown ranking engine '{engine}'. Use one of: {', '.join(RANKING_ENGINES)}")
+    return engine
+
+
+def vector_scores(texts: Sequence[str], keywords: Sequence[str], engine: str):
+    """
+    Relevance of each text to the keyword set as a numpy vector, computed
+    with one sparse matrix product ("tfidf" or "bm25").
+    """
+    import numpy as np
+    from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+
+    n = len(texts)
+    kws = [k for k in keywords if normalize_token(k)]
+    if not n or not kws:
+        return np.zeros(n)
+
+    common = dict(preprocessor=normalize_token, token_pattern=TOKEN_PATTERN, ngram_range=(1, 2))
+    try:
+        if engine == "tfidf":
+            vec = TfidfVectorizer(sublinear_tf=True, **common)
+            X = vec.fit_transform(texts)
+            Q = vec.transform(kws)
+            return np.asarray((X @ Q.T).sum(axis=1)).ravel()
+
+        vec = CountVectorizer(**common)
+        tf = vec.fit_transform(texts).tocsr().astype(np.float64)
+    except ValueError:
+        # empty vocabulary: nothing tokenizable in any row
+        return np.zeros(n)
+
+    # bm25
+    doc_len = np.asarray(tf.sum(axis=1)).ravel()
+    avg_len = doc_len.mean() or 1.0
+    df = np.bincount(tf.indices, minlength=tf.shape[1])
+    idf = np.log1p((n - df + 0.5) / (df + 0.5))
+    rows = np.repeat(np.arange(n), np.diff(tf.indptr))
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_len[rows] / avg_len)
+    tf.data = tf.data * (BM25_K1 + 1) / (tf.data + norm)
+    query_terms = np.asarray((vec.transform(kws) > 0).sum(axis=0)).ravel() > 0
+    return tf @ (idf * query_terms)
+
+
+def select_top(scores, limit: int) -> List[int]:
+    """
+    Indices of the best `limit` rows with a positive score, highest first and
+    ties in original order; falls back to the first `limit` rows when nothing
+    scored. Uses a partial selection rather than sorting every row.
+    """
+    import numpy as np
+
+    scores = np.asarray(scores, dtype=float)
+    pos = np.flatnonzero(scores > 0)
+    if pos.size == 0:
+        return list(range(min(limit, scores.size)))
+    if pos.size > limit:
+        cut = pos.size - limit
+        kth = np.partition(scores[pos], cut)[cut]
+        above = pos[scores[pos] > kth]
+        ties = pos[scores[pos] == kth][: limit - above.size]
+        pos = np.concatenate([above, ties])
+    return pos[np.lexsort((pos, -scores[pos]))].tolist()
@@ -0,0 +1,463 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.services import metrics
+from app.services.cache import LazySQLite, durable_path
+from app.services.metrics import span
+from app.services.supabase_client import get_supabase_client, run_supabase
+
+RESUME_BUCKET = "resumes"
+RESUME_TABLE = "resumes"
+
+# "sync" uploads + inserts before responding. "write_behind" returns as soon
+# as the resume is in the local outbox and persists it in the background; the
+# resumes row (and its database-assigned id) exists only once that is done,
+# so those responses carry a persist_id to poll instead.
+RESUME_PERSIST_MODE = os.getenv("RESUME_PERSIST_MODE", "sync")
+# how long a stored entry's resume_id stays queryable by persist_id
+RESUME_OUTBOX_KEEP_SECONDS = float(os.getenv("RESUME_OUTBOX_KEEP_SECONDS", "86400"))
+
+
+def upload_resume_file(
+    supabase: Any,
+    file_path: str,
+    file_bytes: bytes,
+    content_type: str = "application/json",
+    upsert: bool = False,
+    content_encoding: Optional[str] = None,
+) -> None:
+    """Upload to the resumes bucket; raises RuntimeError when Storage reports an error."""
+    # Explicitly set contentType so Storage doesn't reject JSON as text/plain.
+    # If your bucket still rejects this, consider allowing "text/plain" or
+    # changing this to "application/octet-stream" in your project.
+    file_options: Dict[str, Any] = {"content-type": content_type}
+    if content_encoding:
+        # Storage doesn't keep arbitrary response headers; record the
+        # encoding in the object's user metadata for readers.
+        file_options["metadata"] = {"content-encoding": content_encoding}
+    if upsert:
+        # retries of a half-finished upload must not fail on "already exists"
+        file_options["upsert"] = "true"
+    try:
+        storage_res = supabase.storage.from_(RESUME_BUCKET).upload(
+            path=file_path,
+            file=file_bytes,
+            file_options=file_options,
+        )
+    except TypeError:
+        # Fallback for clients that require explicit options but with strict typing
+        storage_res = supabase.storage.from_(RESUME_BUCKET).upload(file_path, file_bytes, file_options)
+
+    # Older supabase-py returns a dict with possible "error" key; newer returns an object.
+    if isinstance(storage_res, dict):
+        storage_error = storage_res.get("error")
+    else:
+        storage_error = getattr(storage_res, "error", None)
+        data_attr = getattr(storage_res, "data", None)
+        if not storage_error and isinstance(data_attr, dict):
+            storage_error = data_attr.get("error")
+    if storage_error:
+        raise RuntimeError(f"Storage upload failed: {storage_error}")
+
+
+def insert_resume_rows(supabase: Any, rows: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Insert rows into the resumes table in one request and return the stored rows."""
+    db_res = supabase.table(RESUME_TABLE).insert(list(rows)).execute()
+    data = getattr(db_res, "data", None)
+    if not data or not isinstance(data, list):
+        raise RuntimeError(f"Invalid Supabase DB response: {data}")
+    for row in data:
+        if not isinstance(row, dict) or "id" not in row:
+            raise RuntimeError(f"Unexpected resumes row: {row}")
+    return data
+
+
+def find_resume_id(supabase: Any, file_path: str) -> Optional[str]:
+    """Id of the resumes row already stored for `file_path`, if any."""
+    res = supabase.table(RESUME_TABLE).select("id").eq("file_path", file_path).limit(1).execute()
+    data = getattr(res, "data", None) or []
+    return str(data[0]["id"]) if data else None
+
+
+def resume_public_url(supabase: Any, file_path: str) -> Optional[str]:
+    """Public URL for the stored JSON (if bucket is public); computed locally, no request."""
+    public = supabase.storage.from_(RESUME_BUCKET).get_public_url(file_path)
+    if isinstance(public, str):
+        return public
+    return getattr(public, "public_url", None) or getattr(public, "data", {}).get("publicUrl")  # type: ignore[union-attr]
+
+
+def _is_duplicate(error: Exception) -> bool:
+    # unique_violation: the row made it in before a crash or timeout
+    text = str(error)
+    return "23505" in text or "duplicate key" in text.lower()
+
+
+class ResumeOutbox(LazySQLite):
+    """
+    Durable local outbox for resumes that still have to reach Supabase.
+
+    Entries are keyed by a local persist_id and move from stage `upload` to
+    `insert` to `stored`, where the body is dropped and the database-assigned
+    resume_id is kept for `keep_seconds` so clients can look it up. Entries
+    are claimed with a short lease so several uvicorn workers can share one
+    file; an entry that keeps failing is parked in stage `dead` after
+    `max_attempts` instead of being dropped.
+    """
+
+    isolation_level = None
+
+    def __init__(self, path: str, lease_seconds: float = 60.0, max_attempts: int = 10, keep_seconds: float = 86400.0):
+        super().__init__(path)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.keep_seconds = keep_seconds
+        self._lock = threading.Lock()
+
+    def _setup(self, conn: sqlite3.Connection) -> None:
+        conn.execute("PRAGMA synchronous=FULL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS resume_outbox ("
+            "id TEXT PRIMARY KEY, user_id TEXT NOT NULL, file_name TEXT NOT NULL, file_path TEXT NOT NULL, "
+            "body BLOB NOT NULL, content_type TEXT NOT NULL, stage TEXT NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, last_error TEXT, "
+            "created_at REAL NOT NULL, next_attempt_at REAL NOT NULL, lease_until REAL NOT NULL DEFAULT 0)"
+        )
+        # outbox files created before these columns existed
+        for column in ("content_encoding TEXT", "resume_id TEXT", "insert_started_at REAL", "stored_at REAL"):
+            try:
+                conn.execute(f"ALTER TABLE resume_outbox ADD COLUMN {column}")
+            except sqlite3.OperationalError:
+                pass
+        conn.execute("CREATE INDEX IF NOT EXISTS resume_outbox_due ON resume_outbox (stage, next_attempt_at)")
+
+    def add(
+        self,
+        persist_id: str,
+        user_id: str,
+        file_name: str,
+        file_path: str,
+        body: bytes,
+        content_type: str,
+        content_encoding: Optional[str] = None,
+    ) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO resume_outbox (id, user_id, file_name, file_path, body, content_type, content_encoding, "
+                "stage, created_at, next_attempt_at) VALUES (?, ?, ?, ?, ?, ?, ?, 'upload', ?, ?)",
+                (persist_id, user_id, file_name, file_path, sqlite3.Binary(body), content_type, content_encoding, now, now),
+            )
+
+    def claim(self, limit: int) -> List[Dict[str, Any]]:
+        """Lease up to `limit` due entries."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT id, user_id, file_name, file_path, body, content_type, content_encoding, stage, attempts, "
+                    "insert_started_at "
+                    "FROM resume_outbox WHERE stage IN ('upload', 'insert') AND next_attempt_at <= ? "
+                    "AND lease_until < ? ORDER BY created_at LIMIT ?",
+                    (now, now, limit),
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE resume_outbox SET lease_until = ? WHERE id = ?",
+                    [(now + self.lease_seconds, r[0]) for r in rows],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        keys = (
+            "id", "user_id", "file_name", "file_path", "body", "content_type", "content_encoding", "stage", "attempts",
+            "insert_started_at",
+        )
+        return [dict(zip(keys, r)) for r in rows]
+
+    def mark_uploaded(self, persist_id: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE resume_outbox SET stage = 'insert', attempts = 0, last_error = NULL WHERE id = ?",
+                (persist_id,),
+            )
+
+    def mark_inserting(self, persist_ids: Sequence[str]) -> None:
+        """Recorded before the insert request: from then on a row may exist even if we never hear back."""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE resume_outbox SET insert_started_at = ? WHERE id = ?", [(now, i) for i in persist_ids]
+            )
+
+    def done(self, stored: Dict[str, str]) -> None:
+        """Mark entries stored ({persist_id: resume_id}) and prune old stored ones."""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE resume_outbox SET stage = 'stored', resume_id = ?, stored_at = ?, body = x'', "
+                "last_error = NULL, lease_until = 0 WHERE id = ?",
+                [(resume_id, now, persist_id) for persist_id, resume_id in stored.items()],
+            )
+            self._conn.execute(
+                "DELETE FROM resume_outbox WHERE stage = 'stored' AND stored_at < ?", (now - self.keep_seconds,)
+            )
+
+    def status(self, persist_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT stage, resume_id, file_path, attempts, last_error FROM resume_outbox WHERE id = ?",
+                (persist_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        stage, resume_id, file_path, attempts, last_error = row
+        status = {"upload": "pending", "insert": "pending"}.get(stage, stage)
+        return {
+            "persist_id": persist_id,
+            "status": status,
+            "resume_id": resume_id,
+            "file_path": file_path,
+            "attempts": attempts,
+            "error": last_error if status != "stored" else None,
+        }
+
+    def failed(self, entry: Dict[str, Any], error: str, delay_seconds: float) -> None:
+        attempts = entry["attempts"] + 1
+        stage = "dead" if attempts >= self.max_attempts else entry["stage"]
+        with self._lock:
+            self._conn.execute(
+                "UPDATE resume_outbox SET attempts = ?, last_error = ?, stage = ?, next_attempt_at = ?, "
+                "lease_until = 0 WHERE id = ?",
+                (attempts, error, stage, time.time() + delay_seconds, entry["id"]),
+            )
+        if stage == "dead":
+            print(f"resume outbox: giving up on {entry['file_path']} after {attempts} attempts: ", error)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT stage, COUNT(*) FROM resume_outbox GROUP BY stage").fetchall())
+            oldest = self._conn.execute(
+                "SELECT MIN(created_at) FROM resume_outbox WHERE stage IN ('upload', 'insert')"
+            ).fetchone()[0]
+        return {
+            "pending_upload": counts.get("upload", 0),
+            "pending_insert": counts.get("insert", 0),
+            "dead": counts.get("dead", 0),
+            "oldest_pending_seconds": (now - oldest) if oldest is not None else 0.0,
+        }
+
+
+class ResumePersister:
+    """
+    Background stage that drains the ResumeOutbox: uploads are done
+    concurrently, then the rows of every uploaded resume are written to the
+    resumes table in one batched insert. Failures back off exponentially
+    (base_delay * 2**attempts, capped at max_delay).
+    """
+
+    def __init__(
+        self,
+        outbox: ResumeOutbox,
+        batch_size: int = 50,
+        batch_window_seconds: float = 0.2,
+        poll_seconds: float = 5.0,
+        base_delay_seconds: float = 1.0,
+        max_delay_seconds: float = 300.0,
+    ):
+        self.outbox = outbox
+        self.batch_size = batch_size
+        self.batch_window_seconds = batch_window_seconds
+        self.poll_seconds = poll_seconds
+        self.base_delay_seconds = base_delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.uploaded = 0
+        self.inserted = 0
+        self.insert_batches = 0
+        self.retries = 0
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    async def submit(
+        self,
+        persist_id: str,
+        user_id: str,
+        file_name: str,
+        file_path: str,
+        body: bytes,
+        content_type: str,
+        content_encoding: Optional[str] = None,
+    ) -> None:
+        """Durably queue a resume; returns once it is committed to the outbox."""
+        await asyncio.to_thread(
+            self.outbox.add, persist_id, user_id, file_name, file_path, body, content_type, content_encoding
+        )
+        if self._wake is not None:
+            self._wake.set()
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            # one last pass so a clean shutdown leaves nothing behind
+            try:
+                await asyncio.wait_for(self.drain(), timeout=10)
+            except Exception as e:
+                print("resume persister: final drain incomplete: ", e)
+
+    async def drain(self) -> int:
+        """Process due entries until none are left; returns how many were stored."""
+        stored = 0
+        while True:
+            n, claimed = await self._process_batch()
+            stored += n
+            if claimed < self.batch_size:
+                return stored
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": RESUME_PERSIST_MODE,
+            **self.outbox.stats(),
+            "uploaded": self.uploaded,
+            "inserted": self.inserted,
+            "insert_batches": self.insert_batches,
+            "retries": self.retries,
+        }
+
+    async def _loop(self) -> None:
+        assert self._wake is not None
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_seconds)
+                # give concurrent requests a moment to land in the same batch
+                await asyncio.sleep(self.batch_window_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.drain()
+            except Exception as e:
+                print("resume persister: batch failed: ", e)
+
+    def _delay(self, attempts: int) -> float:
+        return min(self.max_delay_seconds, self.base_delay_seconds * 2 ** attempts)
+
+    async def _fail(self, entry: Dict[str, Any], error: Exception) -> None:
+        self.retries += 1
+        print(f"resume persister: {entry['stage']} of {entry['file_path']} failed: ", error)
+        await asyncio.to_thread(self.outbox.failed, entry, str(error), self._delay(entry["attempts"]))
+
+    async def _process_batch(self) -> tuple[int, int]:
+        entries = await asyncio.to_thread(self.outbox.claim, self.batch_size)
+        if not entries:
+            return 0, 0
+        supabase = get_supabase_client()
+
+        async def _upload(entry: Dict[str, Any]) -> None:
+            try:
+                with span("persist_upload"):
+                    await run_supabase(
+                        upload_resume_file,
+                        supabase,
+                        entry["file_path"],
+                        bytes(entry["body"]),
+                        entry["content_type"],
+                        upsert=True,
+                        content_encoding=entry["content_encoding"],
+                    )
+            except Exception as e:
+                await self._fail(entry, e)
+                return
+            await asyncio.to_thread(self.outbox.mark_uploaded, entry["id"])
+            entry.update(stage="insert", attempts=0)
+            self.uploaded += 1
+
+        await asyncio.gather(*[_upload(e) for e in entries if e["stage"] == "upload"])
+        ready = [e for e in entries if e["stage"] == "insert"]
+        if not ready:
+            return 0, len(entries)
+
+        stored: Dict[str, str] = {}
+        # resumes.id is assigned by the database, so a retried insert can't be
+        # deduplicated on it: if an earlier attempt may have landed (crash or
+        # timeout after the request went out), look the row up by file_path
+        failed = set()
+        for entry in ready:
+            if entry["insert_started_at"] is None:
+                continue
+            try:
+                resume_id = await run_supabase(find_resume_id, supabase, entry["file_path"])
+            except Exception as e:
+                await self._fail(entry, e)
+                failed.add(entry["id"])
+                continue
+            if resume_id is not None:
+                stored[entry["id"]] = resume_id
+        ready = [e for e in ready if e["id"] not in stored and e["id"] not in failed]
+
+        if ready:
+            await asyncio.to_thread(self.outbox.mark_inserting, [e["id"] for e in ready])
+            rows = [{"user_id": e["user_id"], "file_name": e["file_name"], "file_path": e["file_path"]} for e in ready]
+            self.insert_batches += 1
+            try:
+                with span("persist_insert"):
+                    inserted = await run_supabase(insert_resume_rows, supabase, rows)
+                # PostgREST returns rows in insert order; match on file_path when it's there
+                by_path = {r.get("file_path"): r["id"] for r in inserted}
+                for entry, row in zip(ready, inserted):
+                    stored[entry["id"]] = str(by_path.get(entry["file_path"], row["id"]))
+            except Exception as e:
+                if len(ready) == 1:
+                    await self._insert_failed(supabase, ready[0], e, stored)
+                else:
+                    # one bad row shouldn't hold back the batch
+                    for entry, row in zip(ready, rows):
+                        try:
+                            stored[entry["id"]] = str((await run_supabase(insert_resume_rows, supabase, [row]))[0]["id"])
+                        except Exception as row_error:
+                            await self._insert_failed(supabase, entry, row_error, stored)
+
+        await asyncio.to_thread(self.outbox.done, stored)
+        self.inserted += len(stored)
+        return len(stored), len(entries)
+
+    async def _insert_failed(self, supabase: Any, entry: Dict[str, Any], error: Exception, stored: Dict[str, str]) -> None:
+        """A failed single-row insert: done if the row is there after all (unique file_path), else retried."""
+        if _is_duplicate(error):
+            try:
+                resume_id = await run_supabase(find_resume_id, supabase, entry["file_path"])
+            except Exception as e:
+                error = e
+            else:
+                if resume_id is not None:
+                    stored[entry["id"]] = resume_id
+                    return
+        await self._fail(entry, error)
+
+
+resume_persister = ResumePersister(
+    ResumeOutbox(
+        durable_path("RESUME_OUTBOX_PATH", "resume_outbox.sqlite3", persist_by_default=True),
+        max_attempts=int(os.getenv("RESUME_PERSIST_MAX_ATTEMPTS", "10")),
+        keep_seconds=RESUME_OUTBOX_KEEP_SECONDS,
+    ),
+    batch_size=int(os.getenv("RESUME_PERSIST_BATCH_SIZE", "50")),
+    batch_window_seconds=float(os.getenv("RESUME_PERSIST_BATCH_WINDOW_MS", "200")) / 1000,
+)
+metrics.register_gauge(
+    "resume_outbox_pending",
+    "Resumes in the write-behind outbox not yet stored (all workers)",
+    lambda: sum(v for k, v in resume_persister.outbox.stats().items() if k.startswith("pending_")),
+)
@@ -1,13 +1,11 @@
-from .genai_integration import model
-import json
+from .model_provider import get_model
+from typing import Any, Dict, List
 from app.schemas.schemas import ResumeSections
 
-from app.services.pdf_parser import (
-    extract_textpdf,
-    extract_links_from_pdf,
-    extract_links,
-    classify_links
-)
+from app.services.cache import build_cache, content_hash
+from app.services.genai_integration import ainvoke, astream
+from app.services.json_stream import loads_model_json
+from app.services.pdf_parser import extract_pdf
 
 STRUCTURE_PROMPT = """
 You are a resume parser.
@@ -65,15 +63,53 @@ Rules:
 - Return ONLY valid JSON
 """
 
+STRUCTURE_PROMPT_VERSION = content_hash(STRUCTURE_PROMPT)[:12]
+
+# ------------------ RESULT CACHE ------------------
+# Keyed on the uploaded bytes + prompt version, like the ATS result cache.
+structure_result_cache = build_cache("structure", "STRUCTURE_CACHE", max_entries=512, ttl_seconds=7 * 24 * 3600)
+
+
+def structure_cache_key(file_bytes) -> str:
+    return f"structure:{STRUCTURE_PROMPT_VERSION}:{content_hash(file_bytes)}"
+
+
+def _prompt(resume_text: str) -> str:
+    return STRUCTURE_PROMPT + "\n\nRESUME:\n" + resume_text
+
+
+def parse_structured(response_content: str) -> ResumeSections:
+    """Validate the model's answer; raises ValueError if it isn't the schema's JSON."""
+    return ResumeSections.model_validate(loads_model_json(response_content))
+
+
+def with_links(sections: Dict[str, Any], links: Dict[str, List[str]]) -> Dict[str, Any]:
+    """Replace personal_information.links with every link found in the file."""
+    if sections.get("personal_information") is not None:
+        all_links = []
+        for group in links.values():
+            all_links.extend(group)
+        sections["personal_information"] = {**sections["personal_information"], "links": all_links}
+    return sections
+
+
 def structure_resume(resume_text: str) -> ResumeSections:
-    response = model.invoke(
-        STRUCTURE_PROMPT + "\n\nRESUME:\n" + resume_text
-    )
+    response = get_model().invoke(_prompt(resume_text))
     response_content = str(response.content)
-    response_content = response_content.lstrip("```json").rstrip("```")
     print("Response received...")
     print(response_content)
-    return ResumeSections.model_validate(json.loads(str(response_content)))
+    return parse_structured(response_content)
+
+
+async def astructure_resume(resume_text: str) -> ResumeSections:
+    """Async variant for request handlers; queues on the global LLM limiter."""
+    response = await ainvoke(_prompt(resume_text))
+    return parse_structured(str(response.content))
+
+
+def astream_structure_resume(resume_text: str):
+    """Streaming variant: async iterator over the model's text chunks."""
+    return astream(_prompt(resume_text))
 
 
 # ------------------ MAIN ------------------
@@ -82,22 +118,11 @@ if __name__ == "__main__":
     with open("resume.pdf", "rb") as f:
         file_bytes = f.read()
 
-    resume_text = extract_textpdf(file_bytes)
+    extracted = extract_pdf(file_bytes)
+    resume_text = extracted["text"]
     print("Extracted resume text...")
-    links_from_pdf = extract_links_from_pdf(file_bytes)
-    links_from_text = extract_links(resume_text)
-    classified_links = classify_links(
-        list(set(links_from_pdf + links_from_text))
-    )
+    classified_links = extracted["links"]
     print("Classified links...")
     result = structure_resume(resume_text)
     print("Structured resume...")
-    # flatten links
-    all_links = []
-    for group in classified_links.values():
-        all_links.extend(group)
-
-    if result.personal_information is not None:
-        result.personal_information["links"] = all_links
-
-    print(result.model_dump())
+    print(with_links(result.model_dump(), classified_links))
@@ -0,0 +1,86 @@
+import gzip
+import json
+import os
+from typing import Any, Optional, Tuple
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional; falls back to the stdlib encoder
+    orjson = None
+
+# "orjson" (default when installed) or "json"
+JSON_ENCODER = os.getenv("JSON_ENCODER", "orjson" if orjson is not None else "json")
+
+STORAGE_ENCODINGS = ("identity", "gzip", "zstd")
+STORAGE_EXTENSIONS = {"identity": "", "gzip": ".gz", "zstd": ".zst"}
+
+
+def dumps(obj: Any, pretty: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON bytes with the configured encoder (non-JSON types go through str())."""
+    if JSON_ENCODER == "orjson" and orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        return orjson.dumps(obj, default=str, option=option)
+    return json.dumps(
+        obj,
+        ensure_ascii=False,
+        default=str,
+        indent=2 if pretty else None,
+        separators=None if pretty else (",", ":"),
+    ).encode("utf-8")
+
+
+def _resolve_storage_encoding(name: str) -> str:
+    if name not in STORAGE_ENCODINGS:
+        print(f"serialization: unknown RESUME_STORAGE_ENCODING {name!r}, storing uncompressed")
+        return "identity"
+    if name == "zstd":
+        try:
+            import zstandard  # noqa: F401
+        except ImportError:
+            print("serialization: zstandard is not installed, storing resumes with gzip instead")
+            return "gzip"
+    return name
+
+
+RESUME_STORAGE_ENCODING = _resolve_storage_encoding(os.getenv("RESUME_STORAGE_ENCODING", "identity"))
+RESUME_STORAGE_PRETTY = os.getenv("RESUME_STORAGE_PRETTY", "false").lower() in ("1", "true", "yes")
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        # mtime=0 keeps the output deterministic for identical input
+        return gzip.compress(data, compresslevel=6, mtime=0)
+    if encoding == "zstd":
+        import zstandard
+
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return data
+
+
+def decompress(data: bytes, encoding: Optional[str]) -> bytes:
+    if encoding == "gzip":
+        return gzip.decompress(data)
+    if encoding == "zstd":
+        import zstandard
+
+        return zstandard.ZstdDecompressor().decompress(data)
+    return data
+
+
+def encode_for_storage(obj: Any, encoding: Optional[str] = None) -> Tuple[bytes, Optional[str]]:
+    """
+    Bytes to store for a resume and their content-encoding (None when
+    uncompressed), per RESUME_STORAGE_ENCODING / RESUME_STORAGE_PRETTY.
+    """
+    encoding = encoding or RESUME_STORAGE_ENCODING
+    body = compress(dumps(obj, pretty=RESUME_STORAGE_PRETTY), encoding)
+    return body, (None if encoding == "identity" else encoding)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with the configured encoder (orjson by default)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
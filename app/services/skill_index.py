@@ -0,0 +1,176 @@
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from app.services.cache import LRUCache
+from app.services.keyword_matcher import normalize_token
+
+# Common spellings -> one canonical form (all keys/values already normalized).
+SKILL_ALIASES: Dict[str, str] = {
+    "js": "javascript",
+    "ecmascript": "javascript",
+    "ts": "typescript",
+    "py": "python",
+    "python3": "python",
+    "golang": "go",
+    "k8s": "kubernetes",
+    "postgres": "postgresql",
+    "psql": "postgresql",
+    "mongo": "mongodb",
+    "node": "node.js",
+    "nodejs": "node.js",
+    "reactjs": "react",
+    "react.js": "react",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "nextjs": "next.js",
+    "ml": "machine learning",
+    "dl": "deep learning",
+    "ai": "artificial intelligence",
+    "nlp": "natural language processing",
+    "aws": "amazon web services",
+    "gcp": "google cloud platform",
+    "google cloud": "google cloud platform",
+    "sklearn": "scikit-learn",
+    "scikit learn": "scikit-learn",
+    "cicd": "ci/cd",
+    "ci cd": "ci/cd",
+    "cpp": "c++",
+    "c sharp": "c#",
+    "rest api": "rest apis",
+    "restful apis": "rest apis",
+}
+
+_GRAM = 3
+
+
+def canonical_skill(normalized: str) -> str:
+    return SKILL_ALIASES.get(normalized, normalized)
+
+
+class SkillIndex:
+    """
+    Lookup structure over one user's skills for keyword matching.
+
+    A keyword matches a skill when they are equal, when either contains the
+    other, or when both map to the same SKILL_ALIASES entry. The index
+    answers each keyword without scanning every skill:
+      - exact / alias matches: hash lookup
+      - keyword inside skill: intersection of the keyword's character
+        trigrams (keywords of up to 3 chars are one gram themselves)
+      - skill inside keyword: windows of the keyword at each distinct skill
+        length, looked up in the exact table
+    When several skills match, the earliest one in the user's order wins, as
+    in the old nested loop.
+    """
+
+    def __init__(self, skills: Sequence[str]):
+        self.skills: List[str] = []
+        self._norm: List[str] = []
+        self._exact: Dict[str, int] = {}
+        self._canonical: Dict[str, int] = {}
+        self._grams: Dict[str, Set[int]] = {}
+        self._lengths: Set[int] = set()
+
+        for s in skills:
+            ns = normalize_token(s)
+            if not ns:
+                continue
+            if ns in self._exact:
+                # keep first position, latest original spelling (dict semantics)
+                self.skills[self._exact[ns]] = s
+                continue
+            pos = len(self.skills)
+            self.skills.append(s)
+            self._norm.append(ns)
+            self._exact[ns] = pos
+            self._canonical.setdefault(canonical_skill(ns), pos)
+            self._lengths.add(len(ns))
+            for n in range(1, _GRAM + 1):
+                for i in range(len(ns) - n + 1):
+                    self._grams.setdefault(ns[i:i + n], set()).add(pos)
+
+        self._sorted_lengths = sorted(self._lengths)
+
+    def find(self, keyword: str) -> Optional[str]:
+        """Original spelling of the best-matching user skill, or None."""
+        nkw = normalize_token(keyword)
+        if not nkw:
+            return None
+        pos = self._find_normalized(nkw)
+        return None if pos is None else self.skills[pos]
+
+    def _find_normalized(self, nkw: str) -> Optional[int]:
+        best: Optional[int] = None
+
+        def _take(p: Optional[int]) -> None:
+            nonlocal best
+            if p is not None and (best is None or p < best):
+                best = p
+
+        _take(self._exact.get(nkw))
+        _take(self._canonical.get(canonical_skill(nkw)))
+        if best == 0:
+            return best
+
+        # keyword contained in a skill
+        if len(nkw) <= _GRAM:
+            candidates = self._grams.get(nkw, ())
+            if candidates:
+                _take(min(candidates))
+        else:
+            gram_sets = []
+            for i in range(len(nkw) - _GRAM + 1):
+                g = self._grams.get(nkw[i:i + _GRAM])
+                if not g:
+                    gram_sets = []
+                    break
+                gram_sets.append(g)
+            if gram_sets:
+                gram_sets.sort(key=len)
+                candidates = set(gram_sets[0]).intersection(*gram_sets[1:])
+                for p in sorted(candidates):
+                    if best is not None and p >= best:
+                        break
+                    if nkw in self._norm[p]:
+                        _take(p)
+                        break
+
+        # skill contained in the keyword
+        L = len(nkw)
+        for ln in self._sorted_lengths:
+            if ln > L:
+                break
+            for i in range(L - ln + 1):
+                _take(self._exact.get(nkw[i:i + ln]))
+
+        return best
+
+    def matched_missing(self, keywords: Sequence[str]) -> Tuple[List[str], List[str]]:
+        """(matched user skills, missing keywords), both in keyword order."""
+        seen: Dict[str, str] = {}
+        for k in keywords:
+            nk = normalize_token(k)
+            if nk:
+                seen[nk] = k
+        matched: List[str] = []
+        missing: List[str] = []
+        for nkw, orig_kw in seen.items():
+            pos = self._find_normalized(nkw)
+            if pos is None:
+                missing.append(orig_kw)
+            else:
+                matched.append(self.skills[pos])
+        return matched, missing
+
+
+# One index per user, rebuilt only when their skill list changes.
+_index_cache = LRUCache(max_entries=2048, ttl_seconds=3600.0)
+
+
+def get_skill_index(user_id: str, skills: Sequence[str]) -> SkillIndex:
+    fingerprint = tuple(skills)
+    cached = _index_cache.get(user_id)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+    index = SkillIndex(skills)
+    _index_cache.set(user_id, (fingerprint, index), size=sum(len(s) for s in skills) * 8 + 64)
+    return index
@@ -1,8 +1,11 @@
+import asyncio
 import os
-from functools import lru_cache
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from typing import TYPE_CHECKING, Any, Callable, Optional
 
-from supabase import Client, create_client
+if TYPE_CHECKING:
+    from supabase import Client
 
 
 def _env(*names: str) -> Optional[str]:
@@ -14,14 +17,22 @@ def _env(*names: str) -> Optional[str]:
 
 
 @lru_cache(maxsize=1)
-def get_supabase_client() -> Client:
+def get_supabase_client() -> "Client":
     """
     Server-side Supabase client.
 
     Supports both:
     - SUPABASE_URL / SUPABASE_SERVICE_ROLE_KEY (recommended for backend), and
     - VITE_SUPABASE_URL / VITE_SUPABASE_ANON_KEY (fallback for local dev).
+
+    SUPABASE_BACKEND=fake swaps in an in-memory client (see fake_supabase.py)
+    for local runs and load tests.
     """
+    if os.getenv("SUPABASE_BACKEND", "").lower() == "fake":
+        from app.services.fake_supabase import load_fake_client
+
+        return load_fake_client()  # type: ignore[return-value]
+
     url = _env("SUPABASE_URL", "VITE_SUPABASE_URL")
     key = _env("SUPABASE_SERVICE_ROLE_KEY", "VITE_SUPABASE_SERVICE_ROLE_KEY", "SUPABASE_ANON_KEY", "VITE_SUPABASE_ANON_KEY")
 
@@ -33,5 +44,20 @@ def get_supabase_client() -> Client:
     
     print("Final Supabase URL:", url)
 
+    from supabase import create_client
+
     return create_client(url, key)
 
+
+# Supabase I/O gets its own bounded pool so a burst of slow PostgREST/Storage
+# calls can't occupy the default executor that other blocking work uses.
+_io_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("SUPABASE_IO_WORKERS", "16")),
+    thread_name_prefix="supabase-io",
+)
+
+
+async def run_supabase(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking supabase-py call on the dedicated I/O executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_io_executor, partial(fn, *args, **kwargs))
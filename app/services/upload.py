@@ -0,0 +1,179 @@
+import os
+from typing import Optional, Tuple
+
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.requests import Request
+
+from app.services.metrics import UPLOADS_REJECTED
+
+MAX_UPLOAD_BYTES = int(os.getenv("ATS_MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+# PDF readers accept the header anywhere in the first 1 KiB
+PDF_MAGIC = b"%PDF-"
+PDF_MAGIC_WINDOW = 1024
+# .docx is a zip; its first entry's local file header starts the file
+ZIP_MAGIC = b"PK\x03\x04"
+RESUME_KINDS = {".pdf": "pdf", ".docx": "docx"}
+# room for the multipart envelope (boundaries, part headers, small form fields)
+MULTIPART_OVERHEAD = 16 * 1024
+
+
+class UploadRejected(Exception):
+    """Upload refused before or while reading the body; maps onto an HTTP error."""
+
+    def __init__(self, status_code: int, detail: str, reason: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        UPLOADS_REJECTED.inc(reason)
+
+
+def _too_large(max_bytes: int) -> UploadRejected:
+    return UploadRejected(413, f"File exceeds {max_bytes} bytes", "too_large")
+
+
+def resume_kind(filename: str) -> Optional[str]:
+    """"pdf" / "docx" from the file extension, None for anything else."""
+    return RESUME_KINDS.get(os.path.splitext(filename.lower())[1])
+
+
+def has_magic(kind: str, data) -> bool:
+    if kind == "docx":
+        return bytes(data[: len(ZIP_MAGIC)]) == ZIP_MAGIC
+    return data.find(PDF_MAGIC, 0, PDF_MAGIC_WINDOW) >= 0
+
+
+class _ResumePart:
+    """
+    MultipartParser callbacks that keep only the `field` part, writing its
+    bytes into one bytearray and failing fast on size, file type or magic bytes.
+    With a `capacity` hint (from Content-Length) the buffer is sized once the
+    magic bytes check out, instead of being regrown (which briefly holds two
+    copies); rejected uploads never get the full allocation.
+    """
+
+    def __init__(self, field: str, max_bytes: int, capacity: int = 0):
+        self.field = field.encode()
+        self.max_bytes = max_bytes
+        self.capacity = capacity
+        self.buffer = bytearray()
+        self.size = 0
+        self.filename: Optional[str] = None
+        self.kind: Optional[str] = None
+        self.found = False
+        self.done = False
+        self._capturing = False
+        self._magic_checked = False
+        self._header_field = bytearray()
+        self._header_value = bytearray()
+        self._disposition: Optional[bytes] = None
+
+    def callbacks(self):
+        return {
+            "on_part_begin": self._part_begin,
+            "on_header_field": lambda data, start, end: self._header_field.extend(data[start:end]),
+            "on_header_value": lambda data, start, end: self._header_value.extend(data[start:end]),
+            "on_header_end": self._header_end,
+            "on_headers_finished": self._headers_finished,
+            "on_part_data": self._part_data,
+            "on_part_end": self._part_end,
+        }
+
+    def _part_begin(self) -> None:
+        self._disposition = None
+        self._capturing = False
+
+    def _header_end(self) -> None:
+        if bytes(self._header_field).lower() == b"content-disposition":
+            self._disposition = bytes(self._header_value)
+        self._header_field.clear()
+        self._header_value.clear()
+
+    def _headers_finished(self) -> None:
+        if self.done or not self._disposition:
+            return
+        _, params = parse_options_header(self._disposition)
+        if params.get(b"name") != self.field:
+            return
+        self.found = True
+        self._capturing = True
+        self.filename = params.get(b"filename", b"").decode("utf-8", "replace") or "unknown.pdf"
+        self.kind = resume_kind(self.filename)
+        if self.kind is None:
+            raise UploadRejected(400, "Only PDF and DOCX files are supported", "extension")
+
+    def _part_data(self, data: bytes, start: int, end: int) -> None:
+        if not self._capturing:
+            return
+        n = end - start
+        if self.size + n > self.max_bytes:
+            raise _too_large(self.max_bytes)
+        # in place while within capacity, grows the buffer past it
+        self.buffer[self.size : self.size + n] = memoryview(data)[start:end]
+        self.size += n
+        if not self._magic_checked and self.size >= PDF_MAGIC_WINDOW:
+            self._check_magic()
+
+    def _part_end(self) -> None:
+        if self._capturing:
+            self._capturing = False
+            self.done = True
+            if not self._magic_checked:
+                self._check_magic()
+
+    def _check_magic(self) -> None:
+        self._magic_checked = True
+        if not has_magic(self.kind, self.buffer):
+            raise UploadRejected(400, f"File is not a valid {self.kind.upper()}", "bad_magic")
+        if self.capacity > self.size:
+            sized = bytearray(self.capacity)
+            sized[: self.size] = self.buffer
+            self.buffer = sized
+
+
+async def read_resume_upload(
+    request: Request, field: str = "file", max_bytes: int = MAX_UPLOAD_BYTES
+) -> Tuple[str, str, memoryview]:
+    """
+    Stream a multipart upload and return (filename, kind, bytes), kind being
+    "pdf" or "docx", without buffering the body anywhere else first. Raises
+    UploadRejected: 413 when Content-Length or the bytes received so far pass
+    `max_bytes` (checked before and while reading), 400 for another file
+    extension, a file whose first KiB doesn't match its type (%PDF- header /
+    zip signature), or a missing part.
+
+    The bytes come back as a memoryview over a single bytearray, which
+    PyMuPDF and hashlib take as-is (a bytearray would be copied by fitz).
+    When Content-Length is sent the buffer is sized from it, so the file is
+    written exactly once.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise UploadRejected(400, "Expected a multipart/form-data upload", "content_type")
+
+    limit = max_bytes + MULTIPART_OVERHEAD
+    declared = request.headers.get("content-length")
+    capacity = int(declared) if declared and declared.isdigit() else 0
+    if capacity > limit:
+        raise _too_large(max_bytes)
+
+    part = _ResumePart(field, max_bytes, capacity=min(capacity, max_bytes))
+    parser = MultipartParser(boundary, part.callbacks())
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        # chunked uploads have no Content-Length; count what actually arrives
+        if received > limit:
+            raise _too_large(max_bytes)
+        parser.write(chunk)
+        if part.done:
+            # the rest is the closing boundary or other fields; don't wait for it
+            break
+    else:
+        parser.finalize()
+
+    if not part.found:
+        raise UploadRejected(400, f"Missing '{field}' upload", "missing")
+    if not part.done or not part.size:
+        raise UploadRejected(400, "Upload is incomplete or empty", "incomplete")
+    return part.filename or "unknown.pdf", part.kind or "pdf", memoryview(part.buffer)[: part.size]
@@ -0,0 +1,146 @@
+import asyncio
+import os
+import time
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from app.services import metrics
+
+# Heavy dependencies and clients load lazily on first use. With warm-up on
+# (the default) the lifespan loads them in the background right after startup,
+# so the first real request doesn't pay for it; /ready reports when it's done.
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "true").lower() not in ("0", "false", "no")
+# failed steps are retried after WARMUP_RETRY_SECONDS, doubling up to WARMUP_RETRY_MAX_SECONDS
+WARMUP_RETRY_SECONDS = float(os.getenv("WARMUP_RETRY_SECONDS", "5"))
+WARMUP_RETRY_MAX_SECONDS = float(os.getenv("WARMUP_RETRY_MAX_SECONDS", "300"))
+# non-critical steps stop retrying after this many attempts and load on first use instead
+WARMUP_MAX_ATTEMPTS = int(os.getenv("WARMUP_MAX_ATTEMPTS", "5"))
+
+
+def _warm_parsers() -> None:
+    import fitz  # noqa: F401
+    import docx  # noqa: F401
+
+    from app.services.parse_pool import parse_pool
+
+    parse_pool.warm()
+
+
+def _warm_model() -> None:
+    import langchain_core.messages  # noqa: F401
+
+    from app.services.model_provider import get_model
+
+    get_model()
+
+
+def _warm_scorer() -> None:
+    # textstat (and nltk behind it) for the local ATS scorer's readability
+    from app.services.ats_local import flesch_reading_ease
+
+    flesch_reading_ease("Built and shipped a service used by many people.")
+
+
+def _warm_supabase() -> None:
+    from app.services.supabase_client import get_supabase_client
+
+    get_supabase_client()
+
+
+# (name, fn, critical). Only critical steps hold /ready at 503: every upload
+# needs the parsers, while the model and Supabase are remote services that a
+# readiness probe shouldn't wait on (and the scorer has its own fallback).
+WARMUP_STEPS: Tuple[Tuple[str, Callable[[], None], bool], ...] = (
+    ("parsers", _warm_parsers, True),
+    ("model", _warm_model, False),
+    ("scorer", _warm_scorer, False),
+    ("supabase", _warm_supabase, False),
+)
+
+
+class Warmup:
+    """
+    Runs the warm-up steps one after another in a worker thread, then retries
+    the ones that failed with exponential backoff. State goes pending ->
+    running -> ready, or `degraded` when only non-critical steps failed (still
+    ready), or `retrying` while a critical step hasn't succeeded yet; `disabled`
+    when turned off, in which case everything still loads on first use.
+    """
+
+    def __init__(
+        self,
+        steps: Sequence[Tuple[str, Callable[[], None], bool]],
+        enabled: bool = True,
+        retry_seconds: float = WARMUP_RETRY_SECONDS,
+        retry_max_seconds: float = WARMUP_RETRY_MAX_SECONDS,
+        max_attempts: int = WARMUP_MAX_ATTEMPTS,
+    ):
+        self.steps = list(steps)
+        self.enabled = enabled
+        self.retry_seconds = retry_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.max_attempts = max_attempts
+        self.state = "pending"
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.started_at: Optional[float] = None
+        self.seconds: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state in ("ready", "degraded", "disabled")
+
+    async def _attempt(self, name: str, fn: Callable[[], None], attempt: int) -> bool:
+        s0 = time.perf_counter()
+        try:
+            await asyncio.to_thread(fn)
+        except Exception as e:
+            self.results[name] = {"ok": False, "seconds": round(time.perf_counter() - s0, 4), "attempts": attempt, "error": str(e)}
+            print(f"warm-up step {name} failed (attempt {attempt}): {e}")
+            return False
+        self.results[name] = {"ok": True, "seconds": round(time.perf_counter() - s0, 4), "attempts": attempt}
+        return True
+
+    async def _run(self) -> None:
+        self.state = "running"
+        t0 = time.perf_counter()
+        pending = self.steps
+        attempt = 1
+        while True:
+            failed = [step for step in pending if not await self._attempt(step[0], step[1], attempt)]
+            blocking = any(critical for _, _, critical in failed)
+            if not blocking and self.seconds is None:
+                self.seconds = round(time.perf_counter() - t0, 4)
+            self.state = "retrying" if blocking else ("degraded" if failed else "ready")
+            # critical steps keep retrying; the rest give up after max_attempts
+            pending = [step for step in failed if step[2] or attempt < self.max_attempts]
+            if not pending:
+                print(f"warm-up {self.state} in {time.perf_counter() - t0:.2f}s")
+                return
+            delay = min(self.retry_seconds * 2 ** (attempt - 1), self.retry_max_seconds)
+            print(f"warm-up {self.state}: retrying {', '.join(name for name, _, _ in pending)} in {delay:g}s")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def start(self) -> None:
+        self.started_at = time.time()
+        if not self.enabled:
+            self.state = "disabled"
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task and not self._task.done():
+            # a step already running in its thread finishes on its own
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"status": self.state, "ready": self.ready, "seconds": self.seconds, "steps": self.results}
+
+
+warmup = Warmup(WARMUP_STEPS, enabled=WARMUP_ON_STARTUP)
+metrics.register_gauge("ready", "1 once startup warm-up has finished", lambda: 1.0 if warmup.ready else 0.0)
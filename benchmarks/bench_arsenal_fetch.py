@@ -0,0 +1,101 @@
+"""
+Benchmark: per-table select() arsenal fetch vs. the single
+get_user_arsenal RPC with column projection, through the real supabase-py
+client against a local PostgREST stand-in.
+
+    python -m benchmarks.bench_arsenal_fetch --latency-ms 15 --repeat 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+
+from supabase import create_client  # noqa: E402
+
+import app.api.generate_resume as generate_resume  # noqa: E402
+from app.services.fake_supabase import FakeSupabaseClient  # noqa: E402
+from benchmarks.postgrest_standin import PostgRESTStandIn  # noqa: E402
+
+
+def make_arsenal(user_id: str, projects: int = 15, experience: int = 5, skills: int = 40):
+    now = datetime.now(timezone.utc)
+
+    def meta(i: int):
+        return {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "created_at": (now - timedelta(days=400 - i)).isoformat(),
+            "updated_at": (now - timedelta(days=30 - i % 30)).isoformat(),
+        }
+
+    return {
+        "personal_details": [{**meta(0), "full_name": "Jane Doe", "email": "jane@example.com", "phone": "+1 555 0100", "location": "Remote"}],
+        "professional_summary": [{**meta(1), "professional_summary": "Backend engineer focused on Python services and data platforms. " * 3}],
+        "career_objectives": [{**meta(2), "career_objective": "Grow into a staff engineer role owning reliability of ML serving. " * 2}],
+        "professional_experience": [
+            {**meta(i), "position": f"Engineer {i}", "company": f"Company {i}", "location": "Remote",
+             "description": "Built and operated FastAPI services on AWS with PostgreSQL and Redis; led migrations. " * 4}
+            for i in range(experience)
+        ],
+        "education": [{**meta(0), "institution": "State University", "degree": "B.Tech CSE", "duration": "2016-2020"}],
+        "projects": [
+            {**meta(i), "project_name": f"Project {i}", "tech_stack": ["Python", "FastAPI", "Docker", "React"],
+             "project_description": "End-to-end system with ingestion, a scoring API and a dashboard. " * 5,
+             "github_url": f"https://github.com/janedoe/p{i}", "project_url": f"https://p{i}.vercel.app"}
+            for i in range(projects)
+        ],
+        "skills": [{**meta(i), "skill": f"Skill {i}"} for i in range(skills)],
+    }
+
+
+async def _measure(client, user_id: str, mode: str, standin: PostgRESTStandIn, repeat: int):
+    generate_resume.ARSENAL_FETCH_MODE = mode
+    standin.reset_counters()
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        await generate_resume.fetch_user_arsenal(user_id, supabase=client, use_cache=False)
+        samples.append((time.perf_counter() - t0) * 1000)
+    c = standin.counters()
+    return {
+        "mode": mode,
+        "median_ms": statistics.median(samples),
+        "round_trips": c["round_trips"] / repeat,
+        "bytes_out": c["bytes_out"] / repeat,
+        "bytes_in": c["bytes_in"] / repeat,
+    }
+
+
+def run(latency_ms: float, repeat: int, projects: int):
+    user_id = str(uuid.uuid4())
+    store = FakeSupabaseClient(make_arsenal(user_id, projects=projects))
+    with PostgRESTStandIn(store, latency_seconds=latency_ms / 1000) as standin:
+        client = create_client(standin.url, "benchmark-anon-key")
+        return [asyncio.run(_measure(client, user_id, mode, standin, repeat)) for mode in ("tables", "rpc")]
+
+
+if __name__ == "__main__":
+    import builtins
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency-ms", type=float, default=15.0)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--projects", type=int, default=15)
+    args = parser.parse_args()
+
+    # fetch_user_arsenal prints every result set; keep the table readable
+    _print = builtins.print
+    builtins.print = lambda *a, **k: None
+    try:
+        rows = run(args.latency_ms, args.repeat, args.projects)
+    finally:
+        builtins.print = _print
+
+    print(f"{'mode':>7} {'median ms':>10} {'round trips':>12} {'resp bytes':>11} {'req bytes':>10}")
+    for r in rows:
+        print(f"{r['mode']:>7} {r['median_ms']:>10.1f} {r['round_trips']:>12.0f} {r['bytes_out']:>11.0f} {r['bytes_in']:>10.0f}")
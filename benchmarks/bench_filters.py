@@ -0,0 +1,68 @@
+"""
+Benchmark: the Arsenal ranking filters (filter_projects / filter_experience /
+filter_skills) and the matched/missing skill computation, per ranking
+engine, at realistic, large and extreme Arsenal sizes.
+
+    python -m benchmarks.bench_filters --quick
+"""
+import argparse
+import json
+import os
+import tempfile
+
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+os.environ.setdefault("CACHE_DIR", tempfile.mkdtemp(prefix="resucurate-bench-"))
+
+import app.api.generate_resume as generate_resume  # noqa: E402
+from app.services.keyword_matcher import KeywordMatcher  # noqa: E402
+from app.services.ranking import RANKING_ENGINES  # noqa: E402
+from app.services.skill_index import SkillIndex  # noqa: E402
+from benchmarks.corpus import ARSENAL_SIZES, keywords, make_arsenal  # noqa: E402
+from benchmarks.harness import measure, quiet, repeat_for, result  # noqa: E402
+
+SUITE = "filters"
+
+
+def _engines():
+    try:
+        import sklearn  # noqa: F401
+
+        return RANKING_ENGINES
+    except ImportError:
+        return ("keyword",)
+
+
+def run(quick: bool = False):
+    rows = []
+    kws = keywords(40)
+    for label, size in ARSENAL_SIZES.items():
+        arsenal = make_arsenal("bench-user", **size)
+        projects, experience, skills = arsenal["projects"], arsenal["professional_experience"], arsenal["skills"]
+        n = repeat_for(quick, 20 if label != "extreme" else 5, 2)
+        for engine in _engines():
+            params = {"arsenal": label, **size, "keywords": len(kws), "engine": engine}
+
+            def _all():
+                # what the handler does per request, matcher included
+                matcher = KeywordMatcher(kws) if engine == "keyword" else None
+                generate_resume.filter_skills(skills, kws, limit=30, matcher=matcher, engine=engine)
+                generate_resume.filter_projects(projects, kws, limit=6, matcher=matcher, engine=engine)
+                generate_resume.filter_experience(experience, kws, limit=6, matcher=matcher, engine=engine)
+
+            with quiet():
+                rows.append(result(SUITE, "filters_all", params, measure(_all, n)))
+                rows.append(result(SUITE, "filter_projects", params, measure(
+                    lambda: generate_resume.filter_projects(projects, kws, limit=6, engine=engine), n)))
+
+        names = generate_resume._extract_skill_names(skills)
+        params = {"arsenal": label, "skills": len(names), "keywords": len(kws)}
+        rows.append(result(SUITE, "matched_missing_skills", params, measure(
+            lambda: generate_resume._matched_missing_skills(names, kws, index=SkillIndex(names)), n)))
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--quick", action="store_true")
+    args = parser.parse_args()
+    print(json.dumps(run(args.quick), indent=2))
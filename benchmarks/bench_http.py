@@ -0,0 +1,122 @@
+"""
+End-to-end benchmark of both routers through the ASGI app, in process, with
+the fake chat model and the fake Supabase client (no network, no API key).
+Reports latency percentiles and throughput per scenario.
+
+    python -m benchmarks.bench_http --llm-latency-ms 200 --requests 200 --concurrency 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import uuid
+
+_workdir = tempfile.mkdtemp(prefix="resucurate-bench-")
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+os.environ.setdefault("CACHE_DIR", _workdir)
+os.environ["SUPABASE_BACKEND"] = "fake"
+
+import httpx  # noqa: E402
+
+from benchmarks.corpus import ARSENAL_SIZES, job_description, make_arsenal, resume_pdf  # noqa: E402
+from benchmarks.harness import quiet, result, run_concurrent  # noqa: E402
+
+SUITE = "http"
+USER_ID = str(uuid.UUID(int=7))
+
+
+def _seed_fake_supabase(arsenal_size: str) -> None:
+    path = os.path.join(_workdir, f"seed-{arsenal_size}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(make_arsenal(USER_ID, **ARSENAL_SIZES[arsenal_size]), f)
+    os.environ["FAKE_SUPABASE_SEED"] = path
+
+
+async def _scenario(fake, name: str, send, requests: int, concurrency: int, params: dict):
+    calls_before = fake.calls
+    out = await run_concurrent(send, requests, concurrency)
+    statuses = [r.status_code for r in out["outputs"]]
+    errors = sum(1 for s in statuses if s >= 400)
+    return result(
+        SUITE,
+        name,
+        {**params, "requests": requests, "concurrency": concurrency},
+        out["latencies"],
+        throughput_rps=requests / out["wall_seconds"],
+        llm_calls_per_request=(fake.calls - calls_before) / requests,
+        errors=errors,
+    )
+
+
+async def _run(llm_latency_ms: float, requests: int, concurrency: int, arsenal_size: str):
+    _seed_fake_supabase(arsenal_size)
+
+    import main
+    from app.services.fake_model import FakeChatModel
+    from app.services.model_provider import set_model
+
+    fake = FakeChatModel(llm_latency_ms / 1000)
+    set_model(fake)
+    params = {"llm_latency_ms": llm_latency_ms}
+    pdf = resume_pdf(2)
+    rows = []
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.app.router.lifespan_context(main.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+
+            async def ats_miss(i):
+                return await client.post("/api/ats-score?cache=bypass", files={"file": (f"r{i}.pdf", pdf, "application/pdf")})
+
+            async def ats_hit(i):
+                return await client.post("/api/ats-score", files={"file": ("r.pdf", pdf, "application/pdf")})
+
+            async def ats_stream(i):
+                return await client.post("/api/ats-score/stream?cache=bypass", files={"file": (f"r{i}.pdf", pdf, "application/pdf")})
+
+            def generate(jd_seed):
+                body = {
+                    "user_id": USER_ID,
+                    "job_description": job_description(jd_seed),
+                    "category": "Engineering",
+                    "sub_category": "Backend",
+                }
+
+                async def _send(i):
+                    return await client.post("/api/generate-resume", json=body)
+
+                return _send
+
+            await ats_hit(0)  # prime the ATS cache for the hit scenario
+            rows.append(await _scenario(fake, "ats_score_uncached", ats_miss, requests, concurrency, params))
+            rows.append(await _scenario(fake, "ats_score_cached", ats_hit, requests, concurrency, params))
+            rows.append(await _scenario(fake, "ats_score_stream", ats_stream, requests, concurrency, params))
+
+            gen_params = {**params, "arsenal": arsenal_size}
+            # every request a new JD: keyword extraction and rewrites go to the model
+            rows.append(await _scenario(
+                fake, "generate_resume_new_jd",
+                lambda i: generate(1000 + i)(i), requests, concurrency, gen_params,
+            ))
+            # the same JD again: keyword, rewrite and arsenal caches warm
+            await generate(7)(0)
+            rows.append(await _scenario(fake, "generate_resume_repeat_jd", generate(7), requests, concurrency, gen_params))
+    return rows
+
+
+def run(quick: bool = False, llm_latency_ms: float = 50.0, requests: int = 0, concurrency: int = 10, arsenal_size: str = "realistic"):
+    requests = requests or (20 if quick else 200)
+    with quiet():
+        return asyncio.run(_run(llm_latency_ms, requests, concurrency, arsenal_size))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--quick", action="store_true")
+    parser.add_argument("--llm-latency-ms", type=float, default=50.0)
+    parser.add_argument("--requests", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--arsenal", choices=sorted(ARSENAL_SIZES), default="realistic")
+    args = parser.parse_args()
+    print(json.dumps(run(args.quick, args.llm_latency_ms, args.requests, args.concurrency, args.arsenal), indent=2))
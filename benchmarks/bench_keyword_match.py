@@ -0,0 +1,80 @@
+"""
+Microbenchmark: KeywordMatcher vs. the per-keyword normalize + substring loop
+that filter_projects / filter_experience / filter_skills used to run per row.
+
+    python -m benchmarks.bench_keyword_match --rows 100 500 2000 --keywords 40
+"""
+import argparse
+import random
+import re
+import time
+
+from app.services.keyword_matcher import KeywordMatcher
+
+VOCAB = (
+    "python java javascript typescript react node.js aws docker kubernetes sql postgresql "
+    "machine learning rest apis fastapi django flask c++ c# go rust graphql redis kafka spark "
+    "airflow tensorflow pytorch nlp ci/cd git linux terraform gcp azure microservices agile "
+    "scrum pandas numpy"
+).split()
+FILLER = "built designed led shipped service platform users latency team pipeline dashboard".split()
+
+
+def _old_normalize(s: str) -> str:
+    s = s.lower().strip()
+    s = re.sub(r"[^a-z0-9\+\#\.\-_/ ]+", " ", s)
+    s = re.sub(r"\s+", " ", s).strip()
+    return s
+
+
+def _old_score(text, keywords) -> int:
+    """The pre-KeywordMatcher _keyword_hit_score, kept verbatim as the baseline."""
+    nt = _old_normalize(text)
+    score = 0
+    for kw in keywords:
+        nkw = _old_normalize(kw)
+        if not nkw:
+            continue
+        if nkw in nt:
+            score += 1
+    return score
+
+
+def make_rows(n: int, words_per_row: int, rng: random.Random):
+    return [
+        " | ".join(rng.choice(VOCAB + FILLER * 3) for _ in range(words_per_row))
+        for _ in range(n)
+    ]
+
+
+def run(row_counts, n_keywords: int, words_per_row: int, seed: int = 7):
+    rng = random.Random(seed)
+    keywords = [w.upper() if i % 3 == 0 else w for i, w in enumerate(VOCAB[:n_keywords])]
+    results = []
+    for n in row_counts:
+        rows = make_rows(n, words_per_row, rng)
+
+        t0 = time.perf_counter()
+        old = [_old_score(r, keywords) for r in rows]
+        old_ms = (time.perf_counter() - t0) * 1000
+
+        t0 = time.perf_counter()
+        matcher = KeywordMatcher(keywords)
+        new = [matcher.score(r) for r in rows]
+        new_ms = (time.perf_counter() - t0) * 1000
+
+        assert old == new
+        results.append({"rows": n, "old_ms": old_ms, "new_ms": new_ms, "speedup": old_ms / new_ms})
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 500, 2000])
+    parser.add_argument("--keywords", type=int, default=40)
+    parser.add_argument("--words-per-row", type=int, default=40)
+    args = parser.parse_args()
+
+    print(f"{'rows':>6} {'old ms':>9} {'new ms':>9} {'speedup':>8}")
+    for r in run(args.rows, args.keywords, args.words_per_row):
+        print(f"{r['rows']:>6} {r['old_ms']:>9.2f} {r['new_ms']:>9.2f} {r['speedup']:>7.2f}x")
@@ -0,0 +1,114 @@
+"""
+Benchmark: PDF parsing under concurrency - extract_pdf in a worker thread
+(asyncio.to_thread, what extract_resume used before) against the parse pool
+(ParsePool.run). While `concurrency` large PDFs parse, a probe coroutine
+that should wake every 5 ms records how late it runs: that lateness is what
+every other request in the worker waits on.
+
+Reports parse latency plus the probe's lag (`loop_lag_p95_ms`,
+`loop_lag_max_ms`), and, for an over-capacity burst, how many parses the
+pool sheds and how fast those refusals come back.
+
+    python -m benchmarks.bench_parse_pool --quick
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+
+from app.services.parse_pool import ParsePool, ParsePoolBusy  # noqa: E402
+from app.services.pdf_parser import extract_pdf  # noqa: E402
+from benchmarks.corpus import resume_pdf  # noqa: E402
+from benchmarks.harness import percentile, quiet, repeat_for, result, run_concurrent  # noqa: E402
+
+SUITE = "parse_pool"
+PROBE_INTERVAL = 0.005
+
+
+async def _with_probe(work):
+    """Run `work` while sampling event-loop lag; returns (work result, lag samples in ms)."""
+    lags = []
+    done = asyncio.Event()
+
+    async def _probe():
+        while not done.is_set():
+            t0 = time.perf_counter()
+            await asyncio.sleep(PROBE_INTERVAL)
+            lags.append(max(0.0, (time.perf_counter() - t0 - PROBE_INTERVAL) * 1000))
+
+    probe = asyncio.create_task(_probe())
+    try:
+        return await work, lags
+    finally:
+        done.set()
+        await probe
+
+
+async def _scenario(name: str, parse, data: bytes, requests: int, concurrency: int, params: dict):
+    out, lags = await _with_probe(run_concurrent(lambda i: parse(data), requests, concurrency))
+    return result(
+        SUITE,
+        name,
+        {**params, "requests": requests, "concurrency": concurrency},
+        out["latencies"],
+        loop_lag_p95_ms=round(percentile(lags, 0.95), 2),
+        loop_lag_max_ms=round(max(lags, default=0.0), 2),
+        throughput_docs_per_s=round(requests / out["wall_seconds"], 1),
+    )
+
+
+async def _shed(pool: ParsePool, data: bytes, burst: int):
+    async def _one(_):
+        t0 = time.perf_counter()
+        try:
+            await pool.run(extract_pdf, data)
+            ok = True
+        except ParsePoolBusy:
+            ok = False
+        return ok, (time.perf_counter() - t0) * 1000
+
+    out = await run_concurrent(_one, burst, burst)
+    rejected = [ms for ok, ms in out["outputs"] if not ok]
+    return result(
+        SUITE,
+        "pool_burst",
+        {"pages": 20, "burst": burst, "workers": pool.workers, "max_queued": pool.max_queued},
+        out["latencies"],
+        rejected=len(rejected),
+        rejected_p95_ms=round(percentile(rejected, 0.95), 2),
+    )
+
+
+async def _run(quick: bool, concurrency: int, workers: int):
+    rows = []
+    pool = ParsePool(workers, max_queued=concurrency * 4, timeout_seconds=60, retry_after=2)
+    await asyncio.to_thread(pool.warm)
+    try:
+        for pages in ((5, 20) if quick else (5, 20, 60)):
+            data = resume_pdf(pages)
+            requests = repeat_for(quick, concurrency * 4, concurrency * 2)
+            params = {"pages": pages, "workers": workers}
+            rows.append(await _scenario("to_thread", lambda d: asyncio.to_thread(extract_pdf, d), data, requests, concurrency, params))
+            rows.append(await _scenario("pool", lambda d: pool.run(extract_pdf, d), data, requests, concurrency, params))
+        pool.max_queued = workers
+        rows.append(await _shed(pool, resume_pdf(20), burst=workers * 2 + concurrency))
+    finally:
+        await pool.stop()
+    return rows
+
+
+def run(quick: bool = False, concurrency: int = 10, workers: int = 0):
+    with quiet():
+        return asyncio.run(_run(quick, concurrency, workers or min(4, os.cpu_count() or 1)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--quick", action="store_true")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=0, help="pool size (default: min(4, CPUs))")
+    args = parser.parse_args()
+    print(json.dumps(run(args.quick, args.concurrency, args.workers), indent=2))
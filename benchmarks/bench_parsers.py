@@ -0,0 +1,69 @@
+"""
+Benchmark: document parsing over the synthetic corpus - extract_textpdf,
+extract_links_from_pdf, extract_pdf, the python-docx extract_textdocs against
+the streaming extract_docx, the regex link extraction / classification, the
+local ATS scorer (local_ats_score) and parse_ats_response.
+
+    python -m benchmarks.bench_parsers --quick
+"""
+import argparse
+import json
+import os
+
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+
+from app.services.ats_local import local_ats_score  # noqa: E402
+from app.services.ats_scanner import parse_ats_response  # noqa: E402
+from app.services.docx_parser import extract_docx  # noqa: E402
+from app.services.pdf_parser import (  # noqa: E402
+    classify_links,
+    extract_links,
+    extract_links_from_pdf,
+    extract_pdf,
+    extract_textdocs,
+    extract_textpdf,
+)
+from benchmarks.corpus import SAMPLE_ATS_RESPONSE, build_corpus  # noqa: E402
+from benchmarks.harness import measure, repeat_for, result  # noqa: E402
+
+SUITE = "parsers"
+
+
+def run(quick: bool = False):
+    rows = []
+    for doc in build_corpus():
+        data = doc["bytes"]
+        params = {"size": doc["size"], "bytes": len(data)}
+        n = repeat_for(quick, 30, 5)
+        if doc["kind"] == "pdf":
+            text = extract_textpdf(data)
+            for name, fn in (
+                ("extract_textpdf", lambda: extract_textpdf(data)),
+                ("extract_links_from_pdf", lambda: extract_links_from_pdf(data)),
+                ("extract_pdf", lambda: extract_pdf(data)),
+            ):
+                rows.append(result(SUITE, name, params, measure(fn, n)))
+        else:
+            text = extract_docx(data)["text"]
+            rows.append(result(SUITE, "extract_textdocs", params, measure(lambda: extract_textdocs(data), n)))
+            rows.append(result(SUITE, "extract_docx", params, measure(lambda: extract_docx(data), n)))
+
+        text_params = {"size": doc["size"], "source": doc["kind"], "chars": len(text)}
+        n = repeat_for(quick, 200, 20)
+        links = extract_links(text)
+        rows.append(result(SUITE, "extract_links", text_params, measure(lambda: extract_links(text), n)))
+        rows.append(result(SUITE, "classify_links", {**text_params, "links": len(links)}, measure(lambda: classify_links(links), n)))
+        local_ats_score(text)  # first call imports textstat
+        rows.append(result(SUITE, "local_ats_score", text_params, measure(lambda: local_ats_score(text), repeat_for(quick, 50, 10))))
+
+    n = repeat_for(quick, 2000, 200)
+    for label, text in (("typical", SAMPLE_ATS_RESPONSE), ("long", SAMPLE_ATS_RESPONSE * 20)):
+        rows.append(result(SUITE, "parse_ats_response", {"size": label, "chars": len(text)}, measure(lambda: parse_ats_response(text), n)))
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--quick", action="store_true")
+    args = parser.parse_args()
+    print(json.dumps(run(args.quick), indent=2))
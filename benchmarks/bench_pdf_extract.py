@@ -0,0 +1,107 @@
+"""
+Microbenchmark: single-pass extract_pdf vs. the old two-parse ATS path
+(extract_textpdf + extract_links_from_pdf, two re.sub passes per block).
+
+    python -m benchmarks.bench_pdf_extract --pages 1 3 6 --repeat 50
+"""
+import argparse
+import re
+import statistics
+import time
+
+import fitz  # PyMuPDF
+
+from app.services.pdf_parser import classify_links, extract_links, extract_pdf
+
+
+def make_resume_pdf(pages: int) -> bytes:
+    doc = fitz.open()
+    for p in range(pages):
+        page = doc.new_page()
+        y = 50
+        page.insert_text((50, y), f"Jane Doe — Software Engineer (page {p + 1})", fontsize=14)
+        y += 30
+        for i in range(38):
+            line = (
+                f"• Built service {i} in Python/FastAPI, cut p95 latency by {10 + i}% "
+                f"for 1.{i}M users — see github.com/janedoe/project-{i}"
+            )
+            page.insert_text((50, y), line, fontsize=8)
+            y += 19
+        page.insert_link({
+            "kind": fitz.LINK_URI,
+            "from": fitz.Rect(50, 40, 300, 60),
+            "uri": f"https://www.linkedin.com/in/janedoe-{p}",
+        })
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def _old_path(file_bytes: bytes):
+    """The pre-extract_pdf implementation, kept verbatim as the baseline."""
+    doc = fitz.open(stream=file_bytes, filetype="pdf")
+    blocks = []
+    for page in doc:
+        for b in page.get_text("blocks"):
+            text = b[4]
+            text = re.sub(r"[^\x00-\x7F]+", " ", text)
+            text = re.sub(r"\s+", " ", text).strip()
+            if text:
+                blocks.append(text)
+    doc.close()
+    text = "\n".join(blocks)
+
+    doc = fitz.open(stream=file_bytes, filetype="pdf")
+    urls = []
+    for page in doc:
+        for link in page.get_links():
+            uri = link.get("uri")
+            if not uri or not isinstance(uri, str):
+                continue
+            uri = uri.strip()
+            if not uri or uri.startswith(("mailto:", "tel:", "#")):
+                continue
+            if uri.startswith(("http://", "https://")):
+                urls.append(uri)
+            elif "linkedin.com" in uri or "github.com" in uri:
+                urls.append(uri if "://" in uri else "https://" + uri)
+    doc.close()
+    links_from_pdf = list(set(urls))
+
+    return text, classify_links(list(set(links_from_pdf + extract_links(text))))
+
+
+def _time(fn, arg, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(arg)
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples) * 1000
+
+
+def run(pages_list, repeat: int):
+    rows = []
+    for pages in pages_list:
+        pdf = make_resume_pdf(pages)
+        old_text, old_links = _old_path(pdf)
+        new = extract_pdf(pdf)
+        assert new["text"] == old_text
+        assert {k: sorted(v) for k, v in new["links"].items()} == {k: sorted(v) for k, v in old_links.items()}
+
+        old_ms = _time(_old_path, pdf, repeat)
+        new_ms = _time(extract_pdf, pdf, repeat)
+        rows.append({"pages": pages, "old_ms": old_ms, "new_ms": new_ms, "speedup": old_ms / new_ms})
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    print(f"{'pages':>5} {'old ms':>9} {'new ms':>9} {'speedup':>8}")
+    for r in run(args.pages, args.repeat):
+        print(f"{r['pages']:>5} {r['old_ms']:>9.2f} {r['new_ms']:>9.2f} {r['speedup']:>7.2f}x")
@@ -0,0 +1,83 @@
+"""
+Benchmark: bytes and CPU per generated resume for the storage and response
+serializers - stdlib json.dumps(indent=2) (the old storage path) vs orjson,
+plus gzip / zstd storage compression.
+
+    python -m benchmarks.bench_serialization --repeat 2000
+"""
+import argparse
+import gzip
+import json
+import time
+import uuid
+
+from app.services import serialization
+from benchmarks.bench_arsenal_fetch import make_arsenal
+
+
+def make_structured_resume(projects: int = 6, skills: int = 30):
+    """A structured resume shaped like the /api/generate-resume output."""
+    arsenal = make_arsenal(str(uuid.uuid4()), projects=projects, skills=skills)
+    personal = dict(arsenal["personal_details"][0])
+    personal["professional_summary"] = arsenal["professional_summary"][0]["professional_summary"]
+    personal["career_objective"] = arsenal["career_objectives"][0]["career_objective"]
+    keywords = ["python", "fastapi", "aws", "postgresql", "docker", "kubernetes", "react", "redis"] * 4
+    return {
+        "personal_info": personal,
+        "skills": arsenal["skills"],
+        "projects": arsenal["projects"],
+        "experience": arsenal["professional_experience"],
+        "education": arsenal["education"],
+        "matched_skills": keywords[:12],
+        "missing_skills": keywords[12:25],
+        "keywords": keywords,
+        "meta": {"experience_level": "Mid Level", "category": "Engineering", "sub_category": "Backend", "single_page_only": False},
+    }
+
+
+def _cpu_us(fn, repeat: int) -> float:
+    t0 = time.process_time()
+    for _ in range(repeat):
+        fn()
+    return (time.process_time() - t0) / repeat * 1e6
+
+
+def run(repeat: int):
+    resume = make_structured_resume()
+    old = lambda: json.dumps(resume, ensure_ascii=False, indent=2).encode("utf-8")  # noqa: E731
+    rows = []
+
+    def add(name, fn):
+        rows.append({"variant": name, "bytes": len(fn()), "cpu_us": _cpu_us(fn, repeat)})
+
+    add("json indent=2 (old storage)", old)
+    add("json compact (response)", lambda: json.dumps(resume, ensure_ascii=False).encode("utf-8"))
+    if serialization.orjson is not None:
+        orjson = serialization.orjson
+        add("orjson indent=2", lambda: orjson.dumps(resume, option=orjson.OPT_INDENT_2))
+        add("orjson compact", lambda: orjson.dumps(resume))
+    add("dumps + gzip", lambda: serialization.compress(serialization.dumps(resume), "gzip"))
+    try:
+        import zstandard  # noqa: F401
+
+        add("dumps + zstd", lambda: serialization.compress(serialization.dumps(resume), "zstd"))
+    except ImportError:
+        pass
+    add("old + gzip -9 (middleware default)", lambda: gzip.compress(old(), compresslevel=9))
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    rows = run(args.repeat)
+    base = rows[0]
+    print(f"encoder: {serialization.JSON_ENCODER}")
+    print(f"{'variant':<36} {'bytes':>8} {'vs old':>7} {'cpu us':>8} {'vs old':>7}")
+    for r in rows:
+        print(
+            f"{r['variant']:<36} {r['bytes']:>8} {r['bytes'] / base['bytes']:>6.0%} "
+            f"{r['cpu_us']:>8.1f} {r['cpu_us'] / base['cpu_us']:>6.0%}"
+        )
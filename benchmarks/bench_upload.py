@@ -0,0 +1,155 @@
+"""
+Benchmark: PDF upload ingestion under concurrency - the streaming reader the
+ATS endpoints use (read_resume_upload) against the UploadFile + `await
+file.read()` path they used before. Each scenario posts `concurrency` uploads
+of the same size at once through a minimal ASGI app that receives the file,
+hands it to fitz.open and returns its page count.
+
+Reports latency, peak Python heap per request (tracemalloc, so PyMuPDF's
+own C allocations are not included - they are the same for both paths) and,
+for rejected uploads, how many body bytes were read before the response.
+
+    python -m benchmarks.bench_upload --quick
+"""
+import argparse
+import asyncio
+import json
+import os
+import tracemalloc
+
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+
+import httpx  # noqa: E402
+from fastapi import FastAPI, File, HTTPException, Request, UploadFile  # noqa: E402
+
+from app.services.upload import UploadRejected, read_resume_upload  # noqa: E402
+from benchmarks.corpus import resume_pdf  # noqa: E402
+from benchmarks.harness import quiet, repeat_for, result, run_concurrent  # noqa: E402
+
+SUITE = "upload"
+BOUNDARY = "benchboundary"
+CHUNK = 64 * 1024
+MAX_BYTES = 64 * 1024 * 1024
+
+
+def _pages(data) -> int:
+    import fitz  # PyMuPDF
+
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        return doc.page_count
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/streaming")
+    async def streaming(request: Request):
+        try:
+            _, _, data = await read_resume_upload(request, max_bytes=MAX_BYTES)
+        except UploadRejected as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+        return {"pages": _pages(data)}
+
+    @app.post("/buffered")
+    async def buffered(file: UploadFile = File(...)):
+        if not (file.filename or "").endswith(".pdf"):
+            raise HTTPException(status_code=400, detail="Only PDF files are supported")
+        data = await file.read()
+        if not data.startswith(b"%PDF-"):
+            raise HTTPException(status_code=400, detail="File is not a valid PDF")
+        return {"pages": _pages(data)}
+
+    return app
+
+
+def _padded_pdf(size_mb: float) -> bytes:
+    # a real PDF padded with trailing bytes after %%EOF, which readers ignore
+    pdf = resume_pdf(2)
+    return pdf + b"\n" + b"%" * max(0, int(size_mb * 1024 * 1024) - len(pdf))
+
+
+HEAD = (
+    f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="file"; filename="r.pdf"\r\n'
+    "Content-Type: application/pdf\r\n\r\n"
+).encode()
+TAIL = f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def _body_parts(payload: bytes, counter: list):
+    head = HEAD
+
+    async def _gen():
+        yield head
+        for i in range(0, len(payload), CHUNK):
+            piece = payload[i : i + CHUNK]
+            counter[0] += len(piece)
+            yield piece
+            # let the other uploads interleave, as they would off a socket
+            await asyncio.sleep(0)
+        yield TAIL
+
+    return _gen()
+
+
+async def _scenario(client, path: str, payload: bytes, requests: int, concurrency: int, params: dict, chunked: bool = False):
+    sent = [0]
+    headers = {"content-type": f"multipart/form-data; boundary={BOUNDARY}"}
+    if not chunked:
+        # browsers send the length of a file upload up front
+        headers["content-length"] = str(len(HEAD) + len(payload) + len(TAIL))
+
+    async def _send(i):
+        return await client.post(path, content=_body_parts(payload, sent), headers=headers)
+
+    out = await run_concurrent(_send, requests, concurrency)
+    statuses = sorted({r.status_code for r in out["outputs"]})
+    read_per_request = sent[0] / requests
+
+    # separate traced round: tracemalloc slows allocation-heavy paths a lot
+    tracemalloc.start()
+    await run_concurrent(_send, concurrency, concurrency)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result(
+        SUITE,
+        path.strip("/"),
+        {**params, "requests": requests, "concurrency": concurrency, "chunked": chunked},
+        out["latencies"],
+        status=statuses,
+        peak_heap_mb=round(peak / 2**20, 2),
+        peak_heap_mb_per_request=round(peak / 2**20 / concurrency, 2),
+        body_mb_read_per_request=round(read_per_request / 2**20, 3),
+    )
+
+
+async def _run(quick: bool, concurrency: int):
+    rows = []
+    transport = httpx.ASGITransport(app=_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        for size_mb in ((1, 8) if quick else (1, 8, 32)):
+            payload = _padded_pdf(size_mb)
+            requests = repeat_for(quick, concurrency * 3, concurrency)
+            for path in ("/streaming", "/buffered"):
+                rows.append(await _scenario(client, path, payload, requests, concurrency, {"size_mb": size_mb, "kind": "pdf"}))
+            # no Content-Length: the streaming reader grows its buffer as data arrives
+            rows.append(await _scenario(
+                client, "/streaming", payload, requests, concurrency, {"size_mb": size_mb, "kind": "pdf"}, chunked=True
+            ))
+        # a large non-PDF: the streaming reader stops after the first chunk
+        junk = b"\x89PNG\r\n" + b"\0" * (8 * 1024 * 1024)
+        for path in ("/streaming", "/buffered"):
+            rows.append(await _scenario(client, path, junk, concurrency, concurrency, {"size_mb": 8, "kind": "not_pdf"}))
+    return rows
+
+
+def run(quick: bool = False, concurrency: int = 10):
+    with quiet():
+        return asyncio.run(_run(quick, concurrency))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--quick", action="store_true")
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+    print(json.dumps(run(args.quick, args.concurrency), indent=2))
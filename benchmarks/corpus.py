@@ -0,0 +1,179 @@
+"""
+Synthetic benchmark corpus: resume PDFs (PyMuPDF) and DOCX files
+(python-docx) of different sizes, Arsenal rows for the ranking filters and a
+typical Gemini ATS response. Everything is generated from a seed, so runs on
+different commits see identical inputs.
+
+    python -m benchmarks.corpus --out bench-corpus/
+"""
+import argparse
+import io
+import os
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+import fitz  # PyMuPDF
+
+from app.services.fake_model import FAKE_ATS_RESPONSE
+
+VOCAB = (
+    "python java javascript typescript react node.js aws docker kubernetes sql postgresql "
+    "machine learning rest apis fastapi django flask c++ c# go rust graphql redis kafka spark "
+    "airflow tensorflow pytorch nlp ci/cd git linux terraform gcp azure microservices agile "
+    "scrum pandas numpy"
+).split()
+FILLER = (
+    "built designed led shipped owned migrated scaled service platform users latency team "
+    "pipeline dashboard reliability throughput cost customers launch on-call"
+).split()
+
+# (label, pages) for PDFs and (label, bullet paragraphs) for DOCX
+PDF_SIZES = (("1-page", 1), ("2-page", 2), ("5-page", 5), ("20-page", 20))
+DOCX_SIZES = (("short", 20), ("typical", 60), ("long", 400))
+
+# arsenal sizes for the ranking filters: a real user, a heavy user and a stress case
+ARSENAL_SIZES = {
+    "realistic": {"projects": 15, "experience": 5, "skills": 40},
+    "large": {"projects": 200, "experience": 60, "skills": 500},
+    "extreme": {"projects": 2000, "experience": 500, "skills": 5000},
+}
+
+SAMPLE_ATS_RESPONSE = FAKE_ATS_RESPONSE
+
+
+def _bullet(rng: random.Random, i: int) -> str:
+    words = " ".join(rng.choice(VOCAB + FILLER * 2) for _ in range(14))
+    return f"• {words.capitalize()}, cutting p95 latency by {10 + i % 50}% for {1 + i % 9}.{i % 10}M users"
+
+
+def resume_pdf(pages: int, seed: int = 7) -> bytes:
+    rng = random.Random(seed + pages)
+    doc = fitz.open()
+    for p in range(pages):
+        page = doc.new_page()
+        y = 50
+        page.insert_text((50, y), f"Jane Doe — Software Engineer (page {p + 1})", fontsize=14)
+        y += 22
+        page.insert_text((50, y), "jane@example.com · github.com/janedoe · linkedin.com/in/janedoe", fontsize=9)
+        y += 26
+        for i in range(36):
+            page.insert_text((50, y), _bullet(rng, p * 36 + i)[:120], fontsize=8)
+            y += 19
+        page.insert_link({
+            "kind": fitz.LINK_URI,
+            "from": fitz.Rect(50, 60, 300, 76),
+            "uri": f"https://www.linkedin.com/in/janedoe-{p}",
+        })
+        page.insert_link({
+            "kind": fitz.LINK_URI,
+            "from": fitz.Rect(50, 100, 300, 116),
+            "uri": f"https://janedoe-portfolio-{p}.vercel.app",
+        })
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def _add_hyperlink(paragraph, url: str, label: str) -> None:
+    # python-docx has no public API for external hyperlinks
+    from docx.opc.constants import RELATIONSHIP_TYPE
+    from docx.oxml import OxmlElement
+    from docx.oxml.ns import qn
+
+    rid = paragraph.part.relate_to(url, RELATIONSHIP_TYPE.HYPERLINK, is_external=True)
+    link = OxmlElement("w:hyperlink")
+    link.set(qn("r:id"), rid)
+    run = OxmlElement("w:r")
+    text = OxmlElement("w:t")
+    text.text = label
+    run.append(text)
+    link.append(run)
+    paragraph._p.append(link)
+
+
+def resume_docx(paragraphs: int, seed: int = 7) -> bytes:
+    from docx import Document
+
+    rng = random.Random(seed + paragraphs)
+    doc = Document()
+    # contact line in the page header, as many templates do
+    doc.sections[0].header.paragraphs[0].text = "Jane Doe · jane@example.com · +1 555 0100"
+    doc.add_heading("Jane Doe — Software Engineer", level=1)
+    contact = doc.add_paragraph("jane@example.com · https://github.com/janedoe · https://linkedin.com/in/janedoe · ")
+    _add_hyperlink(contact, "https://janedoe-portfolio.vercel.app", "Portfolio")
+    # two-column skills table
+    table = doc.add_table(rows=2, cols=2)
+    for cell, words in zip(table._cells, (VOCAB[:6], VOCAB[6:12], VOCAB[12:18], VOCAB[18:24])):
+        cell.text = ", ".join(words)
+    for i in range(paragraphs):
+        if i % 12 == 0:
+            doc.add_heading(f"Company {i // 12}", level=2)
+        doc.add_paragraph(_bullet(rng, i))
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+def make_arsenal(user_id: str, projects: int = 15, experience: int = 5, skills: int = 40, seed: int = 7) -> Dict[str, List[Dict[str, Any]]]:
+    """Arsenal tables for one user, with varied text so the rankers have something to separate."""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+
+    def meta(i: int) -> Dict[str, Any]:
+        return {
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "user_id": user_id,
+            "created_at": (now - timedelta(days=400 - i % 400)).isoformat(),
+            "updated_at": (now - timedelta(days=30 - i % 30)).isoformat(),
+        }
+
+    def text(words: int) -> str:
+        return " ".join(rng.choice(VOCAB + FILLER * 3) for _ in range(words))
+
+    return {
+        "personal_details": [{**meta(0), "full_name": "Jane Doe", "email": "jane@example.com", "phone": "+1 555 0100", "location": "Remote"}],
+        "professional_summary": [{**meta(1), "professional_summary": "Backend engineer. " + text(40)}],
+        "career_objectives": [{**meta(2), "career_objective": "Grow into a staff role. " + text(25)}],
+        "professional_experience": [
+            {**meta(i), "position": f"Engineer {i}", "company": f"Company {i}", "location": "Remote", "description": text(60)}
+            for i in range(experience)
+        ],
+        "education": [{**meta(0), "institution": "State University", "degree": "B.Tech CSE", "duration": "2016-2020"}],
+        "projects": [
+            {**meta(i), "project_name": f"Project {i}", "tech_stack": rng.sample(VOCAB, 4),
+             "project_description": text(50), "github_url": f"https://github.com/janedoe/p{i}"}
+            for i in range(projects)
+        ],
+        "skills": [{**meta(i), "skill": rng.choice(VOCAB) if i < len(VOCAB) * 2 else f"{rng.choice(VOCAB)} {i}"} for i in range(skills)],
+    }
+
+
+def job_description(seed: int = 7, words: int = 120) -> str:
+    rng = random.Random(seed)
+    return "We are hiring a backend engineer. " + " ".join(rng.choice(VOCAB + FILLER) for _ in range(words))
+
+
+def keywords(n: int = 40, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    return rng.sample(VOCAB, min(n, len(VOCAB))) + [f"{rng.choice(VOCAB)} {i}" for i in range(max(0, n - len(VOCAB)))]
+
+
+def build_corpus() -> List[Dict[str, Any]]:
+    """[{name, kind, size, bytes}] for every PDF and DOCX size."""
+    docs = [{"name": f"resume-{label}.pdf", "kind": "pdf", "size": label, "bytes": resume_pdf(pages)} for label, pages in PDF_SIZES]
+    docs += [{"name": f"resume-{label}.docx", "kind": "docx", "size": label, "bytes": resume_docx(n)} for label, n in DOCX_SIZES]
+    return docs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--out", default="bench-corpus")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    for d in build_corpus():
+        with open(os.path.join(args.out, d["name"]), "wb") as f:
+            f.write(d["bytes"])
+        print(f"{d['name']:<24} {len(d['bytes']):>9} bytes")
@@ -0,0 +1,84 @@
+"""
+Timing helpers and the result record shared by the benchmark suites.
+
+Every measurement is a dict:
+    {"suite", "name", "params", "unit": "ms", "n", "median", "p95", "min", "mean", ...extra}
+keyed for comparison by (suite, name, params).
+"""
+import asyncio
+import contextlib
+import io
+import statistics
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+
+def percentile(samples: Sequence[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    k = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+def summarize(samples_ms: Sequence[float]) -> Dict[str, float]:
+    return {
+        "n": len(samples_ms),
+        "median": statistics.median(samples_ms),
+        "p95": percentile(samples_ms, 0.95),
+        "p99": percentile(samples_ms, 0.99),
+        "min": min(samples_ms),
+        "mean": statistics.fmean(samples_ms),
+    }
+
+
+def result(suite: str, name: str, params: Dict[str, Any], samples_ms: Sequence[float], **extra: Any) -> Dict[str, Any]:
+    return {"suite": suite, "name": name, "params": params, "unit": "ms", **summarize(samples_ms), **extra}
+
+
+def measure(fn: Callable[[], Any], repeat: int, warmup: int = 1) -> List[float]:
+    """Wall time of `repeat` calls in ms, after `warmup` untimed calls."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return samples
+
+
+def repeat_for(quick: bool, full: int, fast: int) -> int:
+    return fast if quick else full
+
+
+async def run_concurrent(
+    fn: Callable[[int], Awaitable[Any]],
+    requests: int,
+    concurrency: int,
+) -> Dict[str, Any]:
+    """
+    Call `fn(i)` for i in range(requests) with at most `concurrency` in
+    flight. Returns per-call latencies (ms), wall time and the results.
+    """
+    sem = asyncio.Semaphore(concurrency)
+    latencies: List[Optional[float]] = [None] * requests
+    outputs: List[Any] = [None] * requests
+
+    async def _one(i: int) -> None:
+        async with sem:
+            t0 = time.perf_counter()
+            outputs[i] = await fn(i)
+            latencies[i] = (time.perf_counter() - t0) * 1000
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*[_one(i) for i in range(requests)])
+    wall = time.perf_counter() - t0
+    return {"latencies": [x for x in latencies if x is not None], "wall_seconds": wall, "outputs": outputs}
+
+
+@contextlib.contextmanager
+def quiet():
+    """Swallow the services' debug print() output while timing."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
@@ -0,0 +1,94 @@
+"""
+Minimal local PostgREST stand-in for benchmarks.
+
+Serves `GET /rest/v1/<table>?select=...&user_id=eq.<id>` and
+`POST /rest/v1/rpc/<fn>` from a FakeSupabaseClient data store, and counts
+round trips and bytes on the wire so fetch strategies can be compared
+through the real supabase-py client.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict
+from urllib.parse import parse_qs, urlparse
+
+from app.services.fake_supabase import FakeSupabaseClient
+
+
+class PostgRESTStandIn:
+    def __init__(self, store: FakeSupabaseClient, latency_seconds: float = 0.0):
+        self.store = store
+        self.latency_seconds = latency_seconds
+        self.requests = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            self.requests = self.bytes_in = self.bytes_out = 0
+
+    def counters(self) -> Dict[str, int]:
+        return {"round_trips": self.requests, "bytes_in": self.bytes_in, "bytes_out": self.bytes_out}
+
+    def __enter__(self) -> "PostgRESTStandIn":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def _reply(self, payload: Any, status: int = 200) -> None:
+                body = json.dumps(payload).encode("utf-8")
+                if standin.latency_seconds:
+                    time.sleep(standin.latency_seconds)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                request_size = len(self.requestline) + len(str(self.headers))
+                with standin._lock:
+                    standin.requests += 1
+                    standin.bytes_in += request_size + int(self.headers.get("Content-Length") or 0)
+                    standin.bytes_out += len(body)
+
+            def do_GET(self) -> None:
+                url = urlparse(self.path)
+                table = url.path.rsplit("/", 1)[-1]
+                qs = parse_qs(url.query)
+                q = standin.store.table(table).select(qs.get("select", ["*"])[0])
+                for key, values in qs.items():
+                    if key != "select" and values[0].startswith("eq."):
+                        q = q.eq(key, values[0][3:])
+                self._reply(q.execute().data)
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                params = json.loads(self.rfile.read(length) or b"{}")
+                fn = urlparse(self.path).path.rsplit("/", 1)[-1]
+                try:
+                    self._reply(standin.store.rpc(fn, params).execute().data)
+                except RuntimeError as e:
+                    self._reply({"code": "PGRST202", "message": str(e)}, status=404)
+
+        return Handler
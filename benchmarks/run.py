@@ -0,0 +1,126 @@
+"""
+Run the benchmark suites and write machine-readable JSON, optionally
+comparing against an earlier run (e.g. from the previous commit).
+
+    python -m benchmarks.run --out bench.json
+    python -m benchmarks.run --suites parsers filters --quick --compare bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+SUITES = ("parsers", "filters", "http", "upload", "parse_pool")
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _key(row: Dict[str, Any]) -> Tuple[str, str, str]:
+    return row["suite"], row["name"], json.dumps(row["params"], sort_keys=True)
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.10) -> List[Dict[str, Any]]:
+    """Median change per measurement present in both runs; `regression` when slower by > threshold."""
+    old = {_key(r): r for r in baseline["results"]}
+    out = []
+    for row in current["results"]:
+        prev = old.get(_key(row))
+        if prev is None or not prev["median"]:
+            continue
+        ratio = row["median"] / prev["median"]
+        out.append({
+            "suite": row["suite"],
+            "name": row["name"],
+            "params": row["params"],
+            "old_median": prev["median"],
+            "new_median": row["median"],
+            "ratio": ratio,
+            "regression": ratio > 1 + threshold,
+        })
+    return out
+
+
+def run(suites, quick: bool, http_options: Dict[str, Any]) -> Dict[str, Any]:
+    results: List[Dict[str, Any]] = []
+    for suite in suites:
+        t0 = time.perf_counter()
+        if suite == "parsers":
+            from benchmarks import bench_parsers
+
+            results += bench_parsers.run(quick)
+        elif suite == "filters":
+            from benchmarks import bench_filters
+
+            results += bench_filters.run(quick)
+        elif suite == "http":
+            from benchmarks import bench_http
+
+            results += bench_http.run(quick, **http_options)
+        elif suite == "upload":
+            from benchmarks import bench_upload
+
+            results += bench_upload.run(quick, http_options["concurrency"])
+        elif suite == "parse_pool":
+            from benchmarks import bench_parse_pool
+
+            results += bench_parse_pool.run(quick, http_options["concurrency"])
+        print(f"{suite}: {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "quick": quick,
+            "suites": list(suites),
+        },
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--suites", nargs="+", choices=SUITES, default=list(SUITES))
+    parser.add_argument("--quick", action="store_true", help="fewer repetitions, for CI smoke runs")
+    parser.add_argument("--out", help="write results JSON here (default: stdout)")
+    parser.add_argument("--compare", help="earlier results JSON to compare medians against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="slowdown ratio counted as a regression")
+    parser.add_argument("--llm-latency-ms", type=float, default=50.0)
+    parser.add_argument("--requests", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+
+    report = run(
+        args.suites,
+        args.quick,
+        {"llm_latency_ms": args.llm_latency_ms, "requests": args.requests, "concurrency": args.concurrency},
+    )
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        report["comparison"] = {
+            "baseline_commit": baseline.get("meta", {}).get("commit"),
+            "rows": compare(baseline, report, args.threshold),
+        }
+        regressions = [r for r in report["comparison"]["rows"] if r["regression"]]
+        for r in regressions:
+            print(f"REGRESSION {r['suite']}/{r['name']} {r['params']}: {r['old_median']:.2f} -> {r['new_median']:.2f} ms", file=sys.stderr)
+
+    payload = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(payload)
+    else:
+        print(payload)
@@ -1,10 +1,39 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from starlette.middleware.gzip import DEFAULT_EXCLUDED_CONTENT_TYPES
 from app.api.ats_score import router as ats_router
 from app.api.generate_resume import router as generate_resume_router
+from app.api.structure_resume import router as structure_resume_router
+from app.services import metrics
+from app.services.job_queue import job_runner
+from app.services.parse_pool import parse_pool
+from app.services.resume_persister import resume_persister
+from app.services.serialization import FastJSONResponse
+from app.services.warmup import warmup
 import os
 
-app = FastAPI(title="ResuCurate ML Services", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await resume_persister.start()
+    await job_runner.start()
+    warmup.start()
+    yield
+    await warmup.stop()
+    await job_runner.stop()
+    await parse_pool.stop()
+    await resume_persister.stop()
+
+
+app = FastAPI(
+    title="ResuCurate ML Services",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+)
 
 # Configure CORS - Use environment variable for production, allow all for development
 allowed_origins = os.getenv("ALLOWED_ORIGINS", "*").split(",")
@@ -23,9 +52,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON responses; NDJSON and SSE streams stay uncompressed
+# so lines/events reach the client as soon as they are written.
+# exclude_content_types / DEFAULT_EXCLUDED_CONTENT_TYPES need a recent
+# Starlette (pinned in requirements.txt).
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=int(os.getenv("GZIP_MIN_SIZE", "1024")),
+    compresslevel=int(os.getenv("GZIP_COMPRESS_LEVEL", "6")),
+    exclude_content_types=DEFAULT_EXCLUDED_CONTENT_TYPES + ("application/x-ndjson",),
+)
+
+if metrics.METRICS_ENABLED:
+    # outermost, so Server-Timing and latency cover the whole stack
+    app.add_middleware(metrics.MetricsMiddleware)
+
 # Include routers
 app.include_router(ats_router)
 app.include_router(generate_resume_router)
+app.include_router(structure_resume_router)
 
 @app.get("/")
 async def root():
@@ -35,6 +80,17 @@ async def root():
 async def health():
     return {"status": "healthy"}
 
+@app.get("/ready")
+async def ready():
+    # liveness stays on /health; this turns 200 once the startup warm-up is done
+    return FastJSONResponse(warmup.stats(), status_code=200 if warmup.ready else 503)
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    if not metrics.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,72 @@
+-- One round trip for the whole arsenal, used by fetch_user_arsenal.
+-- p_columns is {table: [column, ...] | null} from ARSENAL_COLUMNS in
+-- app/services/arsenal.py, so the column lists live in one place and only
+-- those columns come back. null = the whole row minus internal columns
+-- (for tables copied into the resume verbatim). Columns a table doesn't
+-- have are skipped rather than failing the call.
+
+-- earlier single-argument version
+drop function if exists public.get_user_arsenal(uuid);
+
+create or replace function public.arsenal_pick_columns(r jsonb, p_columns jsonb)
+returns jsonb
+language sql
+immutable
+as $$
+  select case
+    when p_columns is null or jsonb_typeof(p_columns) <> 'array' then r - 'user_id' - 'created_at'
+    else coalesce((
+      select jsonb_object_agg(e.key, e.value)
+      from jsonb_each(r) e
+      where p_columns ? e.key
+    ), '{}'::jsonb)
+  end
+$$;
+
+create or replace function public.get_user_arsenal(p_user_id uuid, p_columns jsonb default '{}'::jsonb)
+returns jsonb
+language sql
+stable
+security invoker
+as $$
+  select jsonb_build_object(
+    'personal_details', coalesce((
+      select jsonb_agg(public.arsenal_pick_columns(to_jsonb(t) - 'id', p_columns -> 'personal_details'))
+      from public.personal_details t
+      where t.user_id = p_user_id
+    ), '[]'::jsonb),
+    'professional_summary', coalesce((
+      select jsonb_agg(public.arsenal_pick_columns(to_jsonb(t), p_columns -> 'professional_summary'))
+      from public.professional_summary t
+      where t.user_id = p_user_id
+    ), '[]'::jsonb),
+    'career_objectives', coalesce((
+      select jsonb_agg(public.arsenal_pick_columns(to_jsonb(t), p_columns -> 'career_objectives'))
+      from public.career_objectives t
+      where t.user_id = p_user_id
+    ), '[]'::jsonb),
+    'professional_experience', coalesce((
+      select jsonb_agg(public.arsenal_pick_columns(to_jsonb(t), p_columns -> 'professional_experience'))
+      from public.professional_experience t
+      where t.user_id = p_user_id
+    ), '[]'::jsonb),
+    'education', coalesce((
+      select jsonb_agg(public.arsenal_pick_columns(to_jsonb(t), p_columns -> 'education'))
+      from public.education t
+      where t.user_id = p_user_id
+    ), '[]'::jsonb),
+    'projects', coalesce((
+      select jsonb_agg(public.arsenal_pick_columns(to_jsonb(t), p_columns -> 'projects'))
+      from public.projects t
+      where t.user_id = p_user_id
+    ), '[]'::jsonb),
+    'skills', coalesce((
+      select jsonb_agg(public.arsenal_pick_columns(to_jsonb(t), p_columns -> 'skills'))
+      from public.skills t
+      where t.user_id = p_user_id
+    ), '[]'::jsonb)
+  );
+$$;
+
+grant execute on function public.arsenal_pick_columns(jsonb, jsonb) to authenticated, service_role;
+grant execute on function public.get_user_arsenal(uuid, jsonb) to authenticated, service_role;
@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import generate_resume
+from app.services.arsenal import ARSENAL_TABLES
+from app.services.arsenal_cache import ArsenalCache
+from app.services.fake_supabase import FakeSupabaseClient
+from main import app
+
+USER = "u1"
+
+
+def _tables():
+    def row(i, **cols):
+        return {"id": f"{i}", "user_id": USER, "created_at": "2026-01-01", "updated_at": f"2026-01-0{i}", **cols}
+
+    return {
+        "personal_details": [row(1, full_name="Jane")],
+        "projects": [row(1, project_name="Search", project_description="Search API", tech_stack=["python"])],
+        "skills": [row(1, skill="Python"), row(2, skill="SQL")],
+    }
+
+
+@pytest.fixture
+def supabase(monkeypatch):
+    monkeypatch.setattr(generate_resume, "ARSENAL_FETCH_MODE", "rpc")
+    return FakeSupabaseClient(_tables())
+
+
+def _cache(monkeypatch, tmp_path, fresh_seconds=30.0):
+    cache = ArsenalCache(ttl_seconds=3600, fresh_seconds=fresh_seconds, shared_path=str(tmp_path / "arsenal.sqlite3"))
+    monkeypatch.setattr(generate_resume, "arsenal_cache", cache)
+    return cache
+
+
+def _fetch(supabase):
+    return asyncio.run(generate_resume.fetch_user_arsenal(USER, supabase=supabase))
+
+
+def _ops(supabase):
+    ops = [(op, target) for op, target, _ in supabase.calls]
+    supabase.calls.clear()
+    return ops
+
+
+def test_fresh_entry_is_served_without_calls(monkeypatch, tmp_path, supabase):
+    _cache(monkeypatch, tmp_path)
+    first = _fetch(supabase)
+    assert _ops(supabase) == [("rpc", "get_user_arsenal")]
+    assert _fetch(supabase) == first
+    assert _ops(supabase) == []
+
+
+def test_matching_probe_skips_the_refetch(monkeypatch, tmp_path, supabase):
+    cache = _cache(monkeypatch, tmp_path, fresh_seconds=0)
+    _fetch(supabase)
+    _ops(supabase)
+    _fetch(supabase)
+    assert _ops(supabase) == [("select", t) for t in ARSENAL_TABLES]
+    assert cache.revalidated == 1 and cache.hits == 1
+
+
+def test_changed_probe_refetches(monkeypatch, tmp_path, supabase):
+    _cache(monkeypatch, tmp_path, fresh_seconds=0)
+    _fetch(supabase)
+    _ops(supabase)
+    supabase.tables["skills"].append({"id": "3", "user_id": USER, "created_at": "2026-01-01", "updated_at": "2026-01-09", "skill": "Go"})
+    arsenal = _fetch(supabase)
+    ops = _ops(supabase)
+    assert ops[:-1] == [("select", t) for t in ARSENAL_TABLES] and ops[-1] == ("rpc", "get_user_arsenal")
+    assert [s["skill"] for s in arsenal["skills"]] == ["Python", "SQL", "Go"]
+
+
+def test_webhook_invalidates_every_worker(monkeypatch, tmp_path, supabase):
+    monkeypatch.setenv("ARSENAL_WEBHOOK_SECRET", "s3cret")
+    # two uvicorn workers sharing the invalidation log; this one serves the webhook
+    other = ArsenalCache(ttl_seconds=3600, fresh_seconds=30, shared_path=str(tmp_path / "arsenal.sqlite3"))
+    monkeypatch.setattr(generate_resume, "arsenal_cache", other)
+    _fetch(supabase)
+    this = _cache(monkeypatch, tmp_path)
+    _fetch(supabase)
+    _ops(supabase)
+
+    r = TestClient(app).post(
+        "/api/arsenal/webhook",
+        json={"table": "skills", "type": "UPDATE", "record": {"user_id": USER}},
+        headers={"X-Webhook-Secret": "s3cret"},
+    )
+    assert r.json() == {"invalidated": True, "user_ids": [USER]}
+    assert this.get(USER) is None and other.get(USER) is None
+
+    monkeypatch.setattr(generate_resume, "arsenal_cache", other)
+    _fetch(supabase)
+    assert _ops(supabase) == [("rpc", "get_user_arsenal")]
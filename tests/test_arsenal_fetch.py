@@ -0,0 +1,38 @@
+import asyncio
+
+from app.api import generate_resume
+from app.services.fake_supabase import FakeSupabaseClient
+
+USER = "u1"
+TABLES = {
+    "personal_details": [{"id": "pd", "user_id": USER, "created_at": "t0", "updated_at": "t1", "full_name": "Jane", "email": "j@x.io"}],
+    "projects": [
+        {"id": "p1", "user_id": USER, "created_at": "t0", "updated_at": "t1", "project_name": "Search",
+         "project_description": "Search API", "tech_stack": ["python"], "github_url": "https://github.com/j/s",
+         "project_url": None, "internal_notes": "not for the resume"},
+    ],
+    "skills": [{"id": "s1", "user_id": USER, "created_at": "t0", "updated_at": "t1", "skill": "Python", "level": 3}],
+}
+
+
+def _fetch(mode, client):
+    fn = generate_resume._fetch_arsenal_rpc if mode == "rpc" else generate_resume._fetch_arsenal_tables
+    return asyncio.run(fn(client, USER))
+
+
+def test_rpc_and_table_fetch_return_only_listed_columns():
+    rpc = _fetch("rpc", FakeSupabaseClient(TABLES))
+    tables = _fetch("tables", FakeSupabaseClient(TABLES))
+    assert rpc == tables
+    assert set(rpc["projects"][0]) == {"id", "project_name", "project_description", "tech_stack", "github_url", "project_url", "updated_at"}
+    assert set(rpc["skills"][0]) == {"id", "skill", "updated_at"}
+    # copied into the resume verbatim: whole row minus internal columns
+    assert rpc["personal_details"][0] == {"updated_at": "t1", "full_name": "Jane", "email": "j@x.io"}
+
+
+def test_table_fetch_falls_back_when_a_listed_column_is_missing(monkeypatch):
+    monkeypatch.setattr(generate_resume, "_arsenal_select_all", set())
+    rows = {"projects": [{k: v for k, v in TABLES["projects"][0].items() if k != "project_url"}]}
+    out = _fetch("tables", FakeSupabaseClient(rows))
+    assert out["projects"][0]["project_name"] == "Search" and "internal_notes" not in out["projects"][0]
+    assert generate_resume._arsenal_select_all == {"projects"}
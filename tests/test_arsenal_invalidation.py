@@ -0,0 +1,21 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+
+client = TestClient(app)
+EVENT = {"table": "projects", "record": {"user_id": "u1"}}
+
+
+@pytest.mark.parametrize("path, body", [("/api/arsenal/invalidate", {"user_id": "u1"}), ("/api/arsenal/webhook", EVENT)])
+def test_refused_without_configured_secret(monkeypatch, path, body):
+    monkeypatch.delenv("ARSENAL_WEBHOOK_SECRET", raising=False)
+    assert client.post(path, json=body).status_code == 503
+
+
+@pytest.mark.parametrize("path, body", [("/api/arsenal/invalidate", {"user_id": "u1"}), ("/api/arsenal/webhook", EVENT)])
+def test_requires_matching_secret(monkeypatch, path, body):
+    monkeypatch.setenv("ARSENAL_WEBHOOK_SECRET", "s3cret")
+    assert client.post(path, json=body).status_code == 401
+    assert client.post(path, json=body, headers={"X-Webhook-Secret": "wrong"}).status_code == 401
+    assert client.post(path, json=body, headers={"X-Webhook-Secret": "s3cret"}).status_code == 200
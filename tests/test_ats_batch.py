@@ -0,0 +1,45 @@
+import io
+import zipfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import ats_score
+from main import app
+
+client = TestClient(app)
+PDF = b"%PDF-1.4\n" + b"0" * 1000
+
+
+def _zip(n: int) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for i in range(n):
+            zf.writestr(f"r{i}.pdf", PDF)
+    return buf.getvalue()
+
+
+@pytest.fixture
+def no_inflate(monkeypatch):
+    def _read(*a, **k):
+        raise AssertionError("member inflated before the batch limits were checked")
+
+    monkeypatch.setattr(zipfile.ZipFile, "read", _read)
+
+
+def test_zip_with_too_many_members_is_refused_before_reading(monkeypatch, no_inflate):
+    monkeypatch.setattr(ats_score, "BATCH_MAX_FILES", 3)
+    r = client.post("/api/ats-score/batch", files=[("files", ("a.zip", _zip(4), "application/zip"))])
+    assert r.status_code == 400
+
+
+def test_zip_over_total_bytes_is_refused_before_reading(monkeypatch, no_inflate):
+    monkeypatch.setattr(ats_score, "BATCH_MAX_TOTAL_BYTES", 3 * len(PDF))
+    r = client.post("/api/ats-score/batch", files=[("files", ("a.zip", _zip(4), "application/zip"))])
+    assert r.status_code == 413
+
+
+def test_uploads_over_total_bytes_are_refused(monkeypatch):
+    monkeypatch.setattr(ats_score, "BATCH_MAX_TOTAL_BYTES", 2 * len(PDF))
+    files = [("files", (f"r{i}.pdf", PDF, "application/pdf")) for i in range(3)]
+    assert client.post("/api/ats-score/batch", files=files).status_code == 413
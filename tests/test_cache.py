@@ -0,0 +1,20 @@
+import os
+
+from app.services.cache import SQLiteCache, build_cache
+
+
+def test_sqlite_tier_opens_on_first_use(tmp_path):
+    path = tmp_path / "nested" / "c.sqlite3"
+    cache = SQLiteCache(str(path), table="t", ttl_seconds=60)
+    assert not path.parent.exists()
+    cache.set("k", {"v": 1})
+    assert path.exists() and cache.get("k") == {"v": 1}
+
+
+def test_persistent_cache_does_not_touch_disk_when_built(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("CACHE_DIR", raising=False)
+    cache = build_cache("probe", "PROBE_CACHE", max_entries=8, ttl_seconds=60, persist_by_default=True)
+    assert not os.path.exists(".cache")
+    cache.set("k", "v")
+    assert os.path.exists(os.path.join(".cache", "probe.sqlite3"))
@@ -0,0 +1,9 @@
+from app.services.job_queue import JobQueue
+
+
+def test_queue_opens_on_first_use(tmp_path):
+    path = tmp_path / "jobs" / "jobs.sqlite3"
+    queue = JobQueue(str(path))
+    assert not path.parent.exists()
+    job_id = queue.enqueue("probe", {"n": 1})
+    assert path.exists() and queue.get(job_id)["status"] == "queued"
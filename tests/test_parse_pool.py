@@ -0,0 +1,16 @@
+import asyncio
+
+from app.services.parse_pool import ParsePool
+
+
+def test_memoryview_arguments_reach_the_worker():
+    pool = ParsePool(1, max_queued=1, timeout_seconds=60, retry_after=1)
+
+    async def main():
+        try:
+            view = memoryview(bytearray(b"%PDF-1.4 and some padding"))[:8]
+            return await pool.run(bytes, view)
+        finally:
+            await pool.stop()
+
+    assert asyncio.run(main()) == b"%PDF-1.4"
@@ -0,0 +1,38 @@
+import asyncio
+
+from app.services import resume_persister as rp
+from app.services.fake_supabase import FakeSupabaseClient
+
+
+def _persister(tmp_path, monkeypatch):
+    client = FakeSupabaseClient()
+    monkeypatch.setattr(rp, "get_supabase_client", lambda: client)
+    return rp.ResumePersister(rp.ResumeOutbox(str(tmp_path / "outbox.sqlite3"))), client
+
+
+def _submit(persister, persist_id, file_path):
+    asyncio.run(persister.submit(persist_id, "u1", "r.json", file_path, b"{}", "application/json"))
+
+
+def test_database_assigns_resume_id(tmp_path, monkeypatch):
+    persister, client = _persister(tmp_path, monkeypatch)
+    _submit(persister, "p1", "u1/r1.json")
+    assert persister.outbox.status("p1")["status"] == "pending"
+
+    assert asyncio.run(persister.drain()) == 1
+    [row] = client.tables["resumes"]
+    assert row["id"] != "p1"
+    assert persister.outbox.status("p1") == {**persister.outbox.status("p1"), "status": "stored", "resume_id": row["id"]}
+
+
+def test_retried_insert_reuses_a_row_that_already_landed(tmp_path, monkeypatch):
+    persister, client = _persister(tmp_path, monkeypatch)
+    _submit(persister, "p1", "u1/r1.json")
+    persister.outbox.mark_uploaded("p1")
+    # the previous insert reached the database, but the process died before recording it
+    persister.outbox.mark_inserting(["p1"])
+    [existing] = rp.insert_resume_rows(client, [{"user_id": "u1", "file_name": "r.json", "file_path": "u1/r1.json"}])
+
+    asyncio.run(persister.drain())
+    assert len(client.tables["resumes"]) == 1
+    assert persister.outbox.status("p1")["resume_id"] == existing["id"]
@@ -0,0 +1,34 @@
+from app.api.generate_resume import _keyword_set_key, _rewrite_cache_key
+
+
+def _project(**overrides):
+    row = {
+        "id": "p1",
+        "project_name": "Search service",
+        "project_description": "Built a search API over product data.",
+        "tech_stack": ["python", "elasticsearch", "fastapi"],
+    }
+    row.update(overrides)
+    return row
+
+
+KEYWORDS = _keyword_set_key(["python", "search", "apis"])
+
+
+def test_editing_description_changes_key():
+    edited = _project(project_description="Built a search API and cut p95 latency by 40%.")
+    assert _rewrite_cache_key(_project(), KEYWORDS) != _rewrite_cache_key(edited, KEYWORDS)
+
+
+def test_editing_name_changes_key():
+    assert _rewrite_cache_key(_project(), KEYWORDS) != _rewrite_cache_key(_project(project_name="Catalog search"), KEYWORDS)
+
+
+def test_different_projects_with_same_stack_differ():
+    other = _project(id="p2", project_name="Recommendations", project_description="Ranked products for users.")
+    assert _rewrite_cache_key(_project(), KEYWORDS) != _rewrite_cache_key(other, KEYWORDS)
+
+
+def test_tech_stack_order_does_not_matter():
+    reordered = _project(tech_stack=["fastapi", "python", "elasticsearch"])
+    assert _rewrite_cache_key(_project(), KEYWORDS) == _rewrite_cache_key(reordered, KEYWORDS)
@@ -0,0 +1,13 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_import_writes_nothing_to_disk(tmp_path):
+    storage = ("CACHE_DIR", "JOB_QUEUE_PATH", "RESUME_OUTBOX_PATH")
+    env = {k: v for k, v in os.environ.items() if k not in storage and not k.endswith("_CACHE_PATH")}
+    env["PYTHONPATH"] = ROOT
+    subprocess.run([sys.executable, "-c", "import main"], cwd=tmp_path, env=env, check=True, capture_output=True)
+    assert os.listdir(tmp_path) == []
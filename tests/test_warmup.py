@@ -0,0 +1,39 @@
+import asyncio
+
+from app.services.warmup import Warmup
+
+
+def _flaky(failures: int):
+    calls = {"n": 0}
+
+    def step():
+        calls["n"] += 1
+        if calls["n"] <= failures:
+            raise RuntimeError("not yet")
+
+    return step
+
+
+def _run(warmup: Warmup):
+    async def main():
+        warmup.start()
+        await warmup._task
+
+    asyncio.run(main())
+
+
+def test_critical_step_is_retried_until_ready():
+    warmup = Warmup([("parsers", _flaky(2), True)], retry_seconds=0.01)
+    _run(warmup)
+    assert warmup.ready and warmup.state == "ready"
+    assert warmup.results["parsers"] == {**warmup.results["parsers"], "ok": True, "attempts": 3}
+
+
+def test_non_critical_failure_does_not_block_ready():
+    def down():
+        raise RuntimeError("no credentials")
+
+    warmup = Warmup([("parsers", lambda: None, True), ("model", down, False)], retry_seconds=0.01, max_attempts=3)
+    _run(warmup)
+    assert warmup.ready and warmup.state == "degraded"
+    assert warmup.results["model"]["attempts"] == 3 and not warmup.results["model"]["ok"]